@@ -5,6 +5,19 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import requests
 import os
+import sys
+
+# Shared on-disk OHLCV history (options-hunter/ohlcv_store.py) when deployed alongside it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'options-hunter'))
+try:
+    from ohlcv_store import get_ohlcv_store
+except ImportError:
+    get_ohlcv_store = None
+try:
+    import numpy as np
+    from indicator_matrix import ema, rolling_mean, stack_latest
+except ImportError:  # Standalone deploy: per-ticker pandas below
+    stack_latest = None
 
 # --- Configuration ---
 st.set_page_config(page_title="Options Hunter Pro", layout="wide", page_icon="🎯")
@@ -25,43 +38,101 @@ def calculate_rsi(series, period=14):
     rs = gain / loss
     return 100 - (100 / (1 + rs))
 
-@st.cache_data(ttl=300)
-def get_stock_data(tickers, period="6mo", interval="1d"):
-    """Fetch stock data and calculate technical indicators"""
-    data = {}
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    for i, ticker in enumerate(tickers):
-        status_text.text(f"Fetching {ticker}... ({i+1}/{len(tickers)})")
+def bulk_download(tickers, period="6mo", interval="1d"):
+    """One yf.download() for every ticker -> {ticker: DataFrame}, adjusted like the shared store's bars"""
+    raw = yf.download(list(tickers), period=period, interval=interval, group_by='ticker',
+                      auto_adjust=True, progress=False, threads=True)
+    if raw.empty:
+        return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return {tickers[0]: raw}
+    available = set(raw.columns.get_level_values(0))
+    return {t: raw[t].dropna(how='all') for t in tickers if t in available}
+
+def download_history(tickers, period="6mo", interval="1d"):
+    """All tickers' OHLCV in one request (or from the shared store) -> {ticker: DataFrame}"""
+    if get_ohlcv_store is None:
+        return bulk_download(tickers, period, interval)
+
+    store = get_ohlcv_store()
+    # Cold or stale tickers come from one bulk download written into the store, not one request each
+    stale = store.stale(tickers, period, interval)
+    if stale:
         try:
-            df = yf.download(ticker, period=period, interval=interval, progress=False)
-            if not df.empty and len(df) >= 15:
-                # Calculate RSI (14-period)
-                delta = df['Close'].diff()
-                gain = (delta.where(delta > 0, 0)).ewm(alpha=1/14, adjust=False).mean()
-                loss = (-delta.where(delta < 0, 0)).ewm(alpha=1/14, adjust=False).mean()
-                rs = gain / loss
-                df['RSI'] = 100 - (100 / (1 + rs))
-                
-                # SMA crossovers
-                df['SMA_20'] = df['Close'].rolling(window=20).mean()
-                df['SMA_50'] = df['Close'].rolling(window=50).mean()
-                # Volume analysis
-                df['Volume_Avg'] = df['Volume'].rolling(window=20).mean()
-                
-                # Only store if we have valid RSI data
-                if not df['RSI'].isna().all():
-                    data[ticker] = df
+            for ticker, df in bulk_download(stale, period, interval).items():
+                store.ingest(ticker, df.dropna(subset=['Close']), period, interval)
+        except Exception as e:
+            st.warning(f"⚠️ Bulk download failed, fetching tickers one by one: {str(e)}")
+    frames = {}
+    for ticker in tickers:
+        try:
+            frames[ticker] = store.history(ticker, period, interval)
         except Exception as e:
             st.warning(f"⚠️ Error fetching {ticker}: {str(e)}")
-        
-        progress_bar.progress((i + 1) / len(tickers))
+    return frames
+
+def add_indicators(df):
+    """RSI (14-period, Wilder smoothing), SMA 20/50 and 20-day average volume on one ticker's bars"""
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).ewm(alpha=1/14, adjust=False).mean()
+    loss = (-delta.where(delta < 0, 0)).ewm(alpha=1/14, adjust=False).mean()
+    rs = gain / loss
+    df['RSI'] = 100 - (100 / (1 + rs))
     
-    progress_bar.empty()
-    status_text.empty()
+    # SMA crossovers
+    df['SMA_20'] = df['Close'].rolling(window=20).mean()
+    df['SMA_50'] = df['Close'].rolling(window=50).mean()
+    # Volume analysis
+    df['Volume_Avg'] = df['Volume'].rolling(window=20).mean()
+    return df
+
+def add_indicators_bulk(frames):
+    """
+    add_indicators() for every ticker in one vectorized pass. Each ticker's own bars are
+    right-aligned (indicator_matrix.stack_latest), so halts and late listings leave no gaps
+    and the results match the per-ticker version.
+    """
+    if stack_latest is None:
+        return {t: add_indicators(df.copy()) for t, df in frames.items()}
+    tickers, close, volume, _ = stack_latest(frames)
+    listed = ~np.isnan(close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = close - np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+        # Wilder smoothing is an EMA with alpha 1/14, i.e. span 27; padding rows stay NaN so it seeds on each ticker's first bar
+        gain = ema(np.where(listed, np.where(delta > 0, delta, 0.0), np.nan), 27)
+        loss = ema(np.where(listed, np.where(delta < 0, -delta, 0.0), np.nan), 27)
+        indicators = {
+            'RSI': np.where(listed, 100 - (100 / (1 + gain / loss)), np.nan),
+            'SMA_20': rolling_mean(close, 20),
+            'SMA_50': rolling_mean(close, 50),
+            'Volume_Avg': rolling_mean(volume, 20),
+        }
+    data = {}
+    for j, ticker in enumerate(tickers):
+        df = frames[ticker].copy()
+        for name, matrix in indicators.items():
+            df[name] = matrix[len(matrix) - len(df):, j]
+        data[ticker] = df
     return data
 
+@st.cache_data(ttl=300)
+def get_stock_data(tickers, period="6mo", interval="1d"):
+    """Fetch stock data and calculate technical indicators for every ticker in one vectorized pass"""
+    status_text = st.empty()
+    status_text.text(f"Fetching {len(tickers)} tickers...")
+    try:
+        frames = download_history(list(tickers), period, interval)
+    except Exception as e:
+        st.warning(f"⚠️ Error fetching data: {str(e)}")
+        frames = {}
+    status_text.empty()
+    frames = {t: df for t, df in frames.items() if not df.empty and len(df) >= 15}
+    if not frames:
+        return {}
+    
+    # Only keep tickers with valid RSI data
+    return {t: df for t, df in add_indicators_bulk(frames).items() if not df['RSI'].isna().all()}
+
 def get_next_friday(days_ahead=0):
     """Get next Friday for options expiration"""
     d = datetime.now() + timedelta(days=days_ahead)
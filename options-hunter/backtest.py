@@ -0,0 +1,521 @@
+"""
+backtest.py - Offline replay of the confirmation rules over stored daily bars
+Indicators for every (date, ticker) come out of one vectorized pass over a
+dates x tickers matrix, each day is scored with compute_confidence_batch(),
+and the selected contracts are priced with Black-Scholes off trailing
+realized volatility and run through the exit rules all at once.
+Usage: python backtest.py [TICKER ...]   (no tickers: synthetic benchmark)
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from greeks import option_price, MIN_TIME_TO_EXPIRY, RISK_FREE_RATE
+from indicator_matrix import compute as compute_indicators
+from indicator_store import MIN_BARS
+from iv_history import IV_MIN_HISTORY_DAYS
+from ohlcv_store import get_ohlcv_store
+from sectors import SECTOR_ETF_MAP
+from signals import DEFAULT_WEIGHTS, ScoringWeights, compute_confidence_batch, score_rules
+
+BACKTEST_PERIOD = os.getenv("BACKTEST_PERIOD", "5y")         # History synced per ticker by the CLI
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "0"))   # Processes for run_backtests(); 0 = one per core
+BACKTEST_CONFIGS_PER_WORKER = int(os.getenv("BACKTEST_CONFIGS_PER_WORKER", "16"))  # Fewer per process run serially
+RV_WINDOW = 20         # Trading days of returns behind the realized vol used as the contract's IV
+IV_RANK_WINDOW = 252   # Realized-vol rank over this many days stands in for IV rank (no stored IV that far back)
+EXIT_REASONS = ('take_profit', 'stop_loss', 'max_hold', 'expiry', 'end_of_data', 'missing_bar')
+RETURN_BUCKETS = (-100, -50, -25, 0, 25, 50, 100)  # P/L histogram edges, % of premium paid
+PERCENTILES = (5, 25, 50, 75, 95)                  # Return percentiles reported (50 is the median)
+
+
+class Universe:
+    """
+    Daily bars aligned on one date index: open/close/volume are (dates x tickers)
+    float arrays, NaN where a ticker has no bar. Sector ETFs ride along for the
+    sector rule but are only traded if they were requested themselves.
+    """
+
+    def __init__(self, dates: pd.DatetimeIndex, tickers: Sequence[str], open_: np.ndarray,
+                 close: np.ndarray, volume: np.ndarray, traded: np.ndarray, sectors: Dict[str, str]):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.open = open_
+        self.close = close
+        self.volume = volume
+        self.traded = traded
+        self.sectors = sectors
+        self.label = ''
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], traded: Sequence[str] = None,
+                    sectors: Dict[str, str] = None) -> 'Universe':
+        """frames: ticker -> OHLCV DataFrame (OHLCVStore.range() / yfinance layout)."""
+        frames = {t: f for t, f in frames.items() if f is not None and not f.empty}
+        if not frames:
+            raise ValueError("no bars to backtest")
+        columns = {}
+        for name in ('Open', 'Close', 'Volume'):
+            series = {}
+            for ticker, frame in frames.items():
+                s = frame[name].astype(float)
+                s.index = pd.DatetimeIndex(s.index).normalize()
+                series[ticker] = s[~s.index.duplicated(keep='last')]
+            columns[name] = pd.concat(series, axis=1, sort=True)
+        tickers = list(columns['Close'].columns)
+        traded = set(tickers if traded is None else traded)
+        return cls(columns['Close'].index, tickers,
+                   columns['Open'].to_numpy(), columns['Close'].to_numpy(), columns['Volume'].to_numpy(),
+                   np.array([t in traded for t in tickers]), SECTOR_ETF_MAP if sectors is None else sectors)
+
+    def save(self, path: str, label: str = ''):
+        """Write the arrays to an .npz file (atomically) so repeated runs skip the store."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, dates=self.dates.to_numpy().astype('datetime64[D]'), tickers=np.array(self.tickers),
+                     open=self.open, close=self.close, volume=self.volume, traded=self.traded,
+                     sectors=np.array(list(self.sectors.items()), dtype=str).reshape(-1, 2), label=np.array(label))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'Universe':
+        """Read a save()d universe; its label is on .label."""
+        with np.load(path) as data:
+            universe = cls(pd.DatetimeIndex(data['dates']), data['tickers'].tolist(), data['open'], data['close'],
+                           data['volume'], data['traded'], dict(data['sectors'].tolist()))
+            universe.label = str(data['label'])
+        return universe
+
+    def __repr__(self) -> str:
+        return (f"<Universe {int(self.traded.sum())} traded + {len(self.tickers) - int(self.traded.sum())} sector "
+                f"tickers x {len(self.dates)} days>")
+
+
+def load_universe(tickers: Sequence[str], start: pd.Timestamp = None, end: pd.Timestamp = None,
+                  period: str = None, store=None, sectors: Dict[str, str] = None) -> Universe:
+    """
+    Bars for tickers plus their sector ETFs from the OHLCV store. With period
+    (e.g. '5y') each ticker is synced with the provider first; otherwise only
+    what is already stored between start and end is replayed.
+    """
+    store = store or get_ohlcv_store()
+    sectors = SECTOR_ETF_MAP if sectors is None else sectors
+    wanted = list(dict.fromkeys(list(tickers) + [sectors[t] for t in tickers if t in sectors]))
+    frames = {}
+    for ticker in wanted:
+        frames[ticker] = store.history(ticker, period) if period else store.range(ticker, '1d', start, end)
+    return Universe.from_frames(frames, traded=tickers, sectors=sectors)
+
+
+class Signals:
+    """
+    Everything the rules read, as (dates x tickers) arrays: the indicators
+    get_technical_indicators() reports (indicator_matrix.py), sector alignment
+    and a realized-vol IV rank. Computed once per Universe and shared by every
+    BacktestConfig.
+
+    EMAs run over the whole history instead of the live 60-day window, so
+    they carry no seed bias; RSI, volume and % change match it exactly.
+    """
+
+    def __init__(self, universe: Universe):
+        self.universe = universe
+        indicators = compute_indicators(universe.close, universe.volume)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_returns = np.log(universe.close / np.vstack([np.full((1, len(universe.tickers)), np.nan),
+                                                             universe.close[:-1]]))
+        self.valid = indicators['valid']
+        change_pct = indicators['price_change_pct']
+        ema20 = indicators['ema20']
+
+        # Sector rule: the ETF's own % change and price vs EMA20, only once it has MIN_BARS itself
+        column = {t: j for j, t in enumerate(universe.tickers)}
+        sector_col = np.array([column.get(universe.sectors.get(t), -1) for t in universe.tickers])
+        has_sector = sector_col >= 0
+        etf = np.where(has_sector, sector_col, 0)
+        etf_ok = self.valid[:, etf] & has_sector
+        with np.errstate(invalid='ignore'):
+            etf_above = (universe.close[:, etf] > ema20[:, etf]).astype(float)
+        self.sector_price_change = np.where(etf_ok, change_pct[:, etf], np.nan)
+        self.sector_above_ema20 = np.where(etf_ok & (ema20[:, etf] != 0), etf_above, np.nan)
+
+        # IV: trailing realized vol prices the contracts, its rank in the last year stands in for IV rank
+        self.realized_vol = pd.DataFrame(log_returns).rolling(RV_WINDOW).std().to_numpy() * np.sqrt(252)
+        rv = pd.DataFrame(self.realized_vol).rolling(IV_RANK_WINDOW, min_periods=IV_MIN_HISTORY_DAYS)
+        low, high = rv.min().to_numpy(), rv.max().to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.iv_rank = np.where(high > low, np.clip((self.realized_vol - low) / (high - low) * 100, 0, 100),
+                                    np.where(np.isnan(low), np.nan, 50.0))
+
+        self.inputs = {
+            'price': universe.close,
+            'ema9': indicators['ema9'],
+            'ema20': ema20,
+            'rsi': indicators['rsi'],
+            'rsi_slope': indicators['rsi_slope'],
+            'volume': universe.volume,
+            'avg_volume_20': indicators['avg_volume_20'],
+            'price_change_pct': change_pct,
+            'sector_price_change': self.sector_price_change,
+            'sector_above_ema20': self.sector_above_ema20,
+            'iv_rank': self.iv_rank,
+            'has_major_macro_event': False,
+        }
+
+        # Cells a trade can be entered from: indicators ready, realized vol known, a next open to buy at
+        self.entry_open = np.vstack([universe.open[1:], np.full((1, universe.open.shape[1]), np.nan)])
+        with np.errstate(invalid='ignore'):
+            self.tradeable = self.valid & universe.traded & (self.realized_vol > 0) & (self.entry_open > 0)
+        self.cell_day, self.cell_col = np.nonzero(self.tradeable)
+        self.cell = np.full(self.tradeable.shape, -1)
+        self.cell[self.cell_day, self.cell_col] = np.arange(len(self.cell_day))
+        self._rules = {}
+        self._paths = {}
+
+    @property
+    def shape(self):
+        return self.universe.close.shape
+
+    def rules(self, has_near_earnings: bool = False):
+        """(call, put) per-rule fired masks - weight-independent, so cached and re-weighted per config."""
+        fired = self._rules.get(has_near_earnings)
+        if fired is None:
+            fired = self._rules[has_near_earnings] = tuple(
+                compute_confidence_batch(dict(self.inputs, direction=direction,
+                                              has_near_earnings=has_near_earnings)).fired
+                for direction in ('call', 'put'))
+        return fired
+
+    def trade_paths(self, days_to_expiry: int, hold_days: int, spread_pct: float, rate: float) -> Dict[str, np.ndarray]:
+        """
+        Marked-to-close return paths for an ATM trade entered from every tradeable cell,
+        calls in row 0 and puts in row 1. Cached per contract/cost setting: configs that
+        only differ in weights, threshold or exit levels reuse them.
+        """
+        key = (days_to_expiry, hold_days, spread_pct, rate)
+        paths = self._paths.get(key)
+        if paths is not None:
+            return paths
+
+        n_days = self.shape[0]
+        day, col = self.cell_day, self.cell_col
+        entry = day + 1
+        spot = self.entry_open[day, col]
+        sigma = self.realized_vol[day, col]
+        rows = entry[:, None] + np.arange(hold_days)
+        clipped = np.minimum(rows, n_days - 1)
+        marks = self.universe.close[clipped, col[:, None]]
+        calendar = self.universe.dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+        elapsed = calendar[clipped] - calendar[entry][:, None]
+        with np.errstate(invalid='ignore'):
+            alive = np.logical_and.accumulate((rows < n_days) & (marks > 0) & (elapsed <= days_to_expiry), axis=1)
+        t_left = np.maximum((days_to_expiry - elapsed) / 365.0, MIN_TIME_TO_EXPIRY)
+        marks = np.where(alive, marks, spot[:, None])
+
+        cost = np.empty((2, len(day)))
+        path = np.empty((2, len(day), hold_days))
+        for side, is_call in enumerate((True, False)):
+            # Bought at the ask (mid + half the spread) at the next open, sold at the bid
+            cost[side] = option_price(spot, spot, days_to_expiry / 365.0, sigma, is_call, rate) * (1 + spread_pct / 2)
+            value = option_price(marks, spot[:, None], t_left, sigma[:, None], is_call, rate) * (1 - spread_pct / 2)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                path[side] = value / cost[side][:, None] - 1
+        paths = self._paths[key] = {'cost': cost, 'path': path, 'alive': alive, 'rows': rows, 'elapsed': elapsed}
+        return paths
+
+    def snapshot(self, day: int, ticker: str) -> Dict:
+        """The SignalInputs fields for one (day index, ticker) - for spot checks against the live path."""
+        j = self.universe.tickers.index(ticker)
+        return {key: (value[day, j] if isinstance(value, np.ndarray) else value) for key, value in self.inputs.items()}
+
+
+@dataclass(frozen=True)
+class BacktestConfig:
+    """Scoring and exit rules for one replay."""
+    threshold: float = 40                      # CONFIDENCE_MIN_THRESHOLD
+    weights: ScoringWeights = DEFAULT_WEIGHTS
+    days_to_expiry: int = 30                   # Calendar days left on the contract when bought
+    hold_days: int = 10                        # Trading days before a time exit
+    take_profit: float = 0.5                   # Exit once the contract is up 50%...
+    stop_loss: float = -0.5                    # ...or down 50%
+    spread_pct: float = 0.04                   # Round-trip cost as a fraction of the mid (half paid each side)
+    rate: float = RISK_FREE_RATE
+
+
+class BacktestResult:
+    """Per-trade arrays (or just the summary, for sweeps) plus aggregate statistics."""
+
+    def __init__(self, config: BacktestConfig, summary: Dict, trades: Optional[pd.DataFrame] = None):
+        self.config = config
+        self.summary = summary
+        self.trades = trades
+
+    def report(self) -> str:
+        s = self.summary
+        lines = [f"{s['trades']} trades ({s['by_direction']['call']['trades']} calls / "
+                 f"{s['by_direction']['put']['trades']} puts), hit rate {s['hit_rate']:.1%}, "
+                 f"avg return {s['avg_return_pct']:+.1f}%, median {s['median_return_pct']:+.1f}%, "
+                 f"profit factor {s['profit_factor']:.2f}",
+                 "  return percentiles: " + ", ".join(f"{k} {v:+.0f}%" for k, v in s['return_percentiles'].items()),
+                 "  P/L histogram: " + ", ".join(f"{k}: {v}" for k, v in s['return_histogram'].items()),
+                 "  exits: " + ", ".join(f"{k} {v}" for k, v in s['exit_reasons'].items() if v),
+                 f"  runtime {s['runtime_ms']:.0f}ms"]
+        return "\n".join(lines)
+
+
+def _summarize(returns: np.ndarray, is_call: np.ndarray, days_held: np.ndarray, reasons: np.ndarray,
+               runtime_ms: float) -> Dict:
+    pct = returns * 100
+
+    def side(mask):
+        n = int(mask.sum())
+        return {'trades': n, 'hit_rate': float((returns[mask] > 0).mean()) if n else 0.0,
+                'avg_return_pct': float(pct[mask].mean()) if n else 0.0}
+
+    gains, losses = returns[returns > 0].sum(), -returns[returns < 0].sum()
+    percentiles = np.percentile(pct, PERCENTILES) if len(pct) else np.zeros(len(PERCENTILES))
+    edges = (-np.inf,) + RETURN_BUCKETS + (np.inf,)
+    counts = np.histogram(pct, bins=edges)[0] if len(pct) else np.zeros(len(edges) - 1, int)
+    labels = [f"<{RETURN_BUCKETS[0]}%"] + [f"{lo}..{hi}%" for lo, hi in zip(RETURN_BUCKETS, RETURN_BUCKETS[1:])] \
+        + [f">{RETURN_BUCKETS[-1]}%"]
+    return {
+        'trades': len(returns),
+        'hit_rate': float((returns > 0).mean()) if len(returns) else 0.0,
+        'avg_return_pct': float(pct.mean()) if len(pct) else 0.0,
+        'median_return_pct': float(percentiles[2]),
+        'return_percentiles': {f"p{q}": float(v) for q, v in zip(PERCENTILES, percentiles)},
+        'return_histogram': dict(zip(labels, counts.tolist())),
+        'profit_factor': float(gains / losses) if losses > 0 else (float('inf') if gains > 0 else 0.0),
+        'avg_days_held': float(days_held.mean()) if len(days_held) else 0.0,
+        'by_direction': {'call': side(is_call), 'put': side(~is_call)},
+        'exit_reasons': {reason: int((reasons == i).sum()) for i, reason in enumerate(EXIT_REASONS)},
+        'runtime_ms': runtime_ms,
+    }
+
+
+def run_backtest(signals: Signals, config: BacktestConfig = BacktestConfig(), keep_trades: bool = True) -> BacktestResult:
+    """
+    Replay one config: on every day each traded ticker takes the direction whose
+    confidence clears the threshold (calls win ties), buys the ATM contract at the
+    next open and exits on take-profit / stop-loss at a close, after hold_days, or at expiry.
+    """
+    t0 = time.perf_counter()
+    n_days = signals.shape[0]
+    call_rules, put_rules = signals.rules(config.days_to_expiry <= 4)  # Same earnings stand-in as the live scorer
+    call = score_rules(call_rules, config.weights)
+    put = score_rules(put_rules, config.weights)
+    take_call = signals.tradeable & (call >= config.threshold) & (call >= put)
+    take_put = signals.tradeable & (put >= config.threshold) & (put > call)
+    day, col = np.nonzero(take_call | take_put)
+    is_call = take_call[day, col]
+    confidence = np.where(is_call, call[day, col], put[day, col])
+
+    paths = signals.trade_paths(config.days_to_expiry, config.hold_days, config.spread_pct, config.rate)
+    cell = signals.cell[day, col]
+    side = (~is_call).astype(int)
+    cost, path = paths['cost'][side, cell], paths['path'][side, cell]
+    alive, rows, elapsed = paths['alive'][cell], paths['rows'][cell], paths['elapsed'][cell]
+
+    # First close that hits a target, else the last live one
+    keep = alive[:, 0] & (cost > 0)
+    path, alive, rows, elapsed = path[keep], alive[keep], rows[keep], elapsed[keep]
+    day, col, is_call, confidence, cost = day[keep], col[keep], is_call[keep], confidence[keep], cost[keep]
+    hit_tp = alive & (path >= config.take_profit)
+    hit_sl = alive & (path <= config.stop_loss)
+    triggered = hit_tp | hit_sl
+    last = alive.sum(axis=1) - 1
+    stopped = triggered.any(axis=1)
+    exit_step = np.where(stopped, triggered.argmax(axis=1), last)
+    picked = np.arange(len(path)), exit_step
+    returns = path[picked]
+
+    # The step after the last live one says why the path ended: past expiry, past the
+    # stored history, or (neither) a close that is missing or non-positive
+    after = np.arange(len(rows)), np.minimum(last + 1, config.hold_days - 1)
+    in_history = rows[after] < n_days
+    expired = in_history & (elapsed[after] > config.days_to_expiry)
+    reasons = np.select(
+        [stopped & hit_tp[picked], stopped, last == config.hold_days - 1, expired, in_history],
+        [0, 1, 2, 3, 5], default=4)  # Indexes into EXIT_REASONS
+    runtime_ms = (time.perf_counter() - t0) * 1000
+    summary = _summarize(returns, is_call, exit_step + 1, reasons, runtime_ms)
+
+    trades = None
+    if keep_trades:
+        universe = signals.universe
+        trades = pd.DataFrame({
+            'signal_date': universe.dates[day],
+            'ticker': np.array(universe.tickers)[col],
+            'direction': np.where(is_call, 'CALL', 'PUT'),
+            'confidence': confidence,
+            'entry_price': cost,
+            'exit_price': cost * (1 + returns),
+            'days_held': exit_step + 1,
+            'return_pct': returns * 100,
+            'exit_reason': np.array(EXIT_REASONS)[reasons],
+        })
+    return BacktestResult(config, summary, trades)
+
+
+class _ReplayArrays:
+    """
+    The part of a Signals that run_backtest(keep_trades=False) reads for a set of
+    configs: the tradeable/cell maps, their rule masks and their trade paths. This
+    is what worker processes get - not the indicator inputs or unused cached paths.
+    """
+
+    def __init__(self, signals: Signals, configs: Sequence[BacktestConfig]):
+        self.shape = signals.shape
+        self.tradeable = signals.tradeable
+        self.cell = signals.cell
+        self._rules = {}
+        self._paths = {}
+        for config in configs:
+            flag = config.days_to_expiry <= 4
+            key = (config.days_to_expiry, config.hold_days, config.spread_pct, config.rate)
+            self._rules[flag] = signals.rules(flag)
+            self._paths[key] = signals.trade_paths(*key)
+
+    def rules(self, has_near_earnings: bool = False):
+        return self._rules[has_near_earnings]
+
+    def trade_paths(self, days_to_expiry: int, hold_days: int, spread_pct: float, rate: float) -> Dict[str, np.ndarray]:
+        return self._paths[(days_to_expiry, hold_days, spread_pct, rate)]
+
+
+_worker_signals = None
+
+
+def _init_worker(replay: _ReplayArrays):
+    global _worker_signals
+    _worker_signals = replay
+
+
+def _run_in_worker(config: BacktestConfig) -> BacktestResult:
+    return run_backtest(_worker_signals, config, keep_trades=False)
+
+
+def run_backtests(signals: Signals, configs: Sequence[BacktestConfig], workers: int = None) -> List[BacktestResult]:
+    """
+    Replay many configs against the same Signals (summaries only). Rule masks and
+    trade paths are built here once. Each worker process needs at least
+    BACKTEST_CONFIGS_PER_WORKER configs to pay for itself, otherwise the replay runs
+    serially. Forked workers inherit the arrays they need instead of unpickling them;
+    under spawn/forkserver they receive only those arrays (_ReplayArrays).
+    """
+    global _worker_signals
+    workers = workers or BACKTEST_WORKERS or os.cpu_count() or 1
+    workers = min(workers, len(configs) // max(1, BACKTEST_CONFIGS_PER_WORKER))
+    replay = _ReplayArrays(signals, configs)
+    if workers <= 1:
+        return [run_backtest(replay, config, keep_trades=False) for config in configs]
+    context = multiprocessing.get_context()
+    chunksize = max(1, len(configs) // (workers * 4))
+    if context.get_start_method() == 'fork':
+        _worker_signals = replay
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                return list(pool.map(_run_in_worker, configs, chunksize=chunksize))
+        finally:
+            _worker_signals = None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(replay,)) as pool:
+        return list(pool.map(_run_in_worker, configs, chunksize=chunksize))
+
+
+def synthetic_frames(n_tickers: int = 120, n_days: int = 1260, seed: int = 22):
+    """
+    Regime-switching random walks for n_tickers stocks across six sector ETFs,
+    ending today. Returns (frames, sectors) ready for Universe.from_frames().
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_days)
+    etfs = ['XLK', 'XLF', 'XLY', 'XLV', 'XLI', 'XLE']
+
+    def walk(n, vol, beta_returns=None, beta=None):
+        regime = np.cumsum(rng.random((n_days, n)) < 1 / 40, axis=0)  # New drift every ~40 days
+        drift = rng.normal(0, 0.0015, (regime.max() + 1, n))[regime, np.arange(n)]
+        returns = drift + rng.normal(0, 1, (n_days, n)) * vol
+        if beta_returns is not None:
+            returns = returns + beta * beta_returns
+        return returns
+
+    etf_returns = walk(len(etfs), 0.009)
+    sector_of = rng.integers(0, len(etfs), n_tickers)
+    beta = rng.uniform(0.5, 1.5, n_tickers)
+    stock_returns = walk(n_tickers, rng.uniform(0.01, 0.03, n_tickers), etf_returns[:, sector_of], beta)
+
+    frames, sectors = {}, {}
+    names = etfs + [f"S{i:03d}" for i in range(n_tickers)]
+    for j, (name, returns) in enumerate(zip(names, np.hstack([etf_returns, stock_returns]).T)):
+        close = rng.uniform(20, 400) * np.exp(np.cumsum(returns))
+        gap = np.exp(rng.normal(0, 0.004, n_days))
+        opens = np.concatenate([[close[0]], close[:-1]]) * gap
+        frames[name] = pd.DataFrame({'Open': opens, 'High': np.maximum(opens, close) * 1.005,
+                                     'Low': np.minimum(opens, close) * 0.995, 'Close': close,
+                                     'Volume': rng.lognormal(15, 0.35, n_days)}, index=dates)
+        if j >= len(etfs):
+            sectors[name] = etfs[sector_of[j - len(etfs)]]
+    return frames, sectors
+
+
+if __name__ == '__main__':
+    config = BacktestConfig(threshold=int(os.getenv("CONFIDENCE_MIN_THRESHOLD", "40")),
+                            weights=ScoringWeights.from_env())
+    tickers = [t.upper() for t in sys.argv[1:]]
+    if tickers:
+        t0 = time.perf_counter()
+        universe = load_universe(tickers, period=BACKTEST_PERIOD)
+        print(f"[Backtest] Loaded {universe} in {time.perf_counter() - t0:.1f}s")
+        result = run_backtest(Signals(universe), config)
+        print(result.report())
+        print(result.trades.groupby('ticker')['return_pct'].agg(['count', 'mean']).round(1).to_string())
+        sys.exit(0)
+
+    # Synthetic benchmark: 5 years x 120 tickers through the real OHLCV store
+    import tempfile
+
+    from ohlcv_store import OHLCVStore
+
+    frames, sectors = synthetic_frames()
+    stocks = [t for t in frames if t.startswith('S')]
+    store = OHLCVStore(os.path.join(tempfile.mkdtemp(), 'bars.db'), fetch=lambda t, period, interval: frames[t])
+    t0 = time.perf_counter()
+    load_universe(stocks, period=BACKTEST_PERIOD, store=store, sectors=sectors)  # Sync into SQLite
+    sync_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    universe = load_universe(stocks, store=store, sectors=sectors)
+    load_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    signals = Signals(universe)
+    signals_s = time.perf_counter() - t0
+    print(f"{universe}: store sync {sync_s:.1f}s, load {load_s * 1000:.0f}ms, indicators {signals_s * 1000:.0f}ms")
+
+    # (agreement with IndicatorState / compute_confidence() lives in tests/test_backtest.py)
+    result = run_backtest(signals, config)
+    print(result.report())
+
+    # A 64-config sweep, serial then across processes
+    configs = [BacktestConfig(threshold=threshold, take_profit=tp, stop_loss=sl)
+               for threshold in (25, 40, 55, 70) for tp in (0.25, 0.5, 1.0, 2.0) for sl in (-0.25, -0.5, -0.75, -1.0)]
+    workers = max(2, os.cpu_count() or 1)
+    t0 = time.perf_counter()
+    serial = run_backtests(signals, configs, workers=1)
+    serial_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    parallel = run_backtests(signals, configs, workers=workers)
+    parallel_s = time.perf_counter() - t0
+    used = min(workers, len(configs) // max(1, BACKTEST_CONFIGS_PER_WORKER))
+    print(f"{len(configs)} configs: {serial_s:.2f}s serial, {parallel_s:.2f}s on {used} processes")
+    for r in sorted(serial, key=lambda r: -r.summary['avg_return_pct'])[:3]:
+        print(f"  threshold {r.config.threshold} take-profit {r.config.take_profit:.0%} "
+              f"stop {r.config.stop_loss:.0%}: "
+              f"{r.summary['trades']} trades, hit rate {r.summary['hit_rate']:.1%}, "
+              f"avg {r.summary['avg_return_pct']:+.1f}%")
@@ -0,0 +1,415 @@
+"""
+cache_backend.py - Shared cache backends behind the per-process TTLCaches
+Lets every gunicorn worker see quotes, chains and indicators another worker
+already fetched: Redis when REDIS_URL is set, or a SQLite file on one host
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from option_chain import FLOAT_FIELDS, OptionChain
+
+try:
+    import orjson
+except ImportError:  # Stdlib encoder fallback
+    orjson = None
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "").lower()  # "redis", "sqlite", "memory" or "none"; default: redis if REDIS_URL is set
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "shared_cache.db"))
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "oh")
+CACHE_LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT", "15"))  # Max seconds another worker waits on a loader
+CACHE_LOCK_POLL = 0.05
+
+
+TYPE_TAG = '__oh_type__'  # Marks the values plain JSON has no type for
+
+
+def _pack(value: Any) -> Any:
+    """
+    JSON-safe copy of a cached value. OptionChains travel as their columns and
+    tuples are tagged so they come back as tuples; NumPy scalars become numbers.
+    """
+    if isinstance(value, dict):
+        return {k: _pack(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_pack(v) for v in value]
+    if isinstance(value, tuple):
+        return {TYPE_TAG: 'tuple', 'items': [_pack(v) for v in value]}
+    if isinstance(value, OptionChain):
+        # Float columns stay arrays: orjson writes them natively (NaN as null, read back as NaN)
+        packed = {name: getattr(value, name) for name in FLOAT_FIELDS}
+        return dict(packed, **{TYPE_TAG: 'chain', 'expiry': value.expiry, 'symbol': value.symbol.tolist(),
+                               'is_call': value.is_call.tolist()})
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _unpack(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_unpack(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    tag = value.get(TYPE_TAG)
+    if tag == 'chain':
+        return OptionChain(value['expiry'], value['symbol'], value['is_call'],
+                           **{name: np.array(value[name], dtype=float) for name in FLOAT_FIELDS})
+    if tag == 'tuple':
+        return tuple(_unpack(v) for v in value['items'])
+    return {k: _unpack(v) for k, v in value.items()}
+
+
+def _array_list(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any, expires_at: float) -> bytes:
+    """
+    [expires_at, value] as JSON - data only, so a compromised cache server can't
+    run code in the workers. Raises TypeError for values JSON can't represent
+    (the entry then stays process-local). orjson writes NaN outside chains as null.
+    """
+    payload = [expires_at, _pack(value)]
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators=(',', ':'), default=_array_list).encode()
+
+
+def loads(data: bytes) -> Tuple[float, Any]:
+    expires_at, value = orjson.loads(data) if orjson is not None else json.loads(data)
+    return expires_at, _unpack(value)
+
+
+class CacheBackend:
+    """
+    Byte store shared between processes. Subclasses implement get/set/delete
+    and a best-effort lock (acquire/release) used for stampede protection.
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, data: bytes, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def acquire(self, key: str, ttl: float) -> Optional[str]:
+        """Take the lock for key; returns a token, or None if another process holds it."""
+        raise NotImplementedError
+
+    def release(self, key: str, token: str):
+        raise NotImplementedError
+
+    def get_value(self, key: str) -> Optional[Tuple[float, Any]]:
+        """(expires_at, value) or None. Backend errors count as misses - the shared layer is an optimization."""
+        try:
+            self.reads += 1
+            data = self.get(key)
+            if data is None:
+                return None
+            expires_at, value = loads(data)
+            if time.time() >= expires_at:
+                return None
+            self.hits += 1
+            return expires_at, value
+        except Exception as e:
+            self.errors += 1
+            print(f"[Cache] {self.name} read failed for {key}: {e}")
+            return None
+
+    def set_value(self, key: str, value: Any, ttl: float):
+        try:
+            self.set(key, dumps(value, time.time() + ttl), ttl)
+            self.writes += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"[Cache] {self.name} write failed for {key}: {e}")
+
+    def delete_value(self, key: str):
+        try:
+            self.delete(key)
+        except Exception as e:
+            self.errors += 1
+            print(f"[Cache] {self.name} delete failed for {key}: {e}")
+
+    def try_acquire(self, key: str, ttl: float) -> Optional[str]:
+        """acquire() that never raises - if the backend is down the caller just loads itself ('' token)."""
+        try:
+            return self.acquire(key, ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"[Cache] {self.name} lock failed for {key}: {e}")
+            return ''
+
+    def try_release(self, key: str, token: str):
+        if not token:
+            return
+        try:
+            self.release(key, token)
+        except Exception as e:
+            self.errors += 1
+            print(f"[Cache] {self.name} unlock failed for {key}: {e}")
+
+    def wait_for(self, key: str, lock_key: str, timeout: float) -> Optional[Tuple[float, Any]]:
+        """Poll for another process's result until it lands or its lock goes away."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(CACHE_LOCK_POLL)
+            entry = self.get_value(key)
+            if entry is not None:
+                return entry
+            try:
+                if self.get(lock_key) is None:
+                    return None
+            except Exception:
+                return None
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': self.name,
+            'reads': self.reads,
+            'hits': self.hits,
+            'hit_rate': round(self.hits / self.reads, 4) if self.reads else None,
+            'writes': self.writes,
+            'errors': self.errors,
+        }
+
+
+class MemoryBackend(CacheBackend):
+    """In-process dict - same semantics as the shared backends, for a single worker and for tests."""
+
+    name = 'memory'
+
+    def __init__(self):
+        super().__init__()
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.time() >= entry[1]:
+                return None
+            return entry[0]
+
+    def set(self, key, data, ttl):
+        with self._lock:
+            self._data[key] = (data, time.time() + ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def acquire(self, key, ttl):
+        token = uuid.uuid4().hex
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.time() < entry[1]:
+                return None
+            self._data[key] = (token.encode(), time.time() + ttl)
+        return token
+
+    def release(self, key, token):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] == token.encode():
+                del self._data[key]
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache table in a SQLite file (WAL mode) - shared by every worker on one
+    host without running a cache server. Expired rows are pruned on write.
+    """
+
+    name = 'sqlite'
+    PRUNE_EVERY = 500  # Writes between expired-row sweeps
+
+    def __init__(self, path: str = None):
+        super().__init__()
+        self.path = path or CACHE_DB_PATH
+        self._local = threading.local()
+        self._writes_since_prune = 0
+        with self._conn() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, data BLOB NOT NULL, '
+                         'expires_at REAL NOT NULL) WITHOUT ROWID')
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute('SELECT data FROM cache WHERE key = ? AND expires_at > ?',
+                                   (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, data, ttl):
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO cache (key, data, expires_at) VALUES (?, ?, ?)',
+                         (key, data, now + ttl))
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.PRUNE_EVERY:
+                self._writes_since_prune = 0
+                conn.execute('DELETE FROM cache WHERE expires_at <= ?', (now,))
+
+    def delete(self, key):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def acquire(self, key, ttl):
+        token = uuid.uuid4().hex
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute('DELETE FROM cache WHERE key = ? AND expires_at <= ?', (key, now))
+            cursor = conn.execute('INSERT OR IGNORE INTO cache (key, data, expires_at) VALUES (?, ?, ?)',
+                                  (key, token.encode(), now + ttl))
+        return token if cursor.rowcount == 1 else None
+
+    def release(self, key, token):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM cache WHERE key = ? AND data = ?', (key, token.encode()))
+
+
+class RedisBackend(CacheBackend):
+    """Redis (or anything speaking its protocol) via redis-py; entries expire server-side."""
+
+    name = 'redis'
+
+    def __init__(self, url: str = None, client=None):
+        super().__init__()
+        if client is None:
+            import redis  # Optional dependency - only needed when REDIS_URL is set
+            client = redis.Redis.from_url(url or REDIS_URL)
+        self.client = client
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, data, ttl):
+        self.client.set(key, data, px=max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def acquire(self, key, ttl):
+        token = uuid.uuid4().hex
+        return token if self.client.set(key, token, nx=True, px=max(1, int(ttl * 1000))) else None
+
+    def release(self, key, token):
+        # Only drop our own lock - it may have expired and been taken by another worker
+        if self.client.get(key) == token.encode():
+            self.client.delete(key)
+
+
+_backend = None
+_backend_resolved = False
+_backend_lock = threading.Lock()
+
+
+def get_shared_backend() -> Optional[CacheBackend]:
+    """The configured shared backend, or None when caches stay process-local."""
+    global _backend, _backend_resolved
+    if _backend_resolved:
+        return _backend
+    with _backend_lock:
+        if _backend_resolved:
+            return _backend
+        choice = CACHE_BACKEND or ('redis' if REDIS_URL else 'none')
+        try:
+            if choice == 'redis':
+                _backend = RedisBackend(REDIS_URL)
+            elif choice == 'sqlite':
+                _backend = SQLiteBackend(CACHE_DB_PATH)
+            elif choice == 'memory':
+                _backend = MemoryBackend()
+        except Exception as e:
+            print(f"[Cache] {choice} backend unavailable, caches stay per-process: {e}")
+            _backend = None
+        if _backend is not None:
+            print(f"[Cache] Shared cache backend: {_backend.name}")
+        _backend_resolved = True
+    return _backend
+
+
+if __name__ == '__main__':
+    # Codec cost for the payloads the server caches, then a cross-process stampede demo
+    # (round trips and backend semantics live in tests/test_cache_backend.py)
+    import multiprocessing
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    price = {'ticker': 'SPY', 'price': 512.34, 'source': 'Tradier', 'timestamp': '2026-10-16T15:30:00Z'}
+    indicators = {'price': 512.34, 'ema9': 510.1, 'ema20': 505.2, 'rsi': 58.3, 'rsi_slope': 1.2,
+                  'volume': 6.1e7, 'avg_volume_20': 5.4e7, 'price_change_pct': 0.41}
+    records = [{'symbol': f"SPY261120C{400000 + i * 1000:08d}", 'type': 'call' if i % 2 else 'put',
+                'strike': 400.0 + i, 'bid': float(rng.uniform(0.5, 20)), 'ask': float(rng.uniform(0.6, 21)),
+                'last': float(rng.uniform(0.5, 20)), 'volume': int(rng.integers(0, 5000)),
+                'open_interest': int(rng.integers(0, 50000)), 'iv': float(rng.uniform(0.1, 0.6)),
+                'delta': float(rng.uniform(-1, 1)), 'gamma': None, 'theta': None, 'vega': None}
+               for i in range(400)]
+    chain = {'contracts': OptionChain.from_records(records, '2026-11-20'), 'source': 'Tradier'}
+
+    def bench(fn, arg, n):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn(arg)
+        return (time.perf_counter() - start) / n * 1e6
+
+    print(f"codec: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'payload':<22}{'bytes':>9}{'dump us':>10}{'load us':>10}")
+    for label, value in (('price', price), ('indicators', indicators), ('chain (400 contracts)', chain)):
+        n = 2000 if label in ('price', 'indicators') else 200
+        blob = dumps(value, 0.0)
+        print(f"{label:<22}{len(blob):>9}{bench(lambda v: dumps(v, 0.0), value, n):>10.1f}{bench(loads, blob, n):>10.1f}")
+
+    # Stampede: 8 worker processes miss the same key at once; only one should run the loader
+    path = os.path.join(tempfile.mkdtemp(), 'shared.db')
+
+    def worker(_):
+        backend = SQLiteBackend(path)
+        key, lock_key = 'oh:chains:SPY', 'oh:chains:SPY:lock'
+        entry = backend.get_value(key)
+        if entry is not None:
+            return 'hit'
+        token = backend.try_acquire(lock_key, CACHE_LOCK_TIMEOUT)
+        if token is None:
+            return 'waited' if backend.wait_for(key, lock_key, CACHE_LOCK_TIMEOUT) else 'timeout'
+        try:
+            time.sleep(0.5)  # The provider call
+            backend.set_value(key, chain, 60)
+        finally:
+            backend.try_release(lock_key, token)
+        return 'loaded'
+
+    SQLiteBackend(path)
+    with multiprocessing.Pool(8) as pool:
+        outcomes = pool.map(worker, range(8))
+    print(f"stampede across 8 processes: {sorted(outcomes)}")
@@ -0,0 +1,267 @@
+"""
+indicator_store.py - Incremental EMA / RSI / volume indicators per ticker
+Keeps rolling indicator state and folds in only the newest daily bars;
+the full 60-day history is only downloaded on cold start or after a gap
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+BACKFILL_PERIOD = "60d"  # Cold start (enough for 20-day averages + buffer)
+UPDATE_PERIOD = "10d"    # Recent bars; overlaps the stored state so gaps are detectable
+MIN_BARS = 20
+EMA_FAST = 9
+EMA_SLOW = 20
+RSI_PERIOD = 14
+VOLUME_WINDOW = 20
+
+
+class IndicatorState:
+    """
+    Rolling state after the last folded-in bar. Same definitions as
+    calculate_ema() (adjust=False EMA) and calculate_rsi() (SMA of gains/losses).
+    """
+
+    __slots__ = ('last_date', 'last_close', 'prev_close', 'last_volume', 'ema_fast', 'ema_slow',
+                 'gains', 'losses', 'volumes', 'rsi_values', 'bars')
+
+    def __init__(self):
+        self.last_date = None
+        self.last_close = None
+        self.prev_close = None
+        self.last_volume = None
+        self.ema_fast = None
+        self.ema_slow = None
+        self.gains = deque(maxlen=RSI_PERIOD)
+        self.losses = deque(maxlen=RSI_PERIOD)
+        self.volumes = deque(maxlen=VOLUME_WINDOW)
+        self.rsi_values = deque(maxlen=3)  # For the 3-bar RSI slope
+        self.bars = 0
+
+    def copy(self) -> 'IndicatorState':
+        other = IndicatorState()
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(other, name, deque(value, maxlen=value.maxlen) if isinstance(value, deque) else value)
+        return other
+
+    def push(self, date, close: float, volume: float):
+        """Fold one bar into the state - O(1) apart from the 14-element RSI sums."""
+        if self.last_close is None:
+            # pandas: the first diff() is NaN, which where(delta > 0, 0) turns into 0
+            gain = loss = 0.0
+            self.ema_fast = self.ema_slow = close
+        else:
+            delta = close - self.last_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            a_fast = 2.0 / (EMA_FAST + 1)
+            a_slow = 2.0 / (EMA_SLOW + 1)
+            self.ema_fast = (1 - a_fast) * self.ema_fast + a_fast * close
+            self.ema_slow = (1 - a_slow) * self.ema_slow + a_slow * close
+        self.gains.append(gain)
+        self.losses.append(loss)
+        self.volumes.append(volume)
+        self.rsi_values.append(self._rsi())
+        self.prev_close = self.last_close
+        self.last_close = close
+        self.last_volume = volume
+        self.last_date = date
+        self.bars += 1
+
+    def _rsi(self) -> float:
+        if len(self.gains) < RSI_PERIOD:
+            return math.nan
+        avg_gain = sum(self.gains) / RSI_PERIOD
+        avg_loss = sum(self.losses) / RSI_PERIOD
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else math.nan
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def snapshot(self) -> Dict:
+        """The dict get_technical_indicators() returns."""
+        rsi = self.rsi_values[-1]
+        rsi_slope = float(self.rsi_values[-1] - self.rsi_values[0]) if len(self.rsi_values) >= 3 else 0.0
+        if self.prev_close is not None:
+            price_change_pct = float((self.last_close - self.prev_close) / self.prev_close * 100)
+        else:
+            price_change_pct = 0.0
+        return {
+            'price': float(self.last_close),
+            'ema9': float(self.ema_fast) if not math.isnan(self.ema_fast) else None,
+            'ema20': float(self.ema_slow) if not math.isnan(self.ema_slow) else None,
+            'rsi': float(rsi) if not math.isnan(rsi) else None,
+            'rsi_slope': rsi_slope,
+            'volume': float(self.last_volume),
+            'avg_volume_20': float(sum(self.volumes) / len(self.volumes)),
+            'price_change_pct': price_change_pct
+        }
+
+
+def _bars(hist: pd.DataFrame):
+    """(date, close, volume) per row, dates normalized to calendar days."""
+    dates = [ts.date() if hasattr(ts, 'date') else ts for ts in hist.index]
+    return list(zip(dates, hist['Close'].astype(float), hist['Volume'].astype(float)))
+
+
+class IndicatorStore:
+    """
+    Per-ticker indicator state.
+
+    The newest daily bar is still forming during the session, so state is
+    committed only through the second-to-last bar; the latest bar is folded
+    into a copy on each update. Backfills happen when a ticker is new, when
+    the recent window no longer overlaps the committed bar (gap), or when
+    the overlapping close changed (split/dividend re-adjustment).
+    """
+
+    def __init__(self, fetch_history: Callable[[str, str], pd.DataFrame],
+                 backfill_period: str = BACKFILL_PERIOD, update_period: str = UPDATE_PERIOD):
+        self.fetch_history = fetch_history  # fetch_history(ticker, period) -> daily OHLCV DataFrame
+        self.backfill_period = backfill_period
+        self.update_period = update_period
+        self._committed: Dict[str, IndicatorState] = {}
+        self._latest: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.counters = {'backfills': 0, 'updates': 0, 'gaps': 0, 'readjustments': 0, 'bars_folded': 0}
+
+    def _backfill(self, ticker: str) -> Optional[Dict]:
+        hist = self.fetch_history(ticker, self.backfill_period)
+        if hist is None or hist.empty or len(hist) < MIN_BARS:
+            return None
+        bars = _bars(hist)
+        state = IndicatorState()
+        for date, close, volume in bars[:-1]:
+            state.push(date, close, volume)
+        with self._lock:
+            self.counters['backfills'] += 1
+            self.counters['bars_folded'] += len(bars)
+        return self._commit(ticker, state, bars[-1])
+
+    def _commit(self, ticker: str, state: IndicatorState, latest_bar) -> Dict:
+        head = state.copy()
+        head.push(*latest_bar)
+        snapshot = head.snapshot()
+        with self._lock:
+            self._committed[ticker] = state
+            self._latest[ticker] = snapshot
+        return snapshot
+
+    def get(self, ticker: str) -> Optional[Dict]:
+        """Current indicators for ticker, fetching only what changed since last time."""
+        with self._lock:
+            committed = self._committed.get(ticker)
+        if committed is None:
+            return self._backfill(ticker)
+
+        hist = self.fetch_history(ticker, self.update_period)
+        if hist is None or hist.empty:
+            with self._lock:
+                return self._latest.get(ticker)
+
+        bars = _bars(hist)
+        overlap = [b for b in bars if b[0] == committed.last_date]
+        if not overlap:
+            with self._lock:
+                self.counters['gaps'] += 1
+            return self._backfill(ticker)
+        if not math.isclose(overlap[0][1], committed.last_close, rel_tol=1e-6):
+            with self._lock:
+                self.counters['readjustments'] += 1
+            return self._backfill(ticker)
+
+        newer = [b for b in bars if b[0] > committed.last_date]
+        if not newer:
+            # Still on the same bar as the committed state - nothing to fold in
+            with self._lock:
+                return self._latest.get(ticker)
+
+        state = committed.copy()
+        for bar in newer[:-1]:
+            state.push(*bar)
+        with self._lock:
+            self.counters['updates'] += 1
+            self.counters['bars_folded'] += len(newer)
+        return self._commit(ticker, state, newer[-1])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counters, tickers=len(self._committed))
+
+    def forget(self, ticker: str):
+        with self._lock:
+            self._committed.pop(ticker, None)
+            self._latest.pop(ticker, None)
+
+
+if __name__ == '__main__':
+    # Incremental update cost and drift vs. the pandas reference (tests/test_indicator_store.py asserts it)
+    import importlib.util
+    import os
+    import time
+
+    import numpy as np
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    spec = importlib.util.spec_from_file_location('server_alphavantage', os.path.join(here, 'server-alphavantage.py'))
+    server = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(server)
+
+    rng = np.random.default_rng(7)
+    days = pd.bdate_range('2026-01-02', periods=160)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+    full = pd.DataFrame({'Close': closes, 'Volume': rng.integers(1e5, 5e6, len(days)).astype(float)}, index=days)
+
+    def reference(frame):
+        close, volume = frame['Close'], frame['Volume']
+        rsi = server.calculate_rsi(close, 14)
+        return {
+            'price': float(close.iloc[-1]),
+            'ema9': float(server.calculate_ema(close, 9).iloc[-1]),
+            'ema20': float(server.calculate_ema(close, 20).iloc[-1]),
+            'rsi': float(rsi.iloc[-1]),
+            'rsi_slope': float(rsi.iloc[-1] - rsi.iloc[-3]),
+            'volume': float(volume.iloc[-1]),
+            'avg_volume_20': float(volume.tail(20).mean()),
+            'price_change_pct': float((close.iloc[-1] - close.iloc[-2]) / close.iloc[-2] * 100),
+        }
+
+    clock = {'today': 60, 'seed': 0}
+    fetches = []
+
+    def fake_history(ticker, period):
+        n = int(period.rstrip('d'))
+        fetches.append(period)
+        today = clock['today']
+        frame = full.iloc[max(0, today - n):today].copy()
+        if period == BACKFILL_PERIOD:
+            clock['seed'] = max(0, today - n)  # The EMA seed point the reference has to share
+        # The newest bar is still forming: first call sees a partial close
+        if clock.get('partial'):
+            frame.iloc[-1, 0] *= 0.99
+        return frame
+
+    store = IndicatorStore(fake_history)
+    worst = 0.0
+    t0 = time.perf_counter()
+    for today in range(60, len(days) + 1):
+        clock['today'] = today
+        for partial in (True, False):
+            clock['partial'] = partial
+            got = store.get('TEST')
+            expected = reference(fake_history('REF', f"{today - clock['seed']}d"))
+            fetches.pop()
+            worst = max(worst, max(abs(got[k] - expected[k]) / max(1.0, abs(expected[k])) for k in expected))
+        if today == 120:
+            clock['today'] = today + 8  # Simulate a week of downtime -> gap -> backfill
+            store.get('TEST')
+            clock['today'] = today
+            store.forget('TEST')
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"{len(days) - 59} days x 2 updates in {elapsed:.0f}ms; fetches: "
+          f"{fetches.count(BACKFILL_PERIOD)} x {BACKFILL_PERIOD}, {fetches.count(UPDATE_PERIOD)} x {UPDATE_PERIOD}")
+    print(f"stats: {store.stats()}; worst relative difference vs pandas: {worst:.2e}")
@@ -0,0 +1,260 @@
+"""
+iv_history.py - Daily at-the-money implied volatility per underlying
+One row per (ticker, market day) in SQLite, recorded from the chains the
+server already fetches. IV rank and percentile over 30/90/252-day (or any
+other) windows come from per-window min/max (and sorted values) computed once
+per ticker, so scoring a contract is a couple of arithmetic operations
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+from ohlcv_store import OHLCV_DB_PATH
+from prewarm import MARKET_TZ
+
+IV_HISTORY_DB_PATH = os.getenv("IV_HISTORY_DB_PATH", OHLCV_DB_PATH)  # Shares the OHLCV file by default
+IV_TARGET_DTE = int(os.getenv("IV_TARGET_DTE", "30"))           # Expiry preferred for the daily ATM sample
+IV_MIN_HISTORY_DAYS = int(os.getenv("IV_MIN_HISTORY_DAYS", "20"))  # Fewer samples than this -> no rank
+IV_SUMMARY_TTL = float(os.getenv("IV_SUMMARY_TTL", "300"))       # Seconds before re-reading other workers' samples
+WINDOWS = (30, 90, 252)  # Trading days
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS atm_iv (
+    ticker TEXT NOT NULL,
+    day TEXT NOT NULL,        -- Market date (New York), YYYY-MM-DD
+    iv REAL NOT NULL,
+    expiry TEXT NOT NULL,     -- Expiry the sample was taken from
+    dte INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (ticker, day)
+) WITHOUT ROWID;
+"""
+
+
+def atm_iv(chain, spot: float) -> Optional[float]:
+    """
+    IV at the spot price, interpolated between the strikes around it and
+    averaged over calls and puts. None if neither side has quoted IVs on
+    both sides of spot.
+    """
+    if not len(chain) or not spot or spot <= 0:
+        return None
+    sides = []
+    for mask in (chain.is_call, ~chain.is_call):
+        with np.errstate(invalid='ignore'):
+            ok = mask & (chain.iv > 0.01) & (chain.iv < 5.0) & (chain.strike > 0)
+        if np.count_nonzero(ok) < 2:
+            continue
+        strikes, inverse = np.unique(chain.strike[ok], return_inverse=True)
+        if not strikes[0] <= spot <= strikes[-1]:
+            continue
+        ivs = np.bincount(inverse, weights=chain.iv[ok]) / np.bincount(inverse)  # Mean per strike
+        sides.append(float(np.interp(spot, strikes, ivs)))
+    return sum(sides) / len(sides) if sides else None
+
+
+class IVSummary:
+    """
+    The last `limit` daily ATM IVs for one ticker. Min, max and a sorted copy are
+    computed the first time a window is asked for and kept: rank() is then O(1),
+    percentile() a bisect. Windows longer than the stored history use all of it.
+    """
+
+    def __init__(self, ticker: str, days, values, limit: int = None):
+        self.ticker = ticker
+        self.days = list(days)
+        self.values = np.asarray(values, dtype=float)
+        self.limit = max(WINDOWS) if limit is None else limit
+        self.windows = {}  # window -> (low, high, sorted values)
+
+    def _window(self, window: int):
+        """(low, high, sorted values) over the last `window` days, or None with no history."""
+        stats = self.windows.get(window)
+        if stats is None and len(self.values):
+            recent = self.values[-window:]
+            stats = self.windows[window] = (float(recent.min()), float(recent.max()), sorted(recent.tolist()))
+        return stats
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def latest(self) -> Optional[float]:
+        return float(self.values[-1]) if len(self.values) else None
+
+    def ready(self, window: int) -> bool:
+        """Enough samples in the window to rank against."""
+        return min(window, len(self.values)) >= IV_MIN_HISTORY_DAYS
+
+    def rank(self, iv: float, window: int = 252) -> Optional[float]:
+        """IV rank 0-100: where iv sits between the window's low and high."""
+        if iv is None or not self.ready(window):
+            return None
+        low, high, _ = self._window(window)
+        if high <= low:
+            return 50.0
+        return max(0.0, min(100.0, (iv - low) / (high - low) * 100))
+
+    def percentile(self, iv: float, window: int = 252) -> Optional[float]:
+        """IV percentile 0-100: share of days in the window with a lower ATM IV."""
+        if iv is None or not self.ready(window):
+            return None
+        ordered = self._window(window)[2]
+        return bisect_left(ordered, iv) / len(ordered) * 100
+
+    def as_dict(self, iv: float = None, windows=WINDOWS) -> Dict:
+        iv = self.latest if iv is None else iv
+        return {
+            'ticker': self.ticker,
+            'atm_iv': iv,
+            'days': len(self.values),
+            'first_day': self.days[0] if self.days else None,
+            'last_day': self.days[-1] if self.days else None,
+            'windows': {
+                str(window): {
+                    'low': self._window(window)[0] if len(self.values) else None,
+                    'high': self._window(window)[1] if len(self.values) else None,
+                    'iv_rank': self.rank(iv, window),
+                    'iv_percentile': self.percentile(iv, window),
+                } for window in windows
+            }
+        }
+
+
+class IVHistory:
+    """
+    Persisted daily ATM IV samples.
+
+    record() keeps one sample per ticker per market day - from the fetched
+    expiry closest to IV_TARGET_DTE, so days are comparable - and replaces
+    it as fresher chains for that expiry arrive. summary() is cached per
+    ticker for IV_SUMMARY_TTL and rebuilt at once after a local write.
+    """
+
+    def __init__(self, path: str = None, target_dte: int = None, summary_ttl: float = None):
+        self.path = path or IV_HISTORY_DB_PATH
+        self.target_dte = IV_TARGET_DTE if target_dte is None else target_dte
+        self.summary_ttl = IV_SUMMARY_TTL if summary_ttl is None else summary_ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._summaries = {}  # ticker -> (loaded_at, IVSummary)
+        self.counters = {'samples_written': 0, 'samples_kept': 0, 'no_atm_iv': 0, 'summary_loads': 0}
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run while another worker writes."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def record(self, ticker: str, chain, spot: float, now: datetime = None) -> Optional[float]:
+        """Store today's ATM IV from a freshly fetched chain. Returns the IV, or None if the chain has none."""
+        iv = atm_iv(chain, spot)
+        if iv is None or not chain.expiry:
+            self._count('no_atm_iv')
+            return None
+        today = (now or datetime.now(MARKET_TZ)).date()
+        dte = (datetime.strptime(chain.expiry, '%Y-%m-%d').date() - today).days
+        conn = self._conn()
+        with conn:
+            # Same day: only an expiry at least as close to the target DTE replaces the sample
+            cursor = conn.execute(
+                'INSERT INTO atm_iv (ticker, day, iv, expiry, dte, updated_at) VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (ticker, day) DO UPDATE SET iv = excluded.iv, expiry = excluded.expiry, '
+                'dte = excluded.dte, updated_at = excluded.updated_at '
+                'WHERE abs(excluded.dte - ?) <= abs(atm_iv.dte - ?)',
+                (ticker, today.isoformat(), iv, chain.expiry, dte, time.time(), self.target_dte, self.target_dte))
+        if cursor.rowcount:
+            self._count('samples_written')
+            with self._lock:
+                self._summaries.pop(ticker, None)
+        else:
+            self._count('samples_kept')
+        return iv
+
+    def summary(self, ticker: str, days: int = None) -> IVSummary:
+        """The last max(WINDOWS) samples - or `days`, when a longer window is needed."""
+        limit = max(max(WINDOWS), days or 0)
+        with self._lock:
+            cached = self._summaries.get(ticker)
+        if cached is not None and time.time() - cached[0] < self.summary_ttl and cached[1].limit >= limit:
+            return cached[1]
+        rows = self._conn().execute(
+            'SELECT day, iv FROM atm_iv WHERE ticker = ? ORDER BY day DESC LIMIT ?',
+            (ticker, limit)).fetchall()[::-1]
+        summary = IVSummary(ticker, [r[0] for r in rows], [r[1] for r in rows], limit)
+        self._count('summary_loads')
+        with self._lock:
+            self._summaries[ticker] = (time.time(), summary)
+        return summary
+
+    def stats(self) -> Dict:
+        tickers, samples = self._conn().execute('SELECT COUNT(DISTINCT ticker), COUNT(*) FROM atm_iv').fetchone()
+        with self._lock:
+            return dict(self.counters, path=self.path, tickers=tickers, samples=samples,
+                        target_dte=self.target_dte, cached_summaries=len(self._summaries))
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_iv_history() -> IVHistory:
+    """Process-wide history on IV_HISTORY_DB_PATH."""
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = IVHistory()
+    return _history
+
+
+if __name__ == '__main__':
+    # A year of synthetic samples, then rank lookup cost (correctness lives in tests/test_iv_history.py)
+    import tempfile
+    from datetime import timedelta
+
+    from option_chain import OptionChain
+
+    path = os.path.join(tempfile.mkdtemp(), 'iv.db')
+    history = IVHistory(path)
+    rng = np.random.default_rng(20)
+    spot = 100.0
+    strikes = np.arange(80.0, 121.0, 2.5)
+    start = datetime(2025, 10, 1, 12, 0, tzinfo=MARKET_TZ)
+    for day in range(300):
+        now = start + timedelta(days=day)
+        level = 0.25 + 0.1 * np.sin(day / 40) + rng.normal(0, 0.01)
+        smile = level + 0.002 * (strikes - spot) ** 2 / 10
+        expiry = (now + timedelta(days=30)).strftime('%Y-%m-%d')
+        chain = OptionChain(expiry, [''] * (2 * len(strikes)), [True] * len(strikes) + [False] * len(strikes),
+                            strike=np.concatenate([strikes, strikes]), iv=np.concatenate([smile, smile]))
+        history.record('SPY', chain, spot, now=now)
+    summary = history.summary('SPY')
+    current = 0.3
+
+    t0 = time.perf_counter()
+    for _ in range(100000):
+        summary.rank(current, 252)
+    rank_us = (time.perf_counter() - t0) * 10
+    print(f"{len(summary)} days stored, ATM IV {summary.latest:.4f}")
+    for window, values in summary.as_dict(current)['windows'].items():
+        print(f"  {window:>3}d: low {values['low']:.3f} high {values['high']:.3f} "
+              f"rank {values['iv_rank']:.1f} percentile {values['iv_percentile']:.1f}")
+    print(f"rank lookup: {rank_us:.2f}us, stats: {history.stats()}")
@@ -0,0 +1,215 @@
+"""
+metrics_engine.py - Columnar profit metrics for whole option chains
+Vectorized NumPy version of compute_metrics() in server-alphavantage.py
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+METRIC_FIELDS = [
+    'cost_to_enter', 'breakeven', 'profit_at_plus_5', 'profit_at_plus_10',
+    'expected_move', 'expected_profit', 'spread', 'spread_penalty',
+    'liquidity_score', 'profit_score'
+]
+
+
+def _to_float_array(values) -> np.ndarray:
+    """None -> NaN so missing fields survive the trip into NumPy."""
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def chain_arrays_from_contracts(contracts: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Build the column arrays compute_chain_metrics() expects from a list of contract dicts.
+    Providers return OptionChain objects - use OptionChain.metric_columns() for those.
+    """
+    return {
+        'strike': _to_float_array([c.get('strike') for c in contracts]),
+        'bid': _to_float_array([c.get('bid') for c in contracts]),
+        'ask': _to_float_array([c.get('ask') for c in contracts]),
+        'mid': _to_float_array([c.get('mid') for c in contracts]),
+        'last': _to_float_array([c.get('last') for c in contracts]),
+        'iv': _to_float_array([c.get('iv') for c in contracts]),
+        'volume': _to_float_array([c.get('volume') for c in contracts]),
+        'open_interest': _to_float_array([c.get('open_interest') for c in contracts]),
+        'is_call': np.array([str(c.get('type', '')).lower() == 'call' for c in contracts], dtype=bool),
+    }
+
+
+class ChainMetrics:
+    """
+    Metrics for every contract of a chain, one array per field.
+    valid[i] is False where compute_metrics() would have returned None.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], valid: np.ndarray):
+        self.arrays = arrays
+        self.valid = valid
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.arrays[field]
+
+    def record(self, i: int) -> Optional[Dict]:
+        """Materialize one contract's metrics in the compute_metrics() dict schema."""
+        if not self.valid[i]:
+            return None
+        a = self.arrays
+        expected_move = a['expected_move'][i]
+        expected_profit = a['expected_profit'][i]
+        spread = a['spread'][i]
+        return {
+            'cost_to_enter': round(float(a['cost_to_enter'][i]), 2),
+            'breakeven': round(float(a['breakeven'][i]), 4),
+            'profit_at_plus_5': round(float(a['profit_at_plus_5'][i]), 2),
+            'profit_at_plus_10': round(float(a['profit_at_plus_10'][i]), 2),
+            # NaN = "no IV", and 0 collapses to None exactly like the scalar version
+            'expected_move': round(float(expected_move), 2) if expected_move and not np.isnan(expected_move) else None,
+            'expected_profit': round(float(expected_profit), 2) if expected_profit and not np.isnan(expected_profit) else None,
+            'spread': round(float(spread), 4) if spread else None,
+            'spread_penalty': round(float(a['spread_penalty'][i]), 2),
+            'liquidity_score': round(float(a['liquidity_score'][i]), 3),
+            'profit_score': round(float(a['profit_score'][i]), 4)
+        }
+
+    def records(self, indices=None) -> List[Optional[Dict]]:
+        if indices is None:
+            indices = range(len(self))
+        return [self.record(int(i)) for i in indices]
+
+
+def compute_chain_metrics(spot_price: float, strike, bid, ask, mid, last, iv,
+                          volume, open_interest, is_call) -> ChainMetrics:
+    """
+    Compute profit metrics for a whole chain in one pass.
+    Inputs are equal-length arrays (NaN = missing); is_call is a boolean mask.
+    The arithmetic follows compute_metrics() operation-for-operation so results are identical.
+    """
+    strike = np.asarray(strike, dtype=float)
+    bid = np.asarray(bid, dtype=float)
+    ask = np.asarray(ask, dtype=float)
+    mid = np.asarray(mid, dtype=float)
+    last = np.asarray(last, dtype=float)
+    iv = np.asarray(iv, dtype=float)
+    is_call = np.asarray(is_call, dtype=bool)
+    volume = np.nan_to_num(np.asarray(volume, dtype=float), nan=0.0)
+    oi = np.nan_to_num(np.asarray(open_interest, dtype=float), nan=0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Use mid if available, otherwise fallback to last price
+        price = np.where(mid > 0, mid, np.where(last > 0, last, np.nan))
+        valid = ~np.isnan(strike) & (price > 0)
+
+        cost_to_enter = price * 100.0
+
+        # Breakeven
+        breakeven = np.where(is_call, strike + price, strike - price)
+
+        # Profit at different moves
+        def profit_at_move(pct_move):
+            call_intrinsic = np.maximum(0, spot_price * (1 + pct_move) - strike) * 100
+            put_intrinsic = np.maximum(0, strike - spot_price * (1 - abs(pct_move))) * 100
+            return np.where(is_call, call_intrinsic, put_intrinsic) - cost_to_enter
+
+        profit_5 = profit_at_move(0.05)
+        profit_10 = profit_at_move(0.10)
+
+        # Expected move based on IV (NaN where IV is missing)
+        has_iv = iv > 0
+        expected_move = np.where(has_iv, iv * 0.5 * spot_price, np.nan)
+        exp_intrinsic = np.where(
+            is_call,
+            np.maximum(0, (spot_price + expected_move) - strike) * 100,
+            np.maximum(0, strike - (spot_price - expected_move)) * 100
+        )
+        expected_profit = np.where(has_iv, exp_intrinsic - cost_to_enter, np.nan)
+
+        # Spread
+        spread = np.where(np.isnan(ask) | np.isnan(bid), 0.0, ask - bid)
+        spread_pct = np.where(price > 0, spread / price, 1.0)
+        spread_penalty = np.maximum(1.0, 1 + spread_pct * 2)
+
+        # Liquidity score (0 to 1)
+        tight_spread = np.maximum(0, 1 - np.minimum(1, spread_pct))
+        oi_score = np.minimum(1.0, oi / 1000.0)
+        vol_score = np.minimum(1.0, volume / 500.0)
+        liquidity_score = np.maximum(0.1, 0.3 * tight_spread + 0.4 * oi_score + 0.3 * vol_score)
+
+        # Trend alignment (neutral for now - no fabrication)
+        trend_alignment = 1.0
+
+        # Profit score
+        profit_potential = np.where(
+            has_iv, expected_profit,
+            np.maximum(np.maximum(profit_10, profit_5), 0) * 0.3
+        )
+        profit_score = np.where(
+            cost_to_enter > 0,
+            np.maximum(0, (profit_potential / cost_to_enter) * liquidity_score * trend_alignment * (1 / spread_penalty)),
+            0.0
+        )
+
+    arrays = {
+        'cost_to_enter': cost_to_enter,
+        'breakeven': breakeven,
+        'profit_at_plus_5': profit_5,
+        'profit_at_plus_10': profit_10,
+        'expected_move': expected_move,
+        'expected_profit': expected_profit,
+        'spread': spread,
+        'spread_penalty': spread_penalty,
+        'liquidity_score': liquidity_score,
+        'profit_score': profit_score,
+    }
+    return ChainMetrics(arrays, valid)
+
+
+def compute_metrics_for_contracts(contracts: List[Dict], spot_price: float) -> ChainMetrics:
+    """Convenience wrapper: list of contract dicts -> ChainMetrics."""
+    cols = chain_arrays_from_contracts(contracts)
+    return compute_chain_metrics(spot_price, **cols)
+
+
+if __name__ == '__main__':
+    # Scalar reference vs vectorized timing (equivalence lives in tests/test_metrics_engine.py)
+    import importlib.util
+    import os
+    import random
+    import time
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    spec = importlib.util.spec_from_file_location('server_alphavantage', os.path.join(here, 'server-alphavantage.py'))
+    server = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(server)
+
+    rnd = random.Random(42)
+    maybe = lambda v: None if rnd.random() < 0.15 else v
+    spot = 187.35
+    contracts = []
+    for i in range(5000):
+        bid = maybe(round(rnd.uniform(0, 12), 2))
+        ask = maybe(round((bid or 0) + rnd.uniform(0, 1.5), 2))
+        contracts.append({
+            'type': rnd.choice(['call', 'put', 'CALL']),
+            'strike': round(spot * rnd.uniform(0.7, 1.3), 1),
+            'bid': bid,
+            'ask': ask,
+            'mid': (bid + ask) / 2.0 if bid and ask and bid > 0 and ask > 0 else maybe(0.0),
+            'last': maybe(round(rnd.uniform(0, 12), 2)),
+            'iv': maybe(rnd.choice([0.0, rnd.uniform(0.05, 1.5)])),
+            'volume': maybe(rnd.randint(0, 5000)),
+            'open_interest': maybe(rnd.randint(0, 20000)),
+        })
+
+    t0 = time.perf_counter()
+    for c in contracts:
+        server.compute_metrics(c, spot)
+    t1 = time.perf_counter()
+    compute_metrics_for_contracts(contracts, spot).records()
+    t2 = time.perf_counter()
+
+    print(f"{len(contracts)} contracts - scalar: {(t1 - t0) * 1000:.1f}ms   "
+          f"vectorized (incl. records): {(t2 - t1) * 1000:.1f}ms")
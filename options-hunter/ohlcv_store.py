@@ -0,0 +1,322 @@
+"""
+ohlcv_store.py - Persistent daily OHLCV history shared by every process
+SQLite file keyed by (ticker, interval, bar timestamp). Bars are appended as
+they arrive and read back with range queries, so restarts and extra workers
+reuse history already downloaded instead of re-fetching it from yfinance
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from single_flight import SingleFlight
+
+OHLCV_DB_PATH = os.getenv("OHLCV_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ohlcv_history.db"))
+OHLCV_SYNC_TTL = float(os.getenv("OHLCV_SYNC_TTL", "300"))  # Seconds before a (ticker, interval) is re-synced with the provider
+INCREMENTAL_OVERLAP_DAYS = 5  # Days re-fetched before the last stored bar (covers weekends/holidays)
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    first_ts TEXT NOT NULL,  -- Earliest start the provider was asked for ('' = full history)
+    synced_at REAL NOT NULL, -- Unix time of the last successful provider sync
+    PRIMARY KEY (ticker, interval)
+);
+"""
+
+_PERIOD_RE = re.compile(r'^(\d+)(d|wk|mo|y)$')
+
+
+def period_start(period: str, now: datetime = None) -> Optional[pd.Timestamp]:
+    """First calendar day covered by a yfinance-style period ('60d', '1mo', '6mo', '1y', 'ytd'); None for 'max'."""
+    today = pd.Timestamp(now or datetime.now()).normalize()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return today.replace(month=1, day=1)
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"unsupported period: {period}")
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == 'd':
+        return today - pd.Timedelta(days=n)
+    if unit == 'wk':
+        return today - pd.Timedelta(weeks=n)
+    if unit == 'mo':
+        return today - pd.DateOffset(months=n)
+    return today - pd.DateOffset(years=n)
+
+
+def _ts_key(ts: Optional[pd.Timestamp]) -> str:
+    return '' if ts is None else ts.strftime(TS_FORMAT)
+
+
+def _yfinance_history(ticker: str, period: str, interval: str) -> pd.DataFrame:
+    import yfinance as yf
+    return yf.Ticker(ticker).history(period=period, interval=interval)
+
+
+class OHLCVStore:
+    """
+    Append-only bar store in front of a history provider.
+
+    history() syncs (ticker, interval) with the provider at most once per
+    sync_ttl across all processes sharing the file - the first time for
+    the whole requested period, afterwards only the days since the last
+    stored bar - then answers from SQLite. The newest stored bar is
+    replaced on each sync since it may still be forming; older bars are
+    never rewritten unless the provider re-adjusted them (split/dividend),
+    which drops the ticker's history and refetches it.
+    """
+
+    def __init__(self, path: str = None, fetch: Callable[[str, str, str], pd.DataFrame] = None,
+                 sync_ttl: float = None):
+        self.path = path or OHLCV_DB_PATH
+        self.fetch = fetch or _yfinance_history  # fetch(ticker, period, interval) -> OHLCV DataFrame
+        self.sync_ttl = OHLCV_SYNC_TTL if sync_ttl is None else sync_ttl
+        self._local = threading.local()
+        self._flight = SingleFlight('ohlcv-sync')
+        self._lock = threading.Lock()
+        self.counters = {'fresh': 0, 'full_fetches': 0, 'incremental_fetches': 0,
+                         'readjustments': 0, 'ingested': 0, 'bars_written': 0, 'errors': 0}
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run while another worker writes."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def range(self, ticker: str, interval: str = '1d', start: pd.Timestamp = None,
+              end: pd.Timestamp = None) -> pd.DataFrame:
+        """Stored bars with start <= ts <= end, oldest first, indexed by a naive DatetimeIndex."""
+        query = 'SELECT ts, open, high, low, close, volume FROM bars WHERE ticker = ? AND interval = ?'
+        args = [ticker, interval]
+        if start is not None:
+            query += ' AND ts >= ?'
+            args.append(_ts_key(start))
+        if end is not None:
+            query += ' AND ts <= ?'
+            args.append(_ts_key(end))
+        rows = self._conn().execute(query + ' ORDER BY ts', args).fetchall()
+        frame = pd.DataFrame([r[1:] for r in rows], columns=COLUMNS, dtype=float)
+        frame.index = pd.DatetimeIndex([r[0] for r in rows], name='Date')
+        return frame
+
+    def _coverage(self, ticker: str, interval: str):
+        return self._conn().execute(
+            'SELECT first_ts, synced_at FROM coverage WHERE ticker = ? AND interval = ?',
+            (ticker, interval)).fetchone()
+
+    def _last_bar(self, ticker: str, interval: str):
+        return self._conn().execute(
+            'SELECT ts, close FROM bars WHERE ticker = ? AND interval = ? ORDER BY ts DESC LIMIT 1',
+            (ticker, interval)).fetchone()
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def history(self, ticker: str, period: str = '60d', interval: str = '1d',
+                max_age: float = None) -> pd.DataFrame:
+        """
+        Bars for the last `period` (yfinance-style), syncing with the provider first if stale.
+        max_age overrides sync_ttl (0 forces a sync). Serves stored bars if the provider fails.
+        """
+        start = period_start(period)
+        self._flight.do((ticker, interval, _ts_key(start)),
+                        lambda: self.sync(ticker, interval, start, period, max_age))
+        return self.range(ticker, interval, start=start)
+
+    def sync(self, ticker: str, interval: str, start: Optional[pd.Timestamp], period: str,
+             max_age: float = None):
+        max_age = self.sync_ttl if max_age is None else max_age
+        coverage = self._coverage(ticker, interval)
+        covered = coverage is not None and coverage[0] <= _ts_key(start)
+        if covered and time.time() - coverage[1] < max_age:
+            self._count('fresh')
+            return
+        try:
+            last = self._last_bar(ticker, interval)
+            if covered and last is not None:
+                self._sync_incremental(ticker, interval, start, period, last)
+            else:
+                self._sync_full(ticker, interval, start, period, coverage)
+        except Exception as e:
+            self._count('errors')
+            print(f"[OHLCV] {ticker} {interval} sync failed, serving stored bars: {e}")
+
+    def stale(self, tickers: List[str], period: str = '60d', interval: str = '1d') -> List[str]:
+        """The tickers history() would have to sync with the provider first."""
+        start = _ts_key(period_start(period))
+        stale = []
+        for ticker in tickers:
+            coverage = self._coverage(ticker, interval)
+            if coverage is None or coverage[0] > start or time.time() - coverage[1] >= self.sync_ttl:
+                stale.append(ticker)
+        return stale
+
+    def ingest(self, ticker: str, frame: pd.DataFrame, period: str = '60d', interval: str = '1d'):
+        """
+        Store bars fetched elsewhere - e.g. one bulk download for many stale tickers -
+        exactly as a full sync of `period` would, so the next history() reads SQLite.
+        """
+        self._count('ingested')
+        self._store_full(ticker, interval, period_start(period), self._coverage(ticker, interval), frame)
+
+    def _sync_full(self, ticker, interval, start, period, coverage):
+        frame = self.fetch(ticker, period, interval)
+        self._count('full_fetches')
+        self._store_full(ticker, interval, start, coverage, frame)
+
+    def _store_full(self, ticker, interval, start, coverage, frame):
+        if frame is None or frame.empty:
+            return
+        bars = self._rows(frame)
+        conn = self._conn()
+        with conn:
+            first_ts = _ts_key(start)
+            if coverage is not None and not self._matches_stored(ticker, interval, bars):
+                self._count('readjustments')
+                conn.execute('DELETE FROM bars WHERE ticker = ? AND interval = ?', (ticker, interval))
+            elif coverage is not None:
+                first_ts = min(first_ts, coverage[0])
+            self._write(conn, ticker, interval, bars, first_ts)
+
+    def _sync_incremental(self, ticker, interval, start, period, last):
+        last_ts, last_close = last
+        days = (pd.Timestamp.now().normalize() - pd.Timestamp(last_ts).normalize()).days
+        frame = self.fetch(ticker, f"{days + INCREMENTAL_OVERLAP_DAYS}d", interval)
+        self._count('incremental_fetches')
+        if frame is None or frame.empty:
+            return
+        bars = self._rows(frame)
+        overlap = [b for b in bars if b[0] == last_ts]
+        if overlap and abs(overlap[0][4] - last_close) > 1e-6 * abs(last_close):
+            # History was re-adjusted upstream - stored bars no longer line up
+            self._count('readjustments')
+            with self._conn() as conn:
+                conn.execute('DELETE FROM bars WHERE ticker = ? AND interval = ?', (ticker, interval))
+                conn.execute('DELETE FROM coverage WHERE ticker = ? AND interval = ?', (ticker, interval))
+            self._sync_full(ticker, interval, start, period, None)
+            return
+        newer = [b for b in bars if b[0] >= last_ts]  # The last stored bar may still have been forming
+        conn = self._conn()
+        with conn:
+            first_ts = self._coverage(ticker, interval)[0]
+            self._write(conn, ticker, interval, newer, first_ts)
+
+    def _matches_stored(self, ticker, interval, bars) -> bool:
+        """True if the fetched bars agree with the oldest stored bar they overlap."""
+        fetched = {b[0]: b[4] for b in bars}
+        row = self._conn().execute(
+            'SELECT ts, close FROM bars WHERE ticker = ? AND interval = ? AND ts >= ? ORDER BY ts LIMIT 1',
+            (ticker, interval, bars[0][0])).fetchone()
+        if row is None or row[0] not in fetched:
+            return True
+        return abs(fetched[row[0]] - row[1]) <= 1e-6 * abs(row[1])
+
+    @staticmethod
+    def _rows(frame: pd.DataFrame):
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        values = frame[COLUMNS].astype(float).to_numpy()
+        return [(ts.strftime(TS_FORMAT), *map(float, row)) for ts, row in zip(index, values)]
+
+    def _write(self, conn, ticker, interval, bars, first_ts):
+        conn.executemany(
+            'INSERT OR REPLACE INTO bars (ticker, interval, ts, open, high, low, close, volume) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(ticker, interval) + bar for bar in bars])
+        conn.execute('INSERT OR REPLACE INTO coverage (ticker, interval, first_ts, synced_at) VALUES (?, ?, ?, ?)',
+                     (ticker, interval, first_ts, time.time()))
+        self._count('bars_written', len(bars))
+
+    def stats(self) -> Dict:
+        tickers, bars = self._conn().execute('SELECT COUNT(DISTINCT ticker), COUNT(*) FROM bars').fetchone()
+        with self._lock:
+            return dict(self.counters, path=self.path, tickers=tickers, bars=bars, sync_ttl_seconds=self.sync_ttl)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_ohlcv_store() -> OHLCVStore:
+    """Process-wide store on OHLCV_DB_PATH."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = OHLCVStore()
+    return _store
+
+
+if __name__ == '__main__':
+    # Two "workers" sharing one file: the second starts warm, and later syncs only fetch new days
+    import tempfile
+
+    import numpy as np
+
+    days = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=130)
+    rng = np.random.default_rng(3)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+    market = pd.DataFrame({'Open': closes, 'High': closes * 1.01, 'Low': closes * 0.99, 'Close': closes,
+                           'Volume': rng.integers(1e5, 5e6, len(days)).astype(float)},
+                          index=days.tz_localize('America/New_York'))
+    calls = []
+
+    def fake_provider(ticker, period, interval):
+        calls.append(period)
+        time.sleep(0.3)  # A typical yfinance round trip
+        start = period_start(period)
+        return market[market.index.tz_localize(None) >= start].copy()
+
+    path = os.path.join(tempfile.mkdtemp(), 'ohlcv.db')
+    worker_a = OHLCVStore(path, fake_provider)
+    t0 = time.perf_counter()
+    cold = worker_a.history('SPY', '60d')
+    cold_ms = (time.perf_counter() - t0) * 1000
+
+    worker_b = OHLCVStore(path, fake_provider)  # Another process / a restart
+    t0 = time.perf_counter()
+    warm = worker_b.history('SPY', '30d')
+    warm_ms = (time.perf_counter() - t0) * 1000
+
+    worker_b.history('SPY', '60d', max_age=0)  # Stale -> only the last few days are re-fetched
+    worker_b.history('SPY', '6mo')             # Needs older bars -> one full fetch
+
+    print(f"cold 60d: {cold_ms:.0f}ms ({len(cold)} bars), warm 30d from another worker: {warm_ms:.1f}ms")
+    print(f"provider calls: {calls}")
+    print(f"stats: {worker_b.stats()}")
@@ -0,0 +1,184 @@
+"""
+option_chain.py - Compact columnar option chain shared by all providers
+One NumPy array per field; dicts are only built at the JSON boundary
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Float columns in the fixed schema (NaN = missing)
+FLOAT_FIELDS = ('strike', 'bid', 'ask', 'mid', 'last', 'iv', 'delta', 'theta',
+                'volume', 'open_interest')
+
+
+def _opt(value) -> Optional[float]:
+    """NaN -> None for JSON output."""
+    return None if value != value else float(value)
+
+
+def _opt_int(value) -> Optional[int]:
+    return None if value != value else int(value)
+
+
+class OptionChain:
+    """
+    Struct-of-arrays option chain for a single underlying + expiry.
+
+    symbol is an object array, is_call a bool mask, every other field a
+    float64 array with NaN for missing values.
+    """
+
+    __slots__ = ('expiry', 'symbol', 'is_call') + FLOAT_FIELDS
+
+    def __init__(self, expiry: str, symbol, is_call, **columns):
+        self.expiry = expiry
+        self.symbol = np.asarray(symbol, dtype=object)
+        self.is_call = np.asarray(is_call, dtype=bool)
+        n = len(self.symbol)
+        for name in FLOAT_FIELDS:
+            col = columns.get(name)
+            setattr(self, name, np.full(n, np.nan) if col is None else np.asarray(col, dtype=float))
+
+    @classmethod
+    def empty(cls, expiry: str = None) -> 'OptionChain':
+        return cls(expiry, [], [])
+
+    @classmethod
+    def from_records(cls, contracts: List[Dict], expiry: str = None) -> 'OptionChain':
+        """Build from legacy contract dicts (any 'call'/'CALL' casing)."""
+        builder = ChainBuilder(expiry or (contracts[0].get('expiry') if contracts else None))
+        for c in contracts:
+            builder.append(c.get('symbol'), str(c.get('type', '')).lower() == 'call',
+                           **{name: c.get(name) for name in FLOAT_FIELDS})
+        return builder.build()
+
+    @classmethod
+    def concat(cls, chains: List['OptionChain']) -> 'OptionChain':
+        chains = [c for c in chains if len(c)]
+        if not chains:
+            return cls.empty()
+        return cls(
+            chains[0].expiry,
+            np.concatenate([c.symbol for c in chains]),
+            np.concatenate([c.is_call for c in chains]),
+            **{name: np.concatenate([getattr(c, name) for c in chains]) for name in FLOAT_FIELDS}
+        )
+
+    def __len__(self) -> int:
+        return len(self.symbol)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def take(self, indices) -> 'OptionChain':
+        """Subset by index array or boolean mask."""
+        return OptionChain(
+            self.expiry, self.symbol[indices], self.is_call[indices],
+            **{name: getattr(self, name)[indices] for name in FLOAT_FIELDS}
+        )
+
+    def metric_columns(self) -> Dict[str, np.ndarray]:
+        """Keyword arguments for metrics_engine.compute_chain_metrics()."""
+        return {
+            'strike': self.strike,
+            'bid': self.bid,
+            'ask': self.ask,
+            'mid': self.mid,
+            'last': self.last,
+            'iv': self.iv,
+            'volume': self.volume,
+            'open_interest': self.open_interest,
+            'is_call': self.is_call,
+        }
+
+    def record(self, i: int) -> Dict:
+        """Materialize one contract in the legacy dict schema (JSON boundary only)."""
+        return {
+            'symbol': self.symbol[i],
+            'type': 'CALL' if self.is_call[i] else 'PUT',
+            'strike': _opt(self.strike[i]),
+            'expiry': self.expiry,
+            'bid': _opt(self.bid[i]),
+            'ask': _opt(self.ask[i]),
+            'mid': _opt(self.mid[i]),
+            'last': _opt(self.last[i]),
+            'iv': _opt(self.iv[i]),
+            'delta': _opt(self.delta[i]),
+            'theta': _opt(self.theta[i]),
+            'volume': _opt_int(self.volume[i]),
+            'open_interest': _opt_int(self.open_interest[i])
+        }
+
+    def to_records(self, indices=None) -> List[Dict]:
+        if indices is None:
+            indices = range(len(self))
+        return [self.record(int(i)) for i in indices]
+
+
+class ChainBuilder:
+    """
+    Accumulates provider rows straight into column lists (no per-contract dicts).
+    None values become NaN.
+    """
+
+    def __init__(self, expiry: str):
+        self.expiry = expiry
+        self.symbol = []
+        self.is_call = []
+        self.columns = {name: [] for name in FLOAT_FIELDS}
+
+    def append(self, symbol, is_call: bool, **values):
+        self.symbol.append(symbol)
+        self.is_call.append(is_call)
+        for name, col in self.columns.items():
+            value = values.get(name)
+            col.append(np.nan if value is None else value)
+
+    def build(self) -> OptionChain:
+        return OptionChain(self.expiry, self.symbol, self.is_call,
+                           **{name: np.array(col, dtype=float) for name, col in self.columns.items()})
+
+
+def _frame_column(df, name) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), np.nan)
+    return df[name].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _positive_or_nan(values: np.ndarray) -> np.ndarray:
+    """yfinance reports 'no value' as 0 - treat zeros (and NaN) as missing."""
+    return np.where(values > 0, values, np.nan)
+
+
+def chain_from_yfinance(chain, expiry: str) -> OptionChain:
+    """
+    Convert a yfinance option_chain() result (calls/puts DataFrames) column-wise.
+    Zero bid/ask/last/iv/volume/OI are treated as missing, as before.
+    """
+    parts = []
+    for frame, is_call in ((getattr(chain, 'calls', None), True), (getattr(chain, 'puts', None), False)):
+        if frame is None or frame.empty:
+            continue
+        with np.errstate(invalid='ignore'):
+            bid = _positive_or_nan(_frame_column(frame, 'bid'))
+            ask = _positive_or_nan(_frame_column(frame, 'ask'))
+            # Mid only when both sides are quoted
+            mid = (bid + ask) / 2.0
+            parts.append(OptionChain(
+                expiry,
+                frame['contractSymbol'].to_numpy(dtype=object) if 'contractSymbol' in frame.columns else np.full(len(frame), None, dtype=object),
+                np.full(len(frame), is_call),
+                strike=np.nan_to_num(_frame_column(frame, 'strike'), nan=0.0),
+                bid=bid,
+                ask=ask,
+                mid=mid,
+                last=_positive_or_nan(_frame_column(frame, 'lastPrice')),
+                iv=_positive_or_nan(_frame_column(frame, 'impliedVolatility')),
+                # yfinance doesn't provide greeks directly
+                volume=_positive_or_nan(_frame_column(frame, 'volume')),
+                open_interest=_positive_or_nan(_frame_column(frame, 'openInterest'))
+            ))
+    chain_out = OptionChain.concat(parts)
+    chain_out.expiry = expiry
+    return chain_out
@@ -7,6 +7,7 @@ import yfinance as yf
 import json
 from datetime import datetime, timedelta
 import os
+from ohlcv_store import get_ohlcv_store
 
 TRADES_FILE = 'paper_trades.json'
 CAPITAL = 10000  # Start with $10k virtual capital
@@ -32,8 +33,7 @@ def save_trades(data):
 def calculate_rsi(ticker, period=14):
     """Calculate RSI for a ticker"""
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period='1mo')
+        hist = get_ohlcv_store().history(ticker, '1mo')
         
         if hist.empty or len(hist) < period:
             return None
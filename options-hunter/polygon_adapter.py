@@ -0,0 +1,231 @@
+"""
+polygon_adapter.py - Polygon options chain fetcher without N+1 requests
+Pages the chain-level snapshot, pre-filters strikes around spot and only
+hydrates contracts that came back without a quote (in parallel, rate limited).
+Without snapshot access it lists contracts and hydrates each near-the-money one
+from its own snapshot (quote, greeks, volume, open interest)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from option_chain import ChainBuilder, OptionChain
+
+POLYGON_PAGE_LIMIT = 250                                                    # Max page size for snapshot endpoints
+POLYGON_STRIKE_WINDOW = float(os.getenv("POLYGON_STRIKE_WINDOW", "0.25"))   # List strikes within ±25% of spot
+POLYGON_HYDRATE_WINDOW = float(os.getenv("POLYGON_HYDRATE_WINDOW", "0.10"))  # Only hydrate quotes within ±10%
+POLYGON_HYDRATE_WORKERS = int(os.getenv("POLYGON_HYDRATE_WORKERS", "4"))
+POLYGON_RATE_LIMIT = float(os.getenv("POLYGON_RATE_LIMIT", "10"))           # Hydration requests per second
+POLYGON_MAX_PAGES = 20
+
+
+class RateLimiter:
+    """Spaces out request starts to at most `rate` per second across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _snapshot_row(snap: Dict) -> Dict:
+    """One normalized contract row from a Polygon option snapshot result."""
+    details = snap.get('details') or {}
+    quote = snap.get('last_quote') or {}
+    trade = snap.get('last_trade') or {}
+    greeks = snap.get('greeks') or {}
+    day = snap.get('day') or {}
+    return {
+        'symbol': details.get('ticker'),
+        'is_call': (details.get('contract_type') or '').lower() == 'call',
+        'strike': details.get('strike_price'),
+        'bid': quote.get('bid'),
+        'ask': quote.get('ask'),
+        'last': trade.get('price') if trade.get('price') is not None else day.get('close'),
+        'iv': snap.get('implied_volatility', greeks.get('implied_volatility')),
+        'delta': greeks.get('delta'),
+        'theta': greeks.get('theta'),
+        'volume': day.get('volume'),
+        'open_interest': snap.get('open_interest'),
+    }
+
+
+class PolygonChainAdapter:
+    """
+    Fetch a full Polygon chain for one underlying + expiry as an OptionChain.
+
+    Request budget: ceil(contracts_in_window / 250) snapshot pages, plus one
+    quote request per near-the-money contract the snapshot had no quote for
+    (one contract snapshot each, on the contract-list fallback).
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://api.polygon.io",
+                 http_get: Callable = requests.get, strike_window: float = None,
+                 hydrate_window: float = None, hydrate_workers: int = None,
+                 rate_limit: float = None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.http_get = http_get
+        self.strike_window = POLYGON_STRIKE_WINDOW if strike_window is None else strike_window
+        self.hydrate_window = POLYGON_HYDRATE_WINDOW if hydrate_window is None else hydrate_window
+        self.hydrate_workers = hydrate_workers or POLYGON_HYDRATE_WORKERS
+        self.rate_limiter = RateLimiter(POLYGON_RATE_LIMIT if rate_limit is None else rate_limit)
+        self.stats = {'pages': 0, 'hydrated': 0, 'hydrate_errors': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    # ------------------------------------------------------------------
+    # HTTP helpers
+    # ------------------------------------------------------------------
+
+    def _get_json(self, url: str, params: Dict = None, timeout: float = 15) -> Dict:
+        params = dict(params or {})
+        params['apiKey'] = self.api_key
+        r = self.http_get(url, params=params, timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def _paginate(self, url: str, params: Dict) -> List[Dict]:
+        """Follow next_url cursors until exhausted (bounded by POLYGON_MAX_PAGES)."""
+        results = []
+        for _ in range(POLYGON_MAX_PAGES):
+            data = self._get_json(url, params)
+            self._count('pages')
+            results.extend(data.get('results') or [])
+            url = data.get('next_url')
+            if not url:
+                break
+            params = {}  # next_url already carries the cursor and filters
+        return results
+
+    def _strike_filters(self, spot: Optional[float]) -> Dict:
+        if not spot or spot <= 0 or not self.strike_window:
+            return {}
+        return {
+            'strike_price.gte': round(spot * (1 - self.strike_window), 2),
+            'strike_price.lte': round(spot * (1 + self.strike_window), 2),
+        }
+
+    # ------------------------------------------------------------------
+    # Chain fetching
+    # ------------------------------------------------------------------
+
+    def _snapshot_rows(self, ticker: str, expiry: str, spot: Optional[float]) -> List[Dict]:
+        """One normalized row per contract from the chain snapshot endpoint."""
+        params = {'expiration_date': expiry, 'limit': POLYGON_PAGE_LIMIT}
+        params.update(self._strike_filters(spot))
+        snapshots = self._paginate(f"{self.base_url}/v3/snapshot/options/{ticker}", params)
+        return [_snapshot_row(snap) for snap in snapshots]
+
+    def _reference_rows(self, ticker: str, expiry: str, spot: Optional[float]) -> List[Dict]:
+        """Fallback for plans without chain snapshot access: contract list only, hydrated later."""
+        params = {'underlying_ticker': ticker, 'expiration_date': expiry, 'limit': 1000}
+        params.update(self._strike_filters(spot))
+        return [{
+            'symbol': c.get('ticker'),
+            'is_call': (c.get('contract_type') or '').lower() == 'call',
+            'strike': c.get('strike_price'),
+        } for c in self._paginate(f"{self.base_url}/v3/reference/options/contracts", params)]
+
+    def _hydrate_quote(self, row: Dict):
+        """Latest bid/ask for a snapshot row that had every other field but no quote."""
+        self.rate_limiter.wait()
+        try:
+            data = self._get_json(f"{self.base_url}/v3/quotes/{row['symbol']}",
+                                  {'limit': 1, 'order': 'desc', 'sort': 'timestamp'}, timeout=10)
+            if data.get('results'):
+                q = data['results'][0]
+                row['bid'] = q.get('bid_price')
+                row['ask'] = q.get('ask_price')
+            self._count('hydrated')
+        except Exception as e:
+            self._count('hydrate_errors')
+            print(f"[Polygon] Quote error for {row['symbol']}: {e}")
+
+    def _hydrate_contract(self, ticker: str, row: Dict):
+        """
+        Everything the chain snapshot would have carried (quote, last, IV, greeks,
+        volume, open interest) from the contract's own snapshot, then the quotes
+        endpoint if that had no quote either.
+        """
+        self.rate_limiter.wait()
+        try:
+            data = self._get_json(f"{self.base_url}/v3/snapshot/options/{ticker}/{row['symbol']}", timeout=10)
+            snap = _snapshot_row(data.get('results') or {})
+            row.update({k: v for k, v in snap.items() if k not in ('symbol', 'is_call', 'strike')})
+        except Exception as e:
+            print(f"[Polygon] Contract snapshot error for {row['symbol']}: {e}")
+        if row.get('bid') is None or row.get('ask') is None:
+            self._hydrate_quote(row)
+        else:
+            self._count('hydrated')
+
+    def _hydrate(self, ticker: str, rows: List[Dict], spot: Optional[float], full: bool = False):
+        """
+        Fill in near-the-money contracts the listing didn't price: quotes only for
+        snapshot rows, the whole contract snapshot for contract-list rows (full=True).
+        """
+        missing = [r for r in rows if r.get('bid') is None or r.get('ask') is None]
+        if spot and spot > 0:
+            missing = [r for r in missing
+                       if r.get('strike') is not None and abs(r['strike'] - spot) / spot <= self.hydrate_window]
+        if not missing:
+            return
+        hydrate = (lambda row: self._hydrate_contract(ticker, row)) if full else self._hydrate_quote
+        with ThreadPoolExecutor(max_workers=min(self.hydrate_workers, len(missing)),
+                                thread_name_prefix='polygon-hydrate') as pool:
+            list(pool.map(hydrate, missing))
+
+    def fetch_chain(self, ticker: str, expiry: str, spot: float = None) -> OptionChain:
+        try:
+            rows = self._snapshot_rows(ticker, expiry, spot)
+            full = False
+        except Exception as e:
+            print(f"[Polygon] Snapshot unavailable for {ticker} {expiry} ({e}), using contract list")
+            rows = self._reference_rows(ticker, expiry, spot)
+            full = True
+
+        self._hydrate(ticker, rows, spot, full)
+
+        builder = ChainBuilder(expiry)
+        for row in rows:
+            if row.get('strike') is None:
+                continue
+            bid, ask = row.get('bid'), row.get('ask')
+            mid = None
+            if bid is not None and ask is not None and bid >= 0 and ask >= 0:
+                mid = (float(bid) + float(ask)) / 2.0
+            builder.append(
+                row['symbol'], row['is_call'],
+                strike=float(row['strike']),
+                bid=bid,
+                ask=ask,
+                mid=mid,
+                last=row.get('last'),
+                iv=row.get('iv'),
+                delta=row.get('delta'),
+                theta=row.get('theta'),
+                volume=row.get('volume'),
+                open_interest=row.get('open_interest')
+            )
+        return builder.build()
+
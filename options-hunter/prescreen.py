@@ -0,0 +1,220 @@
+"""
+prescreen.py - Full-market scan universe and the cheap pre-screen in front of chain fetches
+The universe is a maintained symbol file (universe.txt). Bulk quotes plus the cached
+indicator snapshot rank it with the confirmation rules that need no option chain, so
+only the top-N survivors cost a chain fetch. ScanFunnel keeps counts and timings per stage
+"""
+
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from signals import DEFAULT_WEIGHTS, ScoringWeights, compute_confidence_batch
+
+UNIVERSE_FILE = os.getenv("UNIVERSE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "universe.txt"))
+PRESCREEN_TOP_N = int(os.getenv("PRESCREEN_TOP_N", "50"))                        # Survivors that get a chain fetch
+PRESCREEN_MIN_PRICE = float(os.getenv("PRESCREEN_MIN_PRICE", "5"))               # Sub-$5 names rarely have usable chains
+PRESCREEN_MIN_AVG_VOLUME = float(os.getenv("PRESCREEN_MIN_AVG_VOLUME", "500000"))  # 20-day average shares per day
+
+_universe_files = {}  # path -> (mtime, symbols)
+
+
+def read_universe(path: str = UNIVERSE_FILE) -> List[str]:
+    """
+    Symbols from a universe file in file order, upper-cased and de-duplicated.
+    Whitespace separates symbols, '#' starts a comment. Re-read only when the file changes.
+    """
+    mtime = os.path.getmtime(path)
+    cached = _universe_files.get(path)
+    if cached is None or cached[0] != mtime:
+        symbols = []
+        with open(path) as f:
+            for line in f:
+                symbols.extend(line.split('#', 1)[0].upper().split())
+        cached = _universe_files[path] = (mtime, list(dict.fromkeys(symbols)))
+    return list(cached[1])
+
+
+class ScanFunnel:
+    """Tickers left and milliseconds spent after each stage of a scan, in the order they ran."""
+
+    def __init__(self):
+        self.stages = []
+
+    def add(self, stage: str, count: int, seconds: float, **detail):
+        """detail: extra per-stage counts, e.g. missing=... for tickers the stage had no data for."""
+        self.stages.append(dict({'stage': stage, 'count': int(count), 'ms': round(seconds * 1000, 1)}, **detail))
+
+    def as_dict(self) -> Dict:
+        return {'stages': list(self.stages), 'total_ms': round(sum(s['ms'] for s in self.stages), 1)}
+
+    def summary(self) -> str:
+        parts = []
+        for s in self.stages:
+            detail = ''.join(f", {k} {v}" for k, v in s.items() if k not in ('stage', 'count', 'ms'))
+            parts.append(f"{s['stage']} {s['count']} ({s['ms']:.0f}ms{detail})")
+        return ' -> '.join(parts)
+
+
+class PrescreenResult:
+    """
+    prescreen_universe() output: survivors (tickers, best first) and one candidate
+    dict per survivor - ticker, price, dollar_volume, direction, score, confirmations.
+    """
+
+    def __init__(self, candidates: List[Dict]):
+        self.candidates = candidates
+        self.survivors = [c['ticker'] for c in candidates]
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+
+def _sector_inputs(tickers: Sequence[str], indicators: Dict[str, Optional[Dict]], sector_of: Dict[str, str]):
+    """sector_price_change / sector_above_ema20 columns, None where there is no sector ETF reading."""
+    change, above = [], []
+    for ticker in tickers:
+        etf = indicators.get(sector_of.get(ticker))
+        if etf:
+            change.append(etf['price_change_pct'])
+            above.append((etf['price'] > etf['ema20']) if etf['ema20'] else None)
+        else:
+            change.append(None)
+            above.append(None)
+    return change, above
+
+
+def prescreen_universe(tickers: Sequence[str],
+                       get_quotes: Callable[[List[str]], Dict[str, Optional[Dict]]],
+                       get_indicators: Callable[[List[str]], Dict[str, Optional[Dict]]],
+                       sector_of: Dict[str, str] = None,
+                       top_n: int = PRESCREEN_TOP_N,
+                       direction: Optional[str] = None,
+                       min_score: float = 0,
+                       weights: ScoringWeights = DEFAULT_WEIGHTS,
+                       min_price: float = PRESCREEN_MIN_PRICE,
+                       min_avg_volume: float = PRESCREEN_MIN_AVG_VOLUME,
+                       funnel: ScanFunnel = None) -> PrescreenResult:
+    """
+    Rank a large universe without touching option chains:
+
+      quotes      get_quotes(tickers) -> {ticker: {'price': ...} or None}, one bulk lookup
+      indicators  get_indicators(...) -> {ticker: get_technical_indicators() dict or None}
+                  for the quoted tickers plus their sector ETFs (sector_of); quoted
+                  tickers without indicators are the stage's `missing` count
+      liquidity   live price >= min_price and 20-day average volume >= min_avg_volume
+      signals     trend / RSI / volume / sector confirmations for `direction` ('call',
+                  'put', or None for the better of the two) scored with weights;
+                  tickers under min_score are dropped
+      top_n       best score first, ties to the larger dollar volume
+
+    IV rank and the event penalties need the chain or apply to every ticker alike,
+    so they are left out: a contract's confidence can exceed its ticker's score by at
+    most weights.iv, and min_score = threshold - weights.iv drops nothing that could pass.
+    Each stage is added to funnel when one is given.
+    """
+    sector_of = sector_of or {}
+    funnel = funnel if funnel is not None else ScanFunnel()
+
+    started = time.perf_counter()
+    quotes = get_quotes(list(tickers))
+    quoted = [t for t in tickers if quotes.get(t)]
+    funnel.add('quotes', len(quoted), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    etfs = [etf for etf in dict.fromkeys(sector_of.get(t) for t in quoted) if etf]
+    indicators = get_indicators(list(dict.fromkeys(quoted + etfs)))
+    with_indicators = [t for t in quoted if indicators.get(t)]
+    funnel.add('indicators', len(with_indicators), time.perf_counter() - started,
+               missing=len(quoted) - len(with_indicators))
+
+    started = time.perf_counter()
+    liquid = [t for t in with_indicators
+              if quotes[t]['price'] >= min_price and (indicators[t]['avg_volume_20'] or 0) >= min_avg_volume]
+    funnel.add('liquidity', len(liquid), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    candidates = []
+    if liquid:
+        rows = [indicators[t] for t in liquid]
+        sector_change, sector_above = _sector_inputs(liquid, indicators, sector_of)
+        directions = [direction] if direction else ['call', 'put']
+        n = len(liquid)
+
+        def column(name):
+            return np.tile(np.array([np.nan if r[name] is None else r[name] for r in rows], dtype=float),
+                           len(directions))
+
+        batch = compute_confidence_batch({
+            'direction': np.repeat(directions, n),
+            'price': column('price'),
+            'ema9': column('ema9'),
+            'ema20': column('ema20'),
+            'rsi': column('rsi'),
+            'rsi_slope': column('rsi_slope'),
+            'volume': column('volume'),
+            'avg_volume_20': column('avg_volume_20'),
+            'price_change_pct': column('price_change_pct'),
+            'sector_price_change': sector_change * len(directions),
+            'sector_above_ema20': sector_above * len(directions),
+            'iv_rank': None,
+            'has_near_earnings': False,
+            'has_major_macro_event': False,
+        }, weights)
+        scores = batch.confidence.reshape(len(directions), n)
+        best = scores.argmax(axis=0)                    # Calls win ties
+        score = scores[best, np.arange(n)]
+        price = np.array([quotes[t]['price'] for t in liquid], dtype=float)
+        dollar_volume = price * column('avg_volume_20')[:n]
+
+        keep = np.flatnonzero(score >= min_score)
+        order = keep[np.lexsort((-dollar_volume[keep], -score[keep]))][:top_n]
+        for i in order:
+            result = batch.result(best[i] * n + i)
+            candidates.append({
+                'ticker': liquid[i],
+                'price': float(price[i]),
+                'dollar_volume': round(float(dollar_volume[i]), 0),
+                'direction': directions[best[i]],
+                'score': result.confidence,
+                'confirmations': result.confirmations,
+            })
+        funnel.add('signals', len(keep), time.perf_counter() - started)
+    else:
+        funnel.add('signals', 0, time.perf_counter() - started)
+    funnel.add('top_n', len(candidates), 0.0)
+    return PrescreenResult(candidates)
+
+
+if __name__ == '__main__':
+    # Pre-screen cost over the shipped universe with synthetic quotes/indicators
+    # (agreement with compute_confidence() lives in tests/test_prescreen.py)
+    symbols = read_universe()
+    rng = np.random.default_rng(25)
+    sectors = {t: rng.choice(['XLK', 'XLF', 'XLE', 'XLV']) for t in symbols[::3]}
+    fake_indicators = {}
+    for ticker in symbols + ['XLK', 'XLF', 'XLE', 'XLV']:
+        price = float(rng.uniform(1, 600))
+        fake_indicators[ticker] = {
+            'price': price,
+            'ema9': price * rng.uniform(0.96, 1.04),
+            'ema20': price * rng.uniform(0.93, 1.07),
+            'rsi': rng.uniform(20, 80),
+            'rsi_slope': rng.normal(0, 3),
+            'volume': float(rng.lognormal(14, 1)),
+            'avg_volume_20': float(rng.lognormal(14, 1)),
+            'price_change_pct': rng.normal(0, 1.5),
+        }
+    fake_quotes = {t: {'price': i['price']} for t, i in fake_indicators.items()}
+
+    for direction, min_score in ((None, 0), ('call', 30), ('put', 15)):
+        funnel = ScanFunnel()
+        t0 = time.perf_counter()
+        screened = prescreen_universe(symbols, lambda ts: {t: fake_quotes.get(t) for t in ts},
+                                      lambda ts: {t: fake_indicators.get(t) for t in ts}, sectors, top_n=60,
+                                      direction=direction, min_score=min_score, funnel=funnel)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        print(f"direction={direction or 'best'} min_score={min_score}: {funnel.summary()} "
+              f"[{elapsed_ms:.1f}ms, top {screened.candidates[0]['ticker']} {screened.candidates[0]['score']}]")
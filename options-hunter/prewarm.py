@@ -0,0 +1,267 @@
+"""
+prewarm.py - Background refresher that keeps the default universe warm
+Re-fetches prices, chains and indicators on a market-hours-aware schedule
+so user requests are served from caches instead of hitting providers
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as dtime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from zoneinfo import ZoneInfo
+    MARKET_TZ = ZoneInfo("America/New_York")
+except Exception:  # Python < 3.9 or no tz database - fall back to UTC-5
+    from datetime import timezone
+    MARKET_TZ = timezone(timedelta(hours=-5))
+
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "true").lower() != "false"
+PREWARM_INTERVAL = float(os.getenv("PREWARM_INTERVAL", "60"))                # Seconds between cycles while the market is open
+PREWARM_CLOSED_INTERVAL = float(os.getenv("PREWARM_CLOSED_INTERVAL", "1800"))  # ... and while it is closed
+PREWARM_STAGGER = float(os.getenv("PREWARM_STAGGER", "0.5"))                 # Max pause between tickers
+
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+PRE_OPEN = dtime(9, 15)  # Start warming a bit before the bell
+
+
+def market_session(now: datetime = None) -> str:
+    """'open', 'pre' (15 min before the bell) or 'closed'. Exchange holidays are not modelled."""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    if now.weekday() >= 5:
+        return 'closed'
+    t = now.time()
+    if MARKET_OPEN <= t < MARKET_CLOSE:
+        return 'open'
+    if PRE_OPEN <= t < MARKET_OPEN:
+        return 'pre'
+    return 'closed'
+
+
+def seconds_until_pre_open(now: datetime = None) -> float:
+    """Seconds until the next weekday PRE_OPEN while the market is closed; inf during 'pre'/'open'."""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    if market_session(now) != 'closed':
+        return float('inf')
+    day = now.date() + timedelta(days=1 if now.time() >= PRE_OPEN else 0)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return datetime.combine(day, PRE_OPEN, tzinfo=MARKET_TZ).timestamp() - now.timestamp()
+
+
+@dataclass
+class PrewarmTask:
+    """
+    One thing to keep warm. Per-ticker tasks get fn(ticker); batch tasks get
+    fn(tickers) once per cycle, or at most every min_interval seconds when that
+    is longer than a cycle. A falsy return value counts as a failure.
+    """
+    name: str
+    fn: Callable
+    tickers: List[str]
+    batch: bool = False
+    min_interval: float = 0.0
+    last_run_at: Optional[float] = None
+    ok: int = 0
+    failed: int = 0
+    last_ms: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def due(self, now: float = None) -> bool:
+        """Whether min_interval has passed since the last run."""
+        now = time.monotonic() if now is None else now
+        return self.last_run_at is None or now - self.last_run_at >= self.min_interval
+
+    def run(self, arg) -> bool:
+        self.last_run_at = time.monotonic()
+        start = time.perf_counter()
+        label = f"{len(arg)} tickers" if self.batch else arg
+        try:
+            success = bool(self.fn(arg))
+            if not success:
+                self.last_error = f"no data for {label}"
+        except Exception as e:
+            success = False
+            self.last_error = f"{label}: {e}"
+        self.last_ms = round((time.perf_counter() - start) * 1000.0, 1)
+        if success:
+            self.ok += 1
+        else:
+            self.failed += 1
+        return success
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'task': self.name,
+            'tickers': len(self.tickers),
+            'ok': self.ok,
+            'failed': self.failed,
+            'last_ms': self.last_ms,
+            'last_error': self.last_error,
+        }
+
+
+@dataclass
+class CycleReport:
+    session: str
+    started_at: str
+    duration_ms: float = 0.0
+    refreshed: int = 0
+    failed: int = 0
+
+
+class PrewarmScheduler:
+    """
+    Daemon thread running refresh cycles. Batch tasks run first, then each
+    ticker's per-ticker tasks, pausing between tickers so a cycle is spread
+    out instead of bursting every provider at once.
+
+    With a shared cache backend every gunicorn worker starts a scheduler, but
+    only the one holding lock_key runs cycles - the rest skip them and take
+    over when the leader stops renewing the lock.
+    """
+
+    def __init__(self, tasks: List[PrewarmTask], interval: float = None,
+                 closed_interval: float = None, stagger: float = None,
+                 backend=None, lock_key: str = 'prewarm:leader'):
+        self.tasks = tasks
+        self.interval = interval or PREWARM_INTERVAL
+        self.closed_interval = closed_interval or PREWARM_CLOSED_INTERVAL
+        self.stagger = PREWARM_STAGGER if stagger is None else stagger
+        self.cycles = 0
+        self.last_cycle: Optional[CycleReport] = None
+        self.next_cycle_at: Optional[float] = None
+        self.backend = backend
+        self.lock_key = lock_key
+        self.skipped = 0
+        self._token: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start the background thread (no-op if already running)."""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='prewarm', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+
+    def interval_for(self, session: str) -> float:
+        return self.interval if session in ('open', 'pre') else self.closed_interval
+
+    def run_cycle(self) -> CycleReport:
+        session = market_session()
+        report = CycleReport(session=session, started_at=datetime.utcnow().isoformat() + 'Z')
+        start = time.perf_counter()
+
+        for task in self.tasks:
+            if task.batch and task.tickers and task.due():
+                if task.run(task.tickers):
+                    report.refreshed += 1
+                else:
+                    report.failed += 1
+
+        per_ticker = [t for t in self.tasks if not t.batch]
+        tickers = list(dict.fromkeys(sym for t in per_ticker for sym in t.tickers))
+        # Spread the cycle over at most half the interval
+        pause = min(self.stagger, self.interval_for(session) / 2 / max(1, len(tickers)))
+        for ticker in tickers:
+            if self._stop.is_set():
+                break
+            for task in per_ticker:
+                if ticker in task.tickers:
+                    if task.run(ticker):
+                        report.refreshed += 1
+                    else:
+                        report.failed += 1
+            self._stop.wait(pause)
+
+        report.duration_ms = round((time.perf_counter() - start) * 1000.0, 1)
+        self.cycles += 1
+        self.last_cycle = report
+        return report
+
+    @property
+    def leader(self) -> bool:
+        return self.backend is None or self._token is not None
+
+    def lead_cycle(self) -> Optional[CycleReport]:
+        """
+        Run a cycle if this process holds the prewarm lock, else count a skip
+        and return None. The leader renews the lock every cycle for two
+        intervals, so a worker that dies hands over within that window. A
+        backend error yields a '' token and the cycle runs locally.
+        """
+        if self.backend is not None:
+            if self._token:
+                self.backend.try_release(self.lock_key, self._token)
+            self._token = self.backend.try_acquire(self.lock_key, 2 * self.interval_for(market_session()))
+            if self._token is None:
+                self.skipped += 1
+                return None
+        return self.run_cycle()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                report = self.lead_cycle()
+                if report is not None:
+                    print(f"[Prewarm] {report.session} cycle: {report.refreshed} refreshed, "
+                          f"{report.failed} failed in {report.duration_ms:.0f}ms")
+            except Exception as e:
+                print(f"[Prewarm] Cycle error: {e}")
+            wait = max(0.0, self.interval_for(market_session()) - (time.monotonic() - started))
+            wait = min(wait, seconds_until_pre_open())  # A closed-market wait never runs past the pre-open
+            self.next_cycle_at = time.time() + wait
+            self._stop.wait(wait)
+        if self.backend is not None and self._token:
+            self.backend.try_release(self.lock_key, self._token)
+        self._token = None
+
+    def status(self) -> Dict[str, Any]:
+        session = market_session()
+        last = self.last_cycle
+        return {
+            'running': self.running,
+            'market_session': session,
+            'interval_seconds': self.interval_for(session),
+            'cycles': self.cycles,
+            'leader': self.leader,
+            'skipped_cycles': self.skipped,
+            'last_cycle': None if last is None else {
+                'session': last.session,
+                'started_at': last.started_at,
+                'duration_ms': last.duration_ms,
+                'refreshed': last.refreshed,
+                'failed': last.failed,
+            },
+            'next_cycle_in_seconds': round(max(0.0, self.next_cycle_at - time.time()), 1)
+                                     if self.next_cycle_at else None,
+            'tasks': [t.as_dict() for t in self.tasks],
+        }
+
+
+if __name__ == '__main__':
+    calls = []
+    scheduler = PrewarmScheduler([
+        PrewarmTask('prices', lambda ts: calls.append(('prices', len(ts))) or True, ['SPY', 'QQQ', 'XLK'], batch=True),
+        PrewarmTask('indicators', lambda t: calls.append(('indicators', t)) or True, ['SPY', 'QQQ', 'XLK']),
+        PrewarmTask('chain', lambda t: calls.append(('chain', t)) or t != 'QQQ', ['SPY', 'QQQ']),
+    ], interval=1, stagger=0.05)
+    print(market_session(), scheduler.run_cycle())
+    print(calls)
+    print(scheduler.status())
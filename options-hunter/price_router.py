@@ -0,0 +1,205 @@
+"""
+price_router.py - Hedged price lookups across the quote providers
+Races the next provider after a short delay, orders providers by observed
+health and skips failing ones behind a circuit breaker
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional, Tuple
+
+from scan_executor import provider_slot
+
+PRICE_HEDGE_ENABLED = os.getenv("PRICE_HEDGE_ENABLED", "true").lower() != "false"
+PRICE_HEDGE_DELAY = float(os.getenv("PRICE_HEDGE_DELAY", "0.75"))          # Seconds before firing the next provider
+PRICE_BREAKER_FAILURES = int(os.getenv("PRICE_BREAKER_FAILURES", "3"))     # Consecutive failures that open the circuit
+PRICE_BREAKER_COOLDOWN = float(os.getenv("PRICE_BREAKER_COOLDOWN", "60"))  # Seconds before a half-open retry
+PRICE_ROUTER_WORKERS = int(os.getenv("PRICE_ROUTER_WORKERS", "16"))
+HEALTH_EWMA_ALPHA = 0.2  # Weight of the newest observation in the rolling averages
+
+
+class ProviderHealth:
+    """Rolling success rate / latency plus circuit breaker state for one provider."""
+
+    def __init__(self, name: str, position: int):
+        self.name = name
+        self.position = position      # Configured order, used to break ties
+        self.success_rate = 1.0       # EWMA of 1 (valid price) / 0 (failure)
+        self.latency_ms = None        # EWMA of call duration
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.opened_at = None         # Set while the circuit is open
+        self.inflight = {}            # call id -> start time (monotonic)
+
+    def record(self, ok: bool, elapsed_ms: float, failure_threshold: int):
+        self.calls += 1
+        self.success_rate += HEALTH_EWMA_ALPHA * ((1.0 if ok else 0.0) - self.success_rate)
+        self.latency_ms = elapsed_ms if self.latency_ms is None else \
+            self.latency_ms + HEALTH_EWMA_ALPHA * (elapsed_ms - self.latency_ms)
+        if ok:
+            self.consecutive_failures = 0
+            self.opened_at = None
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def expected_cost(self, now: float) -> float:
+        """
+        Expected ms to get a valid price; unseen providers cost nothing so they get tried.
+        A call that is still running counts as at least as slow as it has been so far.
+        """
+        latency = self.latency_ms or 0.0
+        if self.inflight:
+            latency = max(latency, (now - min(self.inflight.values())) * 1000.0)
+        return latency / max(self.success_rate, 0.05)
+
+    def as_dict(self) -> Dict:
+        return {
+            'provider': self.name,
+            'state': 'open' if self.opened_at is not None else 'closed',
+            'success_rate': round(self.success_rate, 3),
+            'latency_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            'calls': self.calls,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+        }
+
+
+class HedgedPriceRouter:
+    """
+    Fetch a price from the healthiest provider, hedging with the next one.
+
+    providers is [(name, fetch_fn)] in preferred order; fetch_fn(ticker) returns
+    a float price or None. fetch() returns (name, price) or None.
+    """
+
+    def __init__(self, providers: List[Tuple[str, Callable]], hedge_delay: float = None,
+                 hedged: bool = None, failure_threshold: int = None, cooldown: float = None,
+                 max_workers: int = None):
+        self.providers = list(providers)
+        self.hedge_delay = PRICE_HEDGE_DELAY if hedge_delay is None else hedge_delay
+        self.hedged = PRICE_HEDGE_ENABLED if hedged is None else hedged
+        self.failure_threshold = failure_threshold or PRICE_BREAKER_FAILURES
+        self.cooldown = PRICE_BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.health = {name: ProviderHealth(name, i) for i, (name, _) in enumerate(self.providers)}
+        self._lock = threading.Lock()
+        # Losing hedges keep running here and still feed the scoreboard
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or PRICE_ROUTER_WORKERS,
+                                        thread_name_prefix='price')
+
+    def ordered_providers(self) -> List[Tuple[str, Callable]]:
+        """Closed (or half-open) providers, cheapest expected cost first."""
+        now = time.monotonic()
+        available = []
+        with self._lock:
+            for name, fn in self.providers:
+                health = self.health[name]
+                if health.opened_at is not None:
+                    if now - health.opened_at < self.cooldown:
+                        continue
+                    # Half-open: let this one call through, keep the circuit shut for others
+                    health.opened_at = now
+                available.append((health.expected_cost(now), health.position, name, fn))
+        available.sort(key=lambda item: (item[0], item[1]))
+        return [(name, fn) for _, _, name, fn in available]
+
+    def _call(self, name: str, fetch_fn: Callable, ticker: str) -> Optional[float]:
+        call_id = object()
+        start = time.monotonic()
+        with self._lock:
+            self.health[name].inflight[call_id] = start
+        price = None
+        try:
+            with provider_slot(name):
+                price = fetch_fn(ticker)
+        except Exception as e:
+            print(f"[{name}] {ticker} error: {e}")
+        ok = price is not None and price > 0
+        with self._lock:
+            health = self.health[name]
+            del health.inflight[call_id]
+            health.record(ok, (time.monotonic() - start) * 1000.0, self.failure_threshold)
+        return price if ok else None
+
+    def fetch(self, ticker: str) -> Optional[Tuple[str, float]]:
+        candidates = self.ordered_providers()
+        if not candidates:
+            # Every breaker is open - still try rather than fail outright
+            candidates = list(self.providers)
+
+        if not self.hedged:
+            for name, fn in candidates:
+                price = self._call(name, fn, ticker)
+                if price is not None:
+                    return name, price
+            return None
+
+        pending = {}
+        next_index = 0
+
+        def launch():
+            nonlocal next_index
+            name, fn = candidates[next_index]
+            next_index += 1
+            pending[self._pool.submit(self._call, name, fn, ticker)] = name
+
+        launch()
+        while pending:
+            more = next_index < len(candidates)
+            done, _ = wait(pending, timeout=self.hedge_delay if more else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                # Slowest path: hedge with the next provider while this one keeps going
+                launch()
+                continue
+            for future in done:
+                name = pending.pop(future)
+                price = future.result()
+                if price is not None:
+                    return name, price
+            # A provider failed outright - replace it now instead of waiting out the hedge delay
+            if more:
+                launch()
+        return None
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [self.health[name].as_dict() for name, _ in self.providers]
+
+
+if __name__ == '__main__':
+    # Simulated providers: a rate-limited slow primary, a flaky one and a steady one
+    import random
+
+    def slow_rate_limited(ticker):
+        time.sleep(2.0)
+        return None
+
+    def flaky(ticker):
+        time.sleep(0.05)
+        if random.random() < 0.5:
+            raise RuntimeError('503')
+        return 101.0
+
+    def steady(ticker):
+        time.sleep(0.2)
+        return 100.0
+
+    random.seed(7)
+    providers = [('AlphaVantage', slow_rate_limited), ('Finnhub', flaky), ('IEX', steady)]
+    for label, router in (('sequential', HedgedPriceRouter(providers, hedged=False, cooldown=3600)),
+                          ('hedged', HedgedPriceRouter(providers, hedge_delay=0.25, cooldown=3600))):
+        timings, sources = [], []
+        for i in range(10):
+            t0 = time.perf_counter()
+            sources.append(router.fetch(f"T{i}")[0])
+            timings.append(time.perf_counter() - t0)
+        print(f"{label:>10}: first lookup {timings[0]:.2f}s, next 9 avg {sum(timings[1:]) / 9:.2f}s, "
+              f"sources {sources}")
+        for row in router.stats():
+            print(f"            {row}")
@@ -0,0 +1,184 @@
+"""
+scan_executor.py - Bounded-concurrency fan-out for multi-ticker scans
+Runs per-ticker fetches in parallel with per-provider limits and an overall deadline
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SCAN_MAX_WORKERS = int(os.getenv("SCAN_MAX_WORKERS", "8"))
+SCAN_DEADLINE_SECONDS = float(os.getenv("SCAN_DEADLINE_SECONDS", "25"))
+DEFAULT_PROVIDER_LIMIT = int(os.getenv("SCAN_PROVIDER_LIMIT", "4"))
+
+# Max in-flight calls per provider across ALL concurrent scans (tunable)
+PROVIDER_LIMITS = {
+    'AlphaVantage': 1,  # Free tier is 5 calls/min - never hammer it in parallel
+    'Finnhub': 4,
+    'IEX': 4,
+    'Yahoo': 4,
+    'Polygon': 2,
+    'Tradier': 4,
+}
+
+# Optional override, e.g. SCAN_PROVIDER_LIMITS="Tradier=8,Polygon=1"
+for _pair in os.getenv("SCAN_PROVIDER_LIMITS", "").split(","):
+    if "=" in _pair:
+        _name, _limit = _pair.split("=", 1)
+        try:
+            PROVIDER_LIMITS[_name.strip()] = max(1, int(_limit))
+        except ValueError:
+            pass
+
+_provider_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+def _get_semaphore(provider: str) -> threading.BoundedSemaphore:
+    with _semaphores_lock:
+        sem = _provider_semaphores.get(provider)
+        if sem is None:
+            sem = threading.BoundedSemaphore(PROVIDER_LIMITS.get(provider, DEFAULT_PROVIDER_LIMIT))
+            _provider_semaphores[provider] = sem
+        return sem
+
+
+@contextmanager
+def provider_slot(provider: str):
+    """
+    Hold one of the provider's concurrency slots for the duration of a call.
+    Shared by every scan running in this process.
+    """
+    sem = _get_semaphore(provider)
+    sem.acquire()
+    try:
+        yield
+    finally:
+        sem.release()
+
+
+@dataclass
+class TickerTiming:
+    """Per-ticker timing breakdown reported back to the client"""
+    ticker: str
+    status: str = 'pending'  # ok | no_price | no_chain | empty | error | timeout
+    stages: Dict[str, float] = field(default_factory=dict)  # stage name -> ms
+    total_ms: float = 0.0
+    error: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Record wall-clock ms spent in a named stage (price, chain, ...)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round((time.perf_counter() - start) * 1000.0, 1)
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = {
+            'ticker': self.ticker,
+            'status': self.status,
+            'total_ms': self.total_ms,
+            'stages_ms': dict(self.stages),
+        }
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+@dataclass
+class ScanReport:
+    """Outcome of a fan-out scan. results only holds tickers that finished in time."""
+    results: Dict[str, Any]
+    timings: List[TickerTiming]
+    timed_out: List[str]
+    elapsed_ms: float
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.timed_out)
+
+    def timings_as_dicts(self) -> List[Dict[str, Any]]:
+        return [t.as_dict() for t in self.timings]
+
+
+class ScanExecutor:
+    """
+    Fan a per-ticker fetch function out over a thread pool.
+
+    fetch_fn(ticker, timing) does the I/O for one ticker and returns its result
+    (or None). It may set timing.status itself to explain an empty result.
+    """
+
+    def __init__(self, max_workers: int = None, deadline_seconds: float = None):
+        self.max_workers = max_workers or SCAN_MAX_WORKERS
+        self.deadline_seconds = deadline_seconds if deadline_seconds is not None else SCAN_DEADLINE_SECONDS
+
+    def _run_one(self, ticker: str, fetch_fn: Callable, timing: TickerTiming) -> Any:
+        start = time.perf_counter()
+        try:
+            result = fetch_fn(ticker, timing)
+            if timing.status == 'pending':
+                timing.status = 'ok' if result is not None else 'empty'
+            return result
+        except Exception as e:
+            timing.status = 'error'
+            timing.error = str(e)
+            print(f"[Scan] {ticker} error: {e}")
+            return None
+        finally:
+            timing.total_ms = round((time.perf_counter() - start) * 1000.0, 1)
+
+    def iter_results(self, tickers: List[str], fetch_fn: Callable,
+                     timings: Dict[str, TickerTiming] = None) -> Iterator[Tuple[str, Any, TickerTiming]]:
+        """
+        Yield (ticker, result, timing) as each ticker finishes.
+        Stops at the deadline; unfinished tickers are marked 'timeout' in timings.
+        """
+        if timings is None:
+            timings = {}
+        for ticker in tickers:
+            timings.setdefault(ticker, TickerTiming(ticker=ticker))
+
+        deadline = time.monotonic() + self.deadline_seconds
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(tickers) or 1)),
+                                      thread_name_prefix='scan')
+        futures = {executor.submit(self._run_one, t, fetch_fn, timings[t]): t for t in tickers}
+        pending = set(futures)
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ticker = futures[future]
+                    yield ticker, future.result(), timings[ticker]
+        finally:
+            for future in pending:
+                future.cancel()
+                timing = timings[futures[future]]
+                timing.status = 'timeout'
+            # Don't block the request on stragglers - they finish (and fill caches) in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, tickers: List[str], fetch_fn: Callable) -> ScanReport:
+        """Run the whole fan-out and return results plus per-ticker timings, in input order."""
+        start = time.perf_counter()
+        timings: Dict[str, TickerTiming] = {}
+        results = {}
+        for ticker, result, _ in self.iter_results(tickers, fetch_fn, timings):
+            results[ticker] = result
+
+        timed_out = [t for t in tickers if timings[t].status == 'timeout']
+        return ScanReport(
+            results={t: results[t] for t in tickers if t in results},
+            timings=[timings[t] for t in tickers],
+            timed_out=timed_out,
+            elapsed_ms=round((time.perf_counter() - start) * 1000.0, 1)
+        )
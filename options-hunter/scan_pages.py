@@ -0,0 +1,108 @@
+"""
+scan_pages.py - Cursor pagination and the compact response shape for /api/scan
+Cursors are opaque tokens pointing into a cached, already-ranked scan result;
+the compact shape lists per-ticker fields once instead of on every opportunity
+"""
+
+import base64
+import json
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Identical for every opportunity on the same ticker within one scan
+TICKER_FIELDS = ('spot', 'price_source', 'price_timestamp', 'options_source', 'options_timestamp')
+
+
+def encode_cursor(budget: float, expiry: str, tickers: List[str], limit: Optional[int],
+                  scan_id: str, offset: int) -> str:
+    """The cursor carries the scan parameters, so follow-up requests only need ?cursor=."""
+    payload = {'b': budget, 'e': expiry, 't': tickers, 'l': limit, 's': scan_id, 'o': offset}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _valid_payload(payload) -> bool:
+    """Every field has the type encode_cursor() writes - the values end up in cache keys."""
+    if not isinstance(payload, dict) or not {'b', 'e', 't', 'l', 's', 'o'} <= payload.keys():
+        return False
+    return ((_is_int(payload['b']) or isinstance(payload['b'], float))
+            and isinstance(payload['e'], str)
+            and isinstance(payload['s'], str)
+            and isinstance(payload['t'], list) and all(isinstance(t, str) for t in payload['t'])
+            and (payload['l'] is None or _is_int(payload['l']))
+            and _is_int(payload['o']) and payload['o'] >= 0)
+
+
+def decode_cursor(cursor: str) -> Optional[Dict]:
+    """Cursor payload dict, or None if it isn't one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    return payload if _valid_payload(payload) else None
+
+
+def parse_page_size(raw: str) -> Tuple[Optional[int], Optional[str]]:
+    """(page_size, error) - blank means DEFAULT_PAGE_SIZE; capped at MAX_PAGE_SIZE."""
+    if not raw:
+        return DEFAULT_PAGE_SIZE, None
+    try:
+        value = int(raw)
+    except ValueError:
+        return None, 'Invalid page_size parameter'
+    if value <= 0:
+        return None, 'page_size must be positive'
+    return min(value, MAX_PAGE_SIZE), None
+
+
+def compact_opportunities(opportunities: List[Dict]) -> Tuple[Dict[str, Dict], List[Dict]]:
+    """
+    Split opportunities into ({ticker: shared fields}, slimmed opportunities).
+    Each slim opportunity keeps its 'ticker' to look the shared fields back up.
+    """
+    tickers: Dict[str, Dict] = {}
+    slim = []
+    for opp in opportunities:
+        ticker = opp['ticker']
+        if ticker not in tickers:
+            tickers[ticker] = {field: opp.get(field) for field in TICKER_FIELDS}
+        slim.append({k: v for k, v in opp.items() if k not in TICKER_FIELDS})
+    return tickers, slim
+
+
+def compact_result(result: Dict) -> Dict:
+    """A scan response dict in the compact shape (highlights stay full)."""
+    tickers, slim = compact_opportunities(result['opportunities'])
+    return dict(result, opportunities=slim, tickers=tickers, shape='compact')
+
+
+if __name__ == '__main__':
+    # Payload size of the full vs compact shape for a 2,000-opportunity scan
+    import random
+
+    random.seed(5)
+    opportunities = []
+    for rank in range(1, 2001):
+        ticker = random.choice(['SPY', 'QQQ', 'AAPL', 'MSFT', 'NVDA', 'TSLA', 'AMZN', 'META'])
+        opportunities.append({
+            'ticker': ticker, 'spot': 512.34, 'price_source': 'Tradier',
+            'price_timestamp': '2026-10-16T15:30:00.123456Z', 'options_source': 'Tradier',
+            'options_timestamp': '2026-10-16T15:30:01.654321Z', 'rank': rank,
+            'contract': {'symbol': f"{ticker}261120C{rank:08d}", 'type': 'call', 'strike': 500.0 + rank,
+                         'bid': 1.1, 'ask': 1.3, 'mid': 1.2, 'iv': 0.31, 'delta': 0.42},
+            'metrics': {'cost_to_enter': 120.0, 'breakeven': 501.2, 'profit_score': random.random()},
+            'category_tags': ['budget_fit'],
+        })
+    result = {'data_mode': 'live', 'opportunities': opportunities, 'total_found': len(opportunities)}
+    full = len(json.dumps(result))
+    compact = len(json.dumps(compact_result(result)))
+    page = len(json.dumps(compact_result(dict(result, opportunities=opportunities[:DEFAULT_PAGE_SIZE]))))
+    print(f"full: {full / 1024:.0f} KB, compact: {compact / 1024:.0f} KB ({(1 - compact / full) * 100:.0f}% smaller), "
+          f"first compact page of {DEFAULT_PAGE_SIZE}: {page / 1024:.1f} KB")
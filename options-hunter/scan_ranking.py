@@ -0,0 +1,184 @@
+"""
+scan_ranking.py - Ranking helpers shared by the full and streaming /api/scan
+Highlights and top-K lists are tracked incrementally as opportunities are
+scored, so a scan never has to hold (or sort) every opportunity to rank them
+"""
+
+import heapq
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+
+def category_tags(opp: Dict) -> List[str]:
+    """Tags shown on an opportunity card."""
+    tags = ['budget_fit']
+    if opp['metrics']['profit_score'] > 0.5:
+        tags.append('high_profit')
+    if opp['metrics']['liquidity_score'] > 0.6:
+        tags.append('liquid')
+    if opp['contract'].get('delta'):
+        abs_delta = abs(opp['contract']['delta'])
+        if abs_delta > 0.6:
+            tags.append('high_probability')
+    return tags
+
+
+def itm_distance(opp: Dict):
+    """Fallback probability ordering when no contract has a delta: ITM first, then closest strike."""
+    strike = opp['contract']['strike']
+    spot = opp['spot']
+    ctype = opp['contract']['type']
+    if ctype == 'CALL':
+        is_itm = 1 if strike <= spot else 0
+        dist = abs(spot - strike)
+    else:
+        is_itm = 1 if strike >= spot else 0
+        dist = abs(spot - strike)
+    return (-is_itm, dist)
+
+
+class ScanHighlights:
+    """
+    highest_profit / cheapest_profit / highest_probability over a stream of
+    opportunities, in one pass and O(1) memory.
+
+    Ties resolve the way the original sort-then-scan did: by profit_score
+    (higher first), then by the order opportunities were added. So that
+    highlights outside a top-K page can still be given their global rank,
+    a count per distinct profit_score is kept - scores are rounded to 4
+    decimals, so this grows with the spread of scores, not with contracts -
+    and each pick remembers how many equal scores were added before it.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._score_counts = Counter()
+        self._highest_profit = None       # (key, opp, equal scores added before it)
+        self._cheapest_profit = None
+        self._highest_probability = None
+        self._closest_itm = None          # Used only if no opportunity has a delta
+
+    @staticmethod
+    def _better(current, key, opp, ties_before):
+        return (key, opp, ties_before) if current is None or key < current[0] else current
+
+    def add(self, opp: Dict):
+        self.count += 1
+        seq = self.count
+        score = opp['metrics']['profit_score']
+        ties_before = self._score_counts[score]
+        self._score_counts[score] += 1
+        self._highest_profit = self._better(self._highest_profit, (-score, seq), opp, ties_before)
+        if score > 0:
+            self._cheapest_profit = self._better(
+                self._cheapest_profit, (opp['metrics']['cost_to_enter'], -score, seq), opp, ties_before)
+        delta = opp['contract'].get('delta')
+        if delta is not None:
+            self._highest_probability = self._better(
+                self._highest_probability, (-abs(delta), -score, seq), opp, ties_before)
+        elif self._highest_probability is None:
+            self._closest_itm = self._better(self._closest_itm, (itm_distance(opp), -score, seq), opp, ties_before)
+
+    def _rank(self, opp: Dict, ties_before: int) -> int:
+        """Position in the full profit_score ranking (1-based), without having kept the list."""
+        score = opp['metrics']['profit_score']
+        return 1 + ties_before + sum(n for s, n in self._score_counts.items() if s > score)
+
+    def as_dict(self, with_rank: bool = False) -> Dict[str, Optional[Dict]]:
+        """
+        The three highlights. with_rank=True returns copies with 'rank' and
+        'category_tags' set, for callers that never ranked the full list.
+        """
+        probability = self._highest_probability or self._closest_itm
+        picks = {
+            'highest_profit': self._highest_profit,
+            'cheapest_profit': self._cheapest_profit,
+            'highest_probability': probability,
+        }
+        if not with_rank:
+            return {name: pick[1] if pick else None for name, pick in picks.items()}
+        ranked = {}
+        for name, pick in picks.items():
+            if pick is None:
+                ranked[name] = None
+                continue
+            _, opp, ties_before = pick
+            ranked[name] = dict(opp, rank=self._rank(opp, ties_before),
+                                category_tags=opp.get('category_tags') or category_tags(opp))
+        return ranked
+
+
+class TopK:
+    """
+    The k best items by key(item), highest first, in O(n log k) time and O(k) memory.
+
+    Equal keys keep insertion order, so top() matches
+    sorted(items, key=key, reverse=True)[:k] exactly.
+    """
+
+    def __init__(self, k: int, key: Callable[[Any], float]):
+        self.k = max(0, int(k))
+        self.key = key
+        self.seen = 0
+        self._heap = []  # Min-heap of (key, -seq, item): the root is the current worst
+
+    def add(self, item: Any):
+        self.seen += 1
+        key = self.key(item)
+        heap = self._heap
+        if len(heap) < self.k:
+            heapq.heappush(heap, (key, -self.seen, item))
+        elif heap and key > heap[0][0]:
+            # An equal key arrived later, so it ranks below the root - only strictly better items get in
+            heapq.heapreplace(heap, (key, -self.seen, item))
+
+    def top(self) -> List[Any]:
+        return [item for _, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class CandidatePool:
+    """
+    Auto-recommend candidates for one direction (calls or puts), reduced as
+    they are scored: the pre-filter count and best few for the debug log,
+    and for candidates passing the confidence threshold their count,
+    profit_score sum and the top k by confidence.
+    """
+
+    def __init__(self, k: int, threshold: float, sample_size: int = 5):
+        self.threshold = threshold
+        self.total = 0
+        self.sample = TopK(sample_size, lambda c: c['confidence'])
+        self.passed = 0
+        self.profit_score_sum = 0  # Starts as int like sum() did, so an empty pool still reports 0
+        self.top = TopK(k, lambda c: c['confidence'])
+
+    def add(self, candidate: Dict):
+        self.total += 1
+        self.sample.add(candidate)
+        if candidate['confidence'] >= self.threshold:
+            self.passed += 1
+            self.profit_score_sum += candidate['metrics']['profit_score']
+            self.top.add(candidate)
+
+
+if __name__ == '__main__':
+    # Full sort vs TopK for a 20-item page (equivalence lives in tests/test_scan_ranking.py)
+    import random
+    import time
+
+    random.seed(11)
+    by_score = lambda o: o['metrics']['profit_score']
+    n = 500000
+    scores = [{'metrics': {'profit_score': random.random()}} for _ in range(n)]
+    t0 = time.perf_counter()
+    sorted(scores, key=by_score, reverse=True)[:20]
+    sort_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    top = TopK(20, by_score)
+    for item in scores:
+        top.add(item)
+    heap_ms = (time.perf_counter() - t0) * 1000
+    print(f"top 20 of {n}: full sort {sort_ms:.0f}ms (holds {n}), TopK {heap_ms:.0f}ms (holds {len(top)})")
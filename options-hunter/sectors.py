@@ -0,0 +1,31 @@
+"""
+sectors.py - Sector ETF for each ticker in the scan universe
+Used by the confirmation engine's sector-alignment rule, live and in backtests
+"""
+
+SECTOR_ETF_MAP = {
+    # Technology
+    "AAPL": "XLK", "MSFT": "XLK", "NVDA": "XLK", "AMD": "XLK", "GOOGL": "XLK", 
+    "META": "XLK", "INTC": "XLK", "CRM": "XLK", "ORCL": "XLK",
+    # Financials
+    "BAC": "XLF", "JPM": "XLF", "GS": "XLF", "C": "XLF",
+    # Consumer Discretionary
+    "TSLA": "XLY", "AMZN": "XLY", "DIS": "XLY", "HD": "XLY", "WMT": "XLY",
+    "NFLX": "XLY", "UBER": "XLY", "AAL": "XLY",
+    # Healthcare
+    "PFE": "XLV",
+    # Industrials
+    "GE": "XLI", "BA": "XLI",
+    # Materials
+    "X": "XLB",
+    # Telecom
+    "T": "XLC", "CSCO": "XLC",
+    # Fintech / Growth
+    "SOFI": "XLF", "PLTR": "XLK", "NIO": "XLY", "PYPL": "XLK",
+    # Payments
+    "V": "XLK", "MA": "XLK",
+    # Broad market ETFs map to themselves
+    "SPY": "SPY", "QQQ": "QQQ", "IWM": "IWM",
+    # Energy
+    "F": "XLE",
+}
@@ -4,18 +4,74 @@ Options Hunter - REAL, LIVE, PROFIT-FIRST Options Helper
 All data from REAL APIs only. NO simulated chains, NO fake prices, NO mock data.
 """
 
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, Response, jsonify, request, send_file, stream_with_context
 import os
-import requests
+import sys
+import uuid
 from datetime import datetime, timedelta
 import time
 from math import exp
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import yfinance as yf
 import pandas as pd
 import numpy as np
 from explanations import build_explanation
+from scan_executor import ScanExecutor, provider_slot, SCAN_DEADLINE_SECONDS
+from metrics_engine import compute_chain_metrics
+from scan_ranking import ScanHighlights, TopK, CandidatePool, category_tags
+from scan_pages import encode_cursor, decode_cursor, parse_page_size, compact_result
+from option_chain import OptionChain, ChainBuilder, chain_from_yfinance
+from greeks import fill_chain_greeks
+from polygon_adapter import PolygonChainAdapter
+from price_router import HedgedPriceRouter
+from ttl_cache import TTLCache, cache_stats
+from cache_backend import CACHE_KEY_PREFIX, get_shared_backend
+from single_flight import SingleFlight, flight_stats
+from indicator_store import IndicatorStore, BACKFILL_PERIOD
+from indicator_matrix import snapshot_frames, as_indicator_dicts
+from ohlcv_store import get_ohlcv_store
+from iv_history import get_iv_history, WINDOWS as IV_WINDOWS
+from sectors import SECTOR_ETF_MAP
+from prescreen import ScanFunnel, prescreen_universe, read_universe, UNIVERSE_FILE, PRESCREEN_TOP_N
+from signals import ScoringWeights, compute_confidence as compute_signal_confidence, compute_confidence_batch
+from prewarm import PrewarmScheduler, PrewarmTask, PREWARM_ENABLED, PREWARM_INTERVAL, PREWARM_CLOSED_INTERVAL, MARKET_TZ
+
+# Pooled keep-alive HTTP sessions + retries + per-host metrics (shared with services/optionshunter)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'services'))
+try:
+    from optionshunter.transport import get_transport
+    # orjson-backed jsonify (NumPy aware) + gzip/brotli for large responses
+    from optionshunter.fast_json import init_fast_json
+except ImportError:
+    # Deployed on its own (Dockerfile / render.yaml / nixpacks ship only options-hunter/):
+    # plain requests calls and Flask's JSON provider taught the NumPy types
+    import requests
+    from flask.json.provider import DefaultJSONProvider
+
+    class _PlainTransport:
+        """requests.get without pooling, retries or per-host metrics."""
+        get = staticmethod(requests.get)
+
+        def metrics(self):
+            return {}
+
+    _plain_transport = _PlainTransport()
+
+    def get_transport():
+        return _plain_transport
+
+    class _NumpyJSONProvider(DefaultJSONProvider):
+        @staticmethod
+        def default(o):
+            if isinstance(o, (np.generic, np.ndarray)):
+                return o.tolist()
+            return DefaultJSONProvider.default(o)
+
+    def init_fast_json(app):
+        app.json = _NumpyJSONProvider(app)
 
 app = Flask(__name__)
+init_fast_json(app)
 
 def compute_confidence(profit_score: float, mid: float = 1.0, steepness: float = 3.0) -> float:
     """
@@ -38,16 +94,31 @@ TRADIER_ENV = os.getenv("TRADIER_ENV", "live").lower()  # "live" or "sandbox"
 ALPHA_VANTAGE_BASE = "https://www.alphavantage.co/query"
 FINNHUB_BASE = "https://finnhub.io/api/v1"
 IEX_BASE = "https://cloud.iexapis.com/stable"
-POLYGON_BASE = "https://api.polygon.io"
+POLYGON_BASE = os.getenv("POLYGON_BASE_URL", "https://api.polygon.io")  # Override to point at a local stub
 TRADIER_BASE = "https://api.tradier.com" if TRADIER_ENV == "live" else "https://sandbox.tradier.com"
 
-# Simple cache (5-minute TTL)
-price_cache = {}
-CACHE_TTL = 300
-
-# Technical indicators cache (10-minute TTL)
-indicators_cache = {}
-INDICATORS_CACHE_TTL = 600
+# Bounded LRU caches - sizes keep memory flat on small containers no matter what tickers users scan
+CACHE_TTL = 300                 # Prices (5 min)
+INDICATORS_CACHE_TTL = 600      # Technical indicators (10 min)
+CHAIN_CACHE_TTL = int(os.getenv("CHAIN_CACHE_TTL", "60"))  # Option chains
+EXPIRATIONS_CACHE_TTL = 3600    # Listed expirations
+# Shared across gunicorn workers when REDIS_URL / CACHE_BACKEND is set (see cache_backend.py)
+SHARED_CACHE = get_shared_backend()
+price_cache = TTLCache('prices', int(os.getenv("PRICE_CACHE_SIZE", "2000")), CACHE_TTL, shared=SHARED_CACHE)
+indicators_cache = TTLCache('indicators', int(os.getenv("INDICATORS_CACHE_SIZE", "2000")), INDICATORS_CACHE_TTL, shared=SHARED_CACHE)  # Fits UNIVERSE_FILE + sector ETFs
+chain_cache = TTLCache('chains', int(os.getenv("CHAIN_CACHE_SIZE", "100")), CHAIN_CACHE_TTL, shared=SHARED_CACHE)  # Chains are the big entries
+expirations_cache = TTLCache('expirations', int(os.getenv("EXPIRATIONS_CACHE_SIZE", "1000")), EXPIRATIONS_CACHE_TTL, shared=SHARED_CACHE)
+# Ranked /api/scan result sets behind pagination cursors - shared so any worker can serve the next page
+SCAN_RESULTS_TTL = int(os.getenv("SCAN_RESULTS_TTL", "300"))
+scan_results_cache = TTLCache('scan-results', int(os.getenv("SCAN_RESULTS_CACHE_SIZE", "50")), SCAN_RESULTS_TTL, shared=SHARED_CACHE)
+TRADIER_QUOTE_BATCH = 100  # Symbols per /markets/quotes call
+# Cache misses above are coalesced per key by TTLCache.get_or_load(); batch
+# quote lookups for the same ticker list are coalesced here
+price_batch_flight = SingleFlight('price-batches')
+# Deadline-bound scans give the up-front batch quote this share of the deadline; a batch
+# still running after that keeps filling price_cache in the background
+SCAN_QUOTE_SHARE = float(os.getenv("SCAN_QUOTE_SHARE", "0.3"))
+quote_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='quotes')
 
 # Default ticker universe for auto-scan mode - broad market coverage
 DEFAULT_TICKERS = [
@@ -56,43 +127,13 @@ DEFAULT_TICKERS = [
     "NFLX", "UBER", "PYPL", "WMT", "HD", "V", "MA", "JPM", "GE", "C", "ORCL"
 ]
 
-# Sector ETF mapping for confirmation engine
-SECTOR_ETF_MAP = {
-    # Technology
-    "AAPL": "XLK", "MSFT": "XLK", "NVDA": "XLK", "AMD": "XLK", "GOOGL": "XLK", 
-    "META": "XLK", "INTC": "XLK", "CRM": "XLK", "ORCL": "XLK",
-    # Financials
-    "BAC": "XLF", "JPM": "XLF", "GS": "XLF", "C": "XLF",
-    # Consumer Discretionary
-    "TSLA": "XLY", "AMZN": "XLY", "DIS": "XLY", "HD": "XLY", "WMT": "XLY",
-    "NFLX": "XLY", "UBER": "XLY", "AAL": "XLY",
-    # Healthcare
-    "PFE": "XLV",
-    # Industrials
-    "GE": "XLI", "BA": "XLI",
-    # Materials
-    "X": "XLB",
-    # Telecom
-    "T": "XLC", "CSCO": "XLC",
-    # Fintech / Growth
-    "SOFI": "XLF", "PLTR": "XLK", "NIO": "XLY", "PYPL": "XLK",
-    # Payments
-    "V": "XLK", "MA": "XLK",
-    # Broad market ETFs map to themselves
-    "SPY": "SPY", "QQQ": "QQQ", "IWM": "IWM",
-    # Energy
-    "F": "XLE",
-}
-
 # Confirmation scoring thresholds (tunable)
-CONFIDENCE_MIN_THRESHOLD = 40  # Only return options with confidence >= this value (lowered from 55)
-SCORE_TREND = 25               # Points for bullish/bearish trend confirmation (increased)
-SCORE_RSI = 20                 # Points for RSI momentum (increased)
-SCORE_VOLUME = 15              # BONUS for volume expansion (not required to pass)
-SCORE_SECTOR = 15              # Points for sector alignment
-SCORE_IV = 10                  # Points for favorable IV rank
-PENALTY_EARNINGS = -15         # Penalty for earnings within 3 days (reduced from -20)
-PENALTY_MACRO_EVENT = -10      # Penalty for major macro events
+CONFIDENCE_MIN_THRESHOLD = int(os.getenv("CONFIDENCE_MIN_THRESHOLD", "40"))  # Only return options with confidence >= this value (lowered from 55)
+# Rule weights (defaults in signals.ScoringWeights) - override with SCORE_TREND, SCORE_RSI,
+# SCORE_VOLUME, SCORE_SECTOR, SCORE_IV, PENALTY_EARNINGS, PENALTY_MACRO_EVENT
+SCORING_WEIGHTS = ScoringWeights.from_env()
+IV_RANK_WINDOW = int(os.getenv("IV_RANK_WINDOW", "252"))  # Trading days of ATM IV history behind the IV rule
+INDICATORS_MAX_TICKERS = int(os.getenv("INDICATORS_MAX_TICKERS", "200"))  # Per /api/indicators request - misses are computed inline
 
 # ============================================================================
 # 1️⃣ TECHNICAL INDICATORS & CONFIRMATION ENGINE
@@ -111,81 +152,86 @@ def calculate_rsi(series, period=14):
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
+def get_history(ticker, period, interval="1d", refresh=False):
+    """
+    Daily OHLCV bars from the shared on-disk store (ohlcv_store.py), which re-syncs
+    with yfinance at most every OHLCV_SYNC_TTL seconds and only fetches new days.
+    refresh=True syncs before reading regardless of age.
+    """
+    return get_ohlcv_store().history(ticker, period, interval, max_age=0 if refresh else None)
+
 def get_technical_indicators(ticker):
     """
     Fetch and calculate technical indicators for a ticker.
     Returns dict with: price, ema9, ema20, rsi, rsi_slope, volume, avg_volume_20, price_change_pct
     Cached for INDICATORS_CACHE_TTL seconds.
     """
-    cache_key = f"indicators_{ticker}"
-    now = time.time()
-    
-    if cache_key in indicators_cache:
-        cached = indicators_cache[cache_key]
-        if now - cached['timestamp'] < INDICATORS_CACHE_TTL:
-            return cached['data']
-    
+    return indicators_cache.get_or_load(ticker, lambda: _compute_technical_indicators(ticker))
+
+# Rolling EMA/RSI/volume state per ticker: 60 days on cold start, then only the newest bars
+indicator_store = IndicatorStore(get_history)
+
+def _compute_technical_indicators(ticker):
     try:
-        # Fetch 60 days of daily data (enough for 20-day averages + buffer)
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period="60d", interval="1d")
-        
-        if hist.empty or len(hist) < 20:
-            return None
-        
-        # Calculate indicators
-        close = hist['Close']
-        volume = hist['Volume']
-        
-        ema9 = calculate_ema(close, 9)
-        ema20 = calculate_ema(close, 20)
-        rsi = calculate_rsi(close, 14)
-        
-        # Current values (most recent)
-        current_price = float(close.iloc[-1])
-        current_ema9 = float(ema9.iloc[-1]) if not pd.isna(ema9.iloc[-1]) else None
-        current_ema20 = float(ema20.iloc[-1]) if not pd.isna(ema20.iloc[-1]) else None
-        current_rsi = float(rsi.iloc[-1]) if not pd.isna(rsi.iloc[-1]) else None
-        current_volume = float(volume.iloc[-1])
-        
-        # RSI slope (rising or falling) - compare last 3 days
-        if len(rsi) >= 3:
-            rsi_slope = float(rsi.iloc[-1] - rsi.iloc[-3])
-        else:
-            rsi_slope = 0.0
-        
-        # Average volume (20-day)
-        avg_volume_20 = float(volume.tail(20).mean())
-        
-        # Price change % today
-        if len(close) >= 2:
-            price_change_pct = float((close.iloc[-1] - close.iloc[-2]) / close.iloc[-2] * 100)
-        else:
-            price_change_pct = 0.0
-        
-        indicators = {
-            'price': current_price,
-            'ema9': current_ema9,
-            'ema20': current_ema20,
-            'rsi': current_rsi,
-            'rsi_slope': rsi_slope,
-            'volume': current_volume,
-            'avg_volume_20': avg_volume_20,
-            'price_change_pct': price_change_pct
-        }
-        
-        # Cache result
-        indicators_cache[cache_key] = {
-            'timestamp': now,
-            'data': indicators
-        }
-        
-        return indicators
-        
+        return indicator_store.get(ticker)
     except Exception as e:
         print(f"[Indicators] {ticker} error: {e}")
         return None
 
+def get_technical_indicators_bulk(tickers):
+    """
+    get_technical_indicators() for many tickers at once. Cached entries are served
+    as-is; the rest are computed together in one vectorized pass (indicator_matrix.py)
+    over BACKFILL_PERIOD of stored history - the window a cold indicator_store starts
+    from, so values are identical - and cached.
+    Returns {ticker: indicators dict or None}.
+    """
+    results = {ticker: indicators_cache.get(ticker) for ticker in tickers}
+    missing = [t for t, indicators in results.items() if indicators is None]
+    if not missing:
+        return results
+
+    def history(ticker):
+        try:
+            return get_history(ticker, BACKFILL_PERIOD)
+        except Exception as e:
+            print(f"[Indicators] {ticker} history error: {e}")
+            return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(8, len(missing)), thread_name_prefix='history') as pool:
+        histories = dict(zip(missing, pool.map(history, missing)))
+    for ticker, indicators in as_indicator_dicts(snapshot_frames(histories)).items():
+        indicators_cache.set(ticker, indicators)
+        results[ticker] = indicators
+    print(f"[Indicators] Bulk: {len(tickers) - len(missing)} cached, {len(missing)} computed "
+          f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return results
+
+def get_cached_indicators(tickers):
+    """Indicators already in indicators_cache, None for the rest - nothing is fetched."""
+    return {ticker: indicators_cache.get(ticker) for ticker in tickers}
+
+def download_histories(tickers, period=BACKFILL_PERIOD):
+    """
+    Daily bars for many tickers from one yf.download() call, adjusted like the
+    OHLCV store's per-ticker history. Returns {ticker: DataFrame}; tickers
+    without bars are left out.
+    """
+    with provider_slot('Yahoo'):
+        data = yf.download(tickers, period=period, interval='1d', group_by='ticker', auto_adjust=True,
+                           progress=False, threads=True)
+    if data is None or data.empty:
+        return {}
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({tickers[0]: data}, axis=1)
+    frames = {}
+    for ticker in data.columns.get_level_values(0).unique():
+        frame = data[ticker].dropna(subset=['Close'])
+        if not frame.empty:
+            frames[str(ticker).upper()] = frame
+    return frames
+
 def get_sector_etf_indicators(ticker):
     """
     Get sector ETF indicators for alignment check.
@@ -209,159 +255,182 @@ def get_sector_etf_indicators(ticker):
     except:
         return None
 
-def calculate_iv_rank(ticker, current_iv, lookback_days=30):
+def calculate_hv_band(ticker, lookback_days=30):
     """
-    Calculate IV rank (0-100) based on recent IV range.
-    IV Rank = (current_iv - min_iv) / (max_iv - min_iv) * 100
+    Estimate the IV range for a ticker from its historical volatility.
+    Returns (min_iv, max_iv) or None if there isn't enough history.
     
-    Note: Simplified version - uses option chain historical IV if available,
-    otherwise estimates from historical volatility.
+    Note: Simplified version - typically IV ranges from 0.5x to 2x historical volatility.
     """
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=f"{lookback_days}d", interval="1d")
+        hist = get_history(ticker, f"{lookback_days}d")
         
         if hist.empty or len(hist) < 10:
-            return 50.0  # Default to midpoint if insufficient data
+            return None
         
         # Calculate historical volatility as proxy for IV range
         returns = hist['Close'].pct_change().dropna()
         hist_vol = returns.std() * np.sqrt(252)  # Annualized
         
-        # Estimate IV range (simplified)
-        # Typically IV ranges from 0.5x to 2x historical volatility
-        min_iv = hist_vol * 0.5
-        max_iv = hist_vol * 2.0
-        
-        if max_iv <= min_iv or current_iv is None:
-            return 50.0
-        
-        iv_rank = ((current_iv - min_iv) / (max_iv - min_iv)) * 100
-        return max(0.0, min(100.0, iv_rank))
+        return (float(hist_vol * 0.5), float(hist_vol * 2.0))
         
     except:
-        return 50.0  # Default to midpoint on error
+        return None
 
-def compute_confirmation_score(ticker, option_type, current_iv=None, expiry_date=None):
+def iv_rank_from_band(iv_band, current_iv):
     """
-    Compute intelligent confidence score based on technical confirmations.
+    IV Rank = (current_iv - min_iv) / (max_iv - min_iv) * 100, clamped to 0-100.
+    Defaults to the midpoint (50) when the band or current IV is unknown.
+    """
+    if not iv_band or current_iv is None:
+        return 50.0
+    
+    min_iv, max_iv = iv_band
+    if max_iv <= min_iv:
+        return 50.0
+    
+    iv_rank = ((current_iv - min_iv) / (max_iv - min_iv)) * 100
+    return max(0.0, min(100.0, iv_rank))
+
+def calculate_iv_rank(ticker, current_iv, lookback_days=30):
+    """
+    IV rank (0-100) of current_iv against the last `lookback_days` of recorded ATM IV.
+    Until enough days are recorded, falls back to the historical-volatility band.
+    Reads history on every call - scans should use build_ticker_context() instead.
+    """
+    rank = get_iv_history().summary(ticker, lookback_days).rank(current_iv, lookback_days)
+    if rank is not None:
+        return rank
+    return iv_rank_from_band(calculate_hv_band(ticker, lookback_days), current_iv)
+
+def context_iv_rank(context, current_iv):
+    """IV rank from the context's ATM IV history, or from its HV band while history is short."""
+    iv_summary = context.get('iv_history')
+    rank = iv_summary.rank(current_iv, IV_RANK_WINDOW) if iv_summary is not None else None
+    if rank is not None:
+        return rank
+    return iv_rank_from_band(context['iv_band'], current_iv)
+
+def days_until(expiry_date):
+    """Calendar days from now until an expiry string YYYY-MM-DD, or None if unparseable."""
+    if not expiry_date:
+        return None
+    try:
+        expiry_dt = datetime.strptime(expiry_date, '%Y-%m-%d')
+        return (expiry_dt - datetime.now()).days
+    except:
+        return None
+
+def build_ticker_context(ticker):
+    """
+    Gather everything the confirmation rules need for one underlying.
+    Built once per ticker per scan, then shared by every contract on that ticker.
+    
+    Returns dict with: ticker, indicators, sector, iv_history, iv_band
+    (iv_band - the HV proxy - only while the ATM IV history is too short to rank against)
+    """
+    indicators = get_technical_indicators(ticker)
+    if not indicators:
+        # No point fetching the rest - scoring bails out without indicators
+        return {'ticker': ticker, 'indicators': None, 'sector': None, 'iv_history': None, 'iv_band': None}
+    
+    iv_summary = get_iv_history().summary(ticker, IV_RANK_WINDOW)
+    return {
+        'ticker': ticker,
+        'indicators': indicators,
+        'sector': get_sector_etf_indicators(ticker),
+        'iv_history': iv_summary,
+        'iv_band': None if iv_summary.ready(IV_RANK_WINDOW) else calculate_hv_band(ticker)
+    }
+
+NO_DATA_RESULT = {'confidence': 0, 'confirmations': ['no_data_available']}
+
+def context_signal_inputs(context, days_to_expiry=None):
+    """
+    The per-ticker part of signals.SignalInputs from a build_ticker_context() dict
+    (direction and iv_rank are per contract). None if the context has no indicators.
+    """
+    indicators = context['indicators']
+    if not indicators:
+        return None
+    sector_data = context['sector']
+    return {
+        'price': indicators['price'],
+        'ema9': indicators['ema9'],
+        'ema20': indicators['ema20'],
+        'rsi': indicators['rsi'],
+        'rsi_slope': indicators['rsi_slope'],
+        'volume': indicators['volume'],
+        'avg_volume_20': indicators['avg_volume_20'],
+        'price_change_pct': indicators['price_change_pct'],
+        'sector_price_change': sector_data['price_change_pct'] if sector_data else None,
+        'sector_above_ema20': sector_data['above_ema20'] if sector_data else None,
+        # Simplified event risk: expiry within 3 trading days (approx 4 calendar days) is
+        # treated as a likely earnings window - in production, check an earnings calendar
+        'has_near_earnings': days_to_expiry is not None and days_to_expiry <= 4,
+        'has_major_macro_event': False
+    }
+
+def score_contract(context, option_type, current_iv=None, days_to_expiry=None):
+    """
+    Pure confirmation scoring over a precomputed ticker context (no I/O).
+    The rules live in signals.compute_confidence(), weighted by SCORING_WEIGHTS.
     
     Args:
-        ticker: Stock symbol
+        context: dict from build_ticker_context()
         option_type: "CALL" or "PUT"
-        current_iv: Current implied volatility (optional)
-        expiry_date: Expiration date string YYYY-MM-DD (optional, for earnings check)
+        current_iv: Contract implied volatility (optional)
+        days_to_expiry: Calendar days to expiry (optional, for earnings check)
     
     Returns:
         dict with:
             - confidence: 0-100 score
             - confirmations: list of confirmation reasons
     """
-    score = 0
-    confirmations = []
-    
-    # Get technical indicators
-    indicators = get_technical_indicators(ticker)
-    if not indicators:
+    base = context_signal_inputs(context, days_to_expiry)
+    if base is None:
         # If we can't get indicators, return minimal confidence
-        return {'confidence': 0, 'confirmations': ['no_data_available']}
-    
-    price = indicators['price']
-    ema9 = indicators['ema9']
-    ema20 = indicators['ema20']
-    rsi = indicators['rsi']
-    rsi_slope = indicators['rsi_slope']
-    volume = indicators['volume']
-    avg_volume_20 = indicators['avg_volume_20']
-    
-    # === RULE 1: Trend / Moving Averages ===
-    if ema9 and ema20:
-        if option_type == 'CALL':
-            if price > ema9 and ema9 > ema20:
-                score += SCORE_TREND
-                confirmations.append('bullish_trend')
-        else:  # PUT
-            if price < ema9 and ema9 < ema20:
-                score += SCORE_TREND
-                confirmations.append('bearish_trend')
-    
-    # === RULE 2: RSI Trend ===
-    if rsi:
-        if option_type == 'CALL':
-            # Bullish: RSI rising and between 45-70
-            if 45 < rsi < 70 and rsi_slope > 0:
-                score += SCORE_RSI
-                confirmations.append('rsi_bullish')
-        else:  # PUT
-            # Bearish: RSI falling and between 30-55
-            if 30 < rsi < 55 and rsi_slope < 0:
-                score += SCORE_RSI
-                confirmations.append('rsi_bearish')
-    
-    # === RULE 3: Volume Expansion ===
-    if volume and avg_volume_20 and avg_volume_20 > 0:
-        if volume >= 1.2 * avg_volume_20:
-            # Check if volume expansion matches direction
-            price_change = indicators['price_change_pct']
-            if option_type == 'CALL' and price_change > 0:
-                score += SCORE_VOLUME
-                confirmations.append('volume_expansion')
-            elif option_type == 'PUT' and price_change < 0:
-                score += SCORE_VOLUME
-                confirmations.append('volume_expansion')
-    
-    # === RULE 4: Sector ETF Alignment ===
-    sector_data = get_sector_etf_indicators(ticker)
-    if sector_data:
-        sector_change = sector_data['price_change_pct']
-        sector_above_ema = sector_data['above_ema20']
-        
-        if option_type == 'CALL':
-            if sector_change > 0.3 and sector_above_ema:
-                score += SCORE_SECTOR
-                confirmations.append('sector_bullish')
-        else:  # PUT
-            if sector_change < -0.3 and not sector_above_ema:
-                score += SCORE_SECTOR
-                confirmations.append('sector_bearish')
-    
-    # === RULE 5: IV Context ===
-    if current_iv:
-        iv_rank = calculate_iv_rank(ticker, current_iv)
-        
-        if option_type == 'CALL':
-            # Prefer moderate IV (20-60) for calls
-            if 20 <= iv_rank <= 60:
-                score += SCORE_IV
-                confirmations.append('iv_ok_for_calls')
-        else:  # PUT
-            # Prefer slightly higher IV (30-70) for puts
-            if 30 <= iv_rank <= 70:
-                score += SCORE_IV
-                confirmations.append('iv_ok_for_puts')
-    
-    # === RULE 6: Event Risk (Earnings & Macro) ===
-    # Simplified: Check if expiry is within 3 trading days (approx 4 calendar days)
-    # In production, would check actual earnings calendar API
-    if expiry_date:
-        try:
-            expiry_dt = datetime.strptime(expiry_date, '%Y-%m-%d')
-            days_to_expiry = (expiry_dt - datetime.now()).days
-            
-            # Penalty if very close to expiry (likely earnings window)
-            if days_to_expiry <= 4:
-                score += PENALTY_EARNINGS
-                confirmations.append('penalty_earnings_nearby')
-        except:
-            pass
+        return dict(NO_DATA_RESULT, confirmations=list(NO_DATA_RESULT['confirmations']))
+    
+    result = compute_signal_confidence(dict(
+        base,
+        direction='call' if option_type == 'CALL' else 'put',
+        iv_rank=context_iv_rank(context, current_iv) if current_iv else None
+    ), SCORING_WEIGHTS)
+    return {'confidence': result.confidence, 'confirmations': result.confirmations}
+
+def score_contracts(context, option_types, current_ivs, days_to_expiry=None):
+    """
+    score_contract() for many contracts on one ticker in a single vectorized pass.
+    Returns a list of the same dicts, in input order.
+    """
+    base = context_signal_inputs(context, days_to_expiry)
+    if base is None:
+        return [dict(NO_DATA_RESULT, confirmations=list(NO_DATA_RESULT['confirmations'])) for _ in option_types]
+    
+    batch = compute_confidence_batch(dict(
+        base,
+        direction=np.array(['call' if t == 'CALL' else 'put' for t in option_types]),
+        iv_rank=np.array([context_iv_rank(context, iv) if iv else np.nan for iv in current_ivs], dtype=float)
+    ), SCORING_WEIGHTS)
+    return [{'confidence': r.confidence, 'confirmations': r.confirmations} for r in batch.results()]
+
+def compute_confirmation_score(ticker, option_type, current_iv=None, expiry_date=None):
+    """
+    Compute intelligent confidence score based on technical confirmations.
+    One-off convenience wrapper - builds a fresh ticker context per call.
     
-    # Clamp score to 0-100
-    score = max(0, min(100, score))
+    Args:
+        ticker: Stock symbol
+        option_type: "CALL" or "PUT"
+        current_iv: Current implied volatility (optional)
+        expiry_date: Expiration date string YYYY-MM-DD (optional, for earnings check)
     
-    return {
-        'confidence': score,
-        'confirmations': confirmations
-    }
+    Returns:
+        dict with confidence (0-100) and confirmations (list of reasons)
+    """
+    return score_contract(build_ticker_context(ticker), option_type,
+                          current_iv=current_iv, days_to_expiry=days_until(expiry_date))
 
 # ============================================================================
 # 2️⃣ LIVE-ONLY PRICE PIPELINE
@@ -377,7 +446,7 @@ def fetch_price_alpha_vantage(ticker):
             'symbol': ticker,
             'apikey': ALPHA_VANTAGE_API_KEY
         }
-        r = requests.get(ALPHA_VANTAGE_BASE, params=params, timeout=8)
+        r = get_transport().get(ALPHA_VANTAGE_BASE, params=params, timeout=8)
         data = r.json()
         if 'Global Quote' in data and '05. price' in data['Global Quote']:
             price = data['Global Quote']['05. price']
@@ -394,7 +463,7 @@ def fetch_price_finnhub(ticker):
     try:
         url = f"{FINNHUB_BASE}/quote"
         params = {'symbol': ticker, 'token': FINNHUB_API_KEY}
-        r = requests.get(url, params=params, timeout=8)
+        r = get_transport().get(url, params=params, timeout=8)
         data = r.json()
         if data.get('c'):
             return float(data['c'])
@@ -409,7 +478,7 @@ def fetch_price_iex(ticker):
     try:
         url = f"{IEX_BASE}/stock/{ticker}/quote"
         params = {'token': IEX_API_KEY}
-        r = requests.get(url, params=params, timeout=8)
+        r = get_transport().get(url, params=params, timeout=8)
         data = r.json()
         if data.get('latestPrice'):
             return float(data['latestPrice'])
@@ -429,44 +498,190 @@ def fetch_price_yfinance(ticker):
         print(f"[yfinance] {ticker} error: {e}")
     return None
 
+# --- Batch variants: {ticker: price} for as many tickers as the provider answers ---
+
+def fetch_prices_tradier(tickers):
+    """Batch quotes from Tradier (comma-separated symbols, one call per 100)."""
+    if not TRADIER_TOKEN:
+        return {}
+    prices = {}
+    headers = {
+        'Authorization': f"Bearer {TRADIER_TOKEN}",
+        'Accept': 'application/json'
+    }
+    for i in range(0, len(tickers), TRADIER_QUOTE_BATCH):
+        chunk = tickers[i:i + TRADIER_QUOTE_BATCH]
+        try:
+            with provider_slot('Tradier'):
+                r = get_transport().get(f"{TRADIER_BASE}/v1/markets/quotes",
+                                        headers=headers, params={'symbols': ','.join(chunk)}, timeout=10)
+            quotes = (r.json().get('quotes') or {}).get('quote', [])
+            if not isinstance(quotes, list):
+                quotes = [quotes] if quotes else []
+            for quote in quotes:
+                last = quote.get('last')
+                if quote.get('symbol') and last:
+                    prices[quote['symbol'].upper()] = float(last)
+        except Exception as e:
+            print(f"[Tradier] Batch quote error ({len(chunk)} symbols): {e}")
+    return prices
+
+def fetch_prices_finnhub(tickers):
+    """Finnhub has no batch quote - fan out, bounded by the Finnhub provider slots."""
+    if not FINNHUB_API_KEY or not tickers:
+        return {}
+    
+    def fetch_one(ticker):
+        with provider_slot('Finnhub'):
+            return ticker, fetch_price_finnhub(ticker)
+    
+    with ThreadPoolExecutor(max_workers=min(8, len(tickers)), thread_name_prefix='finnhub') as pool:
+        return {t: p for t, p in pool.map(fetch_one, tickers) if p is not None and p > 0}
+
+def fetch_prices_yfinance(tickers):
+    """One yf.download() for all tickers instead of a history() call each."""
+    if not tickers:
+        return {}
+    try:
+        with provider_slot('Yahoo'):
+            data = yf.download(tickers, period='1d', interval='1m', group_by='column',
+                               progress=False, threads=True)
+        if data is None or data.empty:
+            return {}
+        close = data['Close']
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        prices = {}
+        for ticker in close.columns:
+            series = close[ticker].dropna()
+            if not series.empty:
+                prices[str(ticker).upper()] = float(series.iloc[-1])
+        return prices
+    except Exception as e:
+        print(f"[yfinance] Batch download error ({len(tickers)} symbols): {e}")
+        return {}
+
+_price_router = None
+
+def get_price_router():
+    """Shared hedged router (one health scoreboard for the whole process)."""
+    global _price_router
+    if _price_router is None:
+        _price_router = HedgedPriceRouter([
+            ('AlphaVantage', fetch_price_alpha_vantage),
+            ('Finnhub', fetch_price_finnhub),
+            ('IEX', fetch_price_iex),
+            ('Yahoo', fetch_price_yfinance)
+        ])
+    return _price_router
+
 def get_live_price(ticker):
     """
     Unified price function with provider fallback chain.
     Returns: { "ticker": str, "price": float, "source": str, "timestamp": str }
     or None if ALL providers fail.
     
-    Order: Alpha Vantage -> Finnhub -> IEX -> yfinance
+    Preferred order: Alpha Vantage -> Finnhub -> IEX -> yfinance, re-ranked by
+    observed success rate / latency. If a provider hasn't answered within
+    PRICE_HEDGE_DELAY the next one is fired in parallel and the first valid
+    price wins; providers that keep failing are skipped by a circuit breaker.
     """
-    now = time.time()
+    # Cached, or coalesced with an identical lookup already in flight
+    return price_cache.get_or_load(ticker, lambda: _fetch_live_price(ticker))
+
+def _fetch_live_price(ticker):
+    hit = get_price_router().fetch(ticker)
+    if hit is None:
+        # ALL providers failed
+        return None
     
-    # Check cache
-    if ticker in price_cache:
-        cached_data, cached_time = price_cache[ticker]
-        if now - cached_time < CACHE_TTL:
-            return cached_data
+    source_name, price = hit
+    result = {
+        'ticker': ticker,
+        'price': price,
+        'source': source_name,
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    }
+    return result
+
+def get_live_prices(tickers, fan_out=True):
+    """
+    Batch version of get_live_price for scans.
+    Returns {ticker: result or None} and fills price_cache for every hit.
+    
+    Cached tickers are served first, then the rest go to the batch-capable
+    providers in turn: Tradier (batch quotes) -> Finnhub (fan-out) ->
+    yfinance (single download). Anything still missing falls back to the
+    per-ticker hedged chain. fan_out=False stops after the true batch calls
+    (Tradier, yfinance) - for universe-sized lookups, where a call per ticker
+    would run straight into the providers' rate limits.
+    """
+    results = {}
+    missing = []
+    for ticker in dict.fromkeys(tickers):
+        cached = price_cache.get(ticker)
+        if cached is not None:
+            results[ticker] = cached
+        else:
+            missing.append(ticker)
     
-    # Provider fallback chain
-    providers = [
-        ('AlphaVantage', fetch_price_alpha_vantage),
-        ('Finnhub', fetch_price_finnhub),
-        ('IEX', fetch_price_iex),
-        ('Yahoo', fetch_price_yfinance)
-    ]
+    if missing:
+        # Concurrent scans over the same list (e.g. DEFAULT_TICKERS at the open) share one lookup
+        key = tuple(missing) if fan_out else ('bulk',) + tuple(missing)
+        results.update(price_batch_flight.do(key, lambda: _fetch_live_prices_batch(missing, fan_out)))
     
-    for source_name, fetch_func in providers:
-        price = fetch_func(ticker)
-        if price is not None and price > 0:
-            result = {
-                'ticker': ticker,
-                'price': price,
-                'source': source_name,
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }
-            price_cache[ticker] = (result, now)
-            return result
+    return {t: results.get(t) for t in tickers}
+
+def prefetch_live_prices(tickers, timeout, fan_out=True):
+    """
+    get_live_prices() for a scan with a deadline: waits at most `timeout` seconds.
+    Returns the batch result, or {} if it is still running - it carries on in the
+    background, and the scan's per-ticker lookups (price_cache, then the hedged
+    chain) cover whatever it has not delivered yet.
+    """
+    future = quote_pool.submit(get_live_prices, tickers, fan_out)
+    try:
+        return future.result(timeout=max(0.0, timeout))
+    except FutureTimeout:
+        print(f"[Prices] Batch quote for {len(tickers)} tickers still running after {timeout:.1f}s")
+        return {}
+
+def _fetch_live_prices_batch(missing, fan_out=True, refresh=False):
+    """
+    Batch providers, then the per-ticker hedged chain for what they missed.
+    refresh=True (pre-warming) makes that fallback bypass price_cache, whose
+    entries are exactly what is being replaced.
+    """
+    results = {}
+    providers = (('Tradier', fetch_prices_tradier),
+                 ('Finnhub', fetch_prices_finnhub),
+                 ('Yahoo', fetch_prices_yfinance))
+    if not fan_out:
+        providers = tuple(p for p in providers if p[0] != 'Finnhub')  # No batch quote - one call per ticker
+    for source_name, batch_func in providers:
+        if not missing:
+            break
+        prices = batch_func(missing)
+        timestamp = datetime.utcnow().isoformat() + 'Z'
+        for ticker in missing:
+            price = prices.get(ticker)
+            if price is not None and price > 0:
+                result = {
+                    'ticker': ticker,
+                    'price': price,
+                    'source': source_name,
+                    'timestamp': timestamp
+                }
+                price_cache.set(ticker, result)
+                results[ticker] = result
+        missing = [t for t in missing if t not in results]
     
-    # ALL providers failed
-    return None
+    if missing and fan_out:
+        fetch = (lambda t: price_cache.refresh(t, lambda: _fetch_live_price(t))) if refresh else get_live_price
+        with ThreadPoolExecutor(max_workers=min(8, len(missing)), thread_name_prefix='price') as pool:
+            results.update(zip(missing, pool.map(fetch, missing)))
+    
+    return results
 
 # ============================================================================
 # 2️⃣ DATA MODE DETECTION & HYBRID OPTIONS FETCHING
@@ -481,187 +696,82 @@ def get_data_mode():
         return "live"
     return "delayed"
 
+def get_expirations(ticker):
+    """Listed option expirations (YYYY-MM-DD, from yfinance). Cached - they change at most daily."""
+    return expirations_cache.get_or_load(ticker, lambda: tuple(yf.Ticker(ticker).options or ()),
+                                         cache_if=bool)
+
+def get_nearest_expiry(ticker):
+    """First listed expiration on or after today (market time), or None."""
+    today = datetime.now(MARKET_TZ).strftime('%Y-%m-%d')
+    return next((e for e in get_expirations(ticker) if e >= today), None)
+
 def fetch_options_yfinance(ticker, expiry):
     """
     Fetch REAL but DELAYED options data from yfinance (15-min delay, no key required).
-    Returns list of normalized contracts.
+    Returns an OptionChain (empty on failure).
     """
     try:
         import yfinance as yf
-        import pandas as pd
         stock = yf.Ticker(ticker)
         
         # Get available expirations
-        expirations = stock.options
+        expirations = get_expirations(ticker)
         if not expirations or expiry not in expirations:
             print(f"[yfinance] {ticker} has no options for {expiry}")
-            return []
+            return OptionChain.empty(expiry)
         
-        # Fetch option chain for this expiry
+        # Fetch option chain for this expiry and convert the DataFrames column-wise
         chain = stock.option_chain(expiry)
-        
-        contracts = []
-        
-        # Process calls
-        if hasattr(chain, 'calls') and not chain.calls.empty:
-            for _, row in chain.calls.iterrows():
-                bid = row.get('bid', 0)
-                ask = row.get('ask', 0)
-                mid = None
-                if bid and ask and bid > 0 and ask > 0:
-                    mid = (float(bid) + float(ask)) / 2.0
-                
-                contracts.append({
-                    'symbol': row.get('contractSymbol'),
-                    'type': 'CALL',  # Normalized to uppercase
-                    'strike': float(row.get('strike', 0)),
-                    'expiry': expiry,
-                    'bid': float(bid) if bid else None,
-                    'ask': float(ask) if ask else None,
-                    'mid': mid,
-                    'last': float(row.get('lastPrice', 0)) if row.get('lastPrice') else None,
-                    'iv': float(row.get('impliedVolatility', 0)) if row.get('impliedVolatility') else None,
-                    'delta': None,  # yfinance doesn't provide greeks directly
-                    'theta': None,
-                    'volume': int(row.get('volume', 0)) if row.get('volume') and not pd.isna(row.get('volume')) else None,
-                    'open_interest': int(row.get('openInterest', 0)) if row.get('openInterest') and not pd.isna(row.get('openInterest')) else None
-                })
-        
-        # Process puts
-        if hasattr(chain, 'puts') and not chain.puts.empty:
-            for _, row in chain.puts.iterrows():
-                bid = row.get('bid', 0)
-                ask = row.get('ask', 0)
-                mid = None
-                if bid and ask and bid > 0 and ask > 0:
-                    mid = (float(bid) + float(ask)) / 2.0
-                
-                contracts.append({
-                    'symbol': row.get('contractSymbol'),
-                    'type': 'PUT',  # Normalized to uppercase
-                    'strike': float(row.get('strike', 0)),
-                    'expiry': expiry,
-                    'bid': float(bid) if bid else None,
-                    'ask': float(ask) if ask else None,
-                    'mid': mid,
-                    'last': float(row.get('lastPrice', 0)) if row.get('lastPrice') else None,
-                    'iv': float(row.get('impliedVolatility', 0)) if row.get('impliedVolatility') else None,
-                    'delta': None,
-                    'theta': None,
-                    'volume': int(row.get('volume', 0)) if row.get('volume') and not pd.isna(row.get('volume')) else None,
-                    'open_interest': int(row.get('openInterest', 0)) if row.get('openInterest') and not pd.isna(row.get('openInterest')) else None
-                })
-        
-        return contracts
+        return chain_from_yfinance(chain, expiry)
     
     except Exception as e:
         print(f"[yfinance] Options error for {ticker} {expiry}: {e}")
-        return []
+        return OptionChain.empty(expiry)
 
-def fetch_options_polygon_delayed(ticker, expiry):
+def fetch_options_polygon_delayed(ticker, expiry, spot=None):
     """
     Fetch REAL options from Polygon (EOD data on free tier is acceptable).
     Same as fetch_options_polygon but explicitly for delayed mode.
     """
     # Reuse the existing Polygon fetcher
-    return fetch_options_polygon(ticker, expiry)
+    return fetch_options_polygon(ticker, expiry, spot)
 
 # ============================================================================
 # 2️⃣ REAL OPTIONS DATA ONLY
 # ============================================================================
 
-def fetch_options_polygon(ticker, expiry):
-    """Fetch REAL options chain from Polygon."""
+_polygon_adapter = None
+
+def get_polygon_adapter():
+    """Shared Polygon adapter (one hydration rate limiter for the whole process)."""
+    global _polygon_adapter
+    if _polygon_adapter is None:
+        _polygon_adapter = PolygonChainAdapter(POLYGON_API_KEY, base_url=POLYGON_BASE,
+                                               http_get=get_transport().get)
+    return _polygon_adapter
+
+def fetch_options_polygon(ticker, expiry, spot=None):
+    """
+    Fetch REAL options chain from Polygon. Returns an OptionChain.
+    
+    Uses the chain-level snapshot (paginated), limited to strikes around spot
+    when it's known. Only near-the-money contracts without a quote get an
+    extra per-contract request.
+    """
     if not POLYGON_API_KEY:
-        return []
+        return OptionChain.empty(expiry)
     
     try:
-        # Get contracts
-        url = f"{POLYGON_BASE}/v3/reference/options/contracts"
-        params = {
-            'underlying_ticker': ticker,
-            'expiration_date': expiry,
-            'limit': 1000,
-            'apiKey': POLYGON_API_KEY
-        }
-        r = requests.get(url, params=params, timeout=15)
-        data = r.json()
-        
-        contracts = []
-        for contract in data.get('results', []):
-            symbol = contract.get('ticker')
-            strike = contract.get('strike_price')
-            contract_type = contract.get('contract_type', '').upper()
-            
-            # Get live quote for this option
-            bid = ask = last = iv = delta = theta = volume = oi = None
-            try:
-                quote_url = f"{POLYGON_BASE}/v3/quotes/{symbol}"
-                quote_params = {
-                    'limit': 1,
-                    'order': 'desc',
-                    'sort': 'timestamp',
-                    'apiKey': POLYGON_API_KEY
-                }
-                qr = requests.get(quote_url, params=quote_params, timeout=10)
-                qdata = qr.json()
-                if qdata.get('results'):
-                    q = qdata['results'][0]
-                    bid = q.get('bid_price')
-                    ask = q.get('ask_price')
-                    last = q.get('last_price')
-            except Exception as e:
-                print(f"[Polygon] Quote error for {symbol}: {e}")
-            
-            # Get snapshot for greeks/volume/OI
-            try:
-                snap_url = f"{POLYGON_BASE}/v3/snapshot/options/{ticker}/{symbol}"
-                snap_params = {'apiKey': POLYGON_API_KEY}
-                sr = requests.get(snap_url, params=snap_params, timeout=10)
-                sdata = sr.json()
-                if sdata.get('results'):
-                    snap = sdata['results']
-                    greeks = snap.get('greeks', {})
-                    iv = greeks.get('implied_volatility')
-                    delta = greeks.get('delta')
-                    theta = greeks.get('theta')
-                    day_data = snap.get('day', {})
-                    volume = day_data.get('volume')
-                    oi = snap.get('open_interest')
-            except Exception as e:
-                print(f"[Polygon] Snapshot error for {symbol}: {e}")
-            
-            # Calculate mid
-            mid = None
-            if bid is not None and ask is not None and bid >= 0 and ask >= 0:
-                mid = (float(bid) + float(ask)) / 2.0
-            
-            contracts.append({
-                'symbol': symbol,
-                'type': 'call' if contract_type == 'CALL' else 'put',
-                'strike': float(strike),
-                'expiry': expiry,
-                'bid': float(bid) if bid is not None else None,
-                'ask': float(ask) if ask is not None else None,
-                'mid': mid,
-                'last': float(last) if last is not None else None,
-                'iv': float(iv) if iv is not None else None,
-                'delta': float(delta) if delta is not None else None,
-                'theta': float(theta) if theta is not None else None,
-                'volume': int(volume) if volume is not None else None,
-                'open_interest': int(oi) if oi is not None else None
-            })
-        
-        return contracts
-    
+        return get_polygon_adapter().fetch_chain(ticker, expiry, spot=spot)
     except Exception as e:
         print(f"[Polygon] Chain error for {ticker} {expiry}: {e}")
-        return []
+        return OptionChain.empty(expiry)
 
 def fetch_options_tradier(ticker, expiry):
-    """Fetch REAL options chain from Tradier."""
+    """Fetch REAL options chain from Tradier. Returns an OptionChain."""
     if not TRADIER_TOKEN:
-        return []
+        return OptionChain.empty(expiry)
     
     try:
         url = f"{TRADIER_BASE}/v1/markets/options/chains"
@@ -674,14 +784,14 @@ def fetch_options_tradier(ticker, expiry):
             'expiration': expiry,
             'greeks': 'true'
         }
-        r = requests.get(url, headers=headers, params=params, timeout=15)
+        r = get_transport().get(url, headers=headers, params=params, timeout=15)
         data = r.json()
         
         options = data.get('options', {}).get('option', [])
         if not isinstance(options, list):
             options = [options] if options else []
         
-        contracts = []
+        builder = ChainBuilder(expiry)
         for opt in options:
             bid = opt.get('bid')
             ask = opt.get('ask')
@@ -691,49 +801,94 @@ def fetch_options_tradier(ticker, expiry):
             
             greeks = opt.get('greeks', {}) or {}
             
-            contracts.append({
-                'symbol': opt.get('symbol'),
-                'type': 'call' if opt.get('option_type', '').lower() == 'call' else 'put',
-                'strike': float(opt.get('strike')),
-                'expiry': opt.get('expiration_date', expiry),
-                'bid': float(bid) if bid is not None else None,
-                'ask': float(ask) if ask is not None else None,
-                'mid': mid,
-                'last': float(opt.get('last')) if opt.get('last') is not None else None,
-                'iv': float(greeks.get('smv_vol')) if greeks.get('smv_vol') else None,
-                'delta': float(greeks.get('delta')) if greeks.get('delta') else None,
-                'theta': float(greeks.get('theta')) if greeks.get('theta') else None,
-                'volume': int(opt.get('volume')) if opt.get('volume') else None,
-                'open_interest': int(opt.get('open_interest')) if opt.get('open_interest') else None
-            })
-        
-        return contracts
+            # Tradier reports "not available" as 0 for greeks, volume and OI
+            builder.append(
+                opt.get('symbol'), opt.get('option_type', '').lower() == 'call',
+                strike=float(opt.get('strike')),
+                bid=bid,
+                ask=ask,
+                mid=mid,
+                last=opt.get('last'),
+                iv=greeks.get('smv_vol') or None,
+                delta=greeks.get('delta') or None,
+                theta=greeks.get('theta') or None,
+                volume=opt.get('volume') or None,
+                open_interest=opt.get('open_interest') or None
+            )
+        
+        return builder.build()
     
     except Exception as e:
         print(f"[Tradier] Chain error for {ticker} {expiry}: {e}")
-        return []
+        return OptionChain.empty(expiry)
 
-def fetch_options_for_scan(ticker, expiry):
+def fetch_options_for_scan(ticker, expiry, spot=None):
     """
     HYBRID OPTIONS AGGREGATOR
     
     Returns: {
-        "contracts": [...],
+        "contracts": OptionChain (columnar - use .to_records() for JSON),
         "source": "Tradier" | "Polygon" | "yfinance",
         "data_mode": "live" | "delayed"
     }
     
+    spot (optional) lets Polygon skip contracts far from the money.
+    
     Logic:
     - If in "live" mode (TRADIER_TOKEN + TRADIER_ENV=live):
         Try Tradier first for real-time OPRA data
     - If in "delayed" mode or Tradier fails:
         Try Polygon (EOD is acceptable) -> yfinance (15-min delayed)
+    
+    Non-empty results are cached per (ticker, expiry) for CHAIN_CACHE_TTL seconds,
+    and concurrent requests for the same chain share one provider fetch. The key
+    ignores spot, so a chain cached by a caller without one (/api/options) gets its
+    greeks and IV sample here, on the first read that has a spot.
+    """
+    result = chain_cache.get_or_load(
+        (ticker, expiry),
+        lambda: _fetch_options_uncached(ticker, expiry, spot),
+        cache_if=lambda result: bool(result['contracts'])
+    )
+    if spot and result['contracts'] and _fill_greeks(ticker, expiry, result, spot):
+        _record_iv(ticker, expiry, result, spot)
+    return result
+
+def _fetch_options_uncached(ticker, expiry, spot=None):
+    result = _fetch_options_from_providers(ticker, expiry, spot)
+    if spot and result['contracts']:
+        _fill_greeks(ticker, expiry, result, spot)
+        _record_iv(ticker, expiry, result, spot)
+    return result
+
+def _fill_greeks(ticker, expiry, result, spot):
+    """
+    yfinance sends no greeks and Polygon/Tradier sometimes skip them - estimate the
+    missing delta/theta so probability tags and highlights don't fall back to strike
+    distance. Fills the chain in place; returns how many contracts were filled.
     """
+    try:
+        filled = fill_chain_greeks(result['contracts'], spot)
+        if filled:
+            print(f"[Greeks] {ticker} {expiry}: Black-Scholes delta/theta for {filled} {result['source']} contracts")
+        return filled
+    except Exception as e:
+        print(f"[Greeks] {ticker} {expiry}: {e}")
+        return 0
+
+def _record_iv(ticker, expiry, result, spot):
+    try:
+        get_iv_history().record(ticker, result['contracts'], spot)
+    except Exception as e:
+        print(f"[IV History] {ticker} {expiry}: {e}")
+
+def _fetch_options_from_providers(ticker, expiry, spot=None):
     mode = get_data_mode()
     
     # LIVE MODE: Try Tradier first
     if mode == "live":
-        contracts = fetch_options_tradier(ticker, expiry)
+        with provider_slot('Tradier'):
+            contracts = fetch_options_tradier(ticker, expiry)
         if contracts:
             return {
                 'contracts': contracts,
@@ -745,7 +900,8 @@ def fetch_options_for_scan(ticker, expiry):
     
     # DELAYED MODE or Tradier fallback: Try Polygon -> yfinance
     if POLYGON_API_KEY:
-        contracts = fetch_options_polygon_delayed(ticker, expiry)
+        with provider_slot('Polygon'):
+            contracts = fetch_options_polygon_delayed(ticker, expiry, spot)
         if contracts:
             return {
                 'contracts': contracts,
@@ -754,7 +910,8 @@ def fetch_options_for_scan(ticker, expiry):
             }
     
     # Final fallback: yfinance (no key required, always available)
-    contracts = fetch_options_yfinance(ticker, expiry)
+    with provider_slot('Yahoo'):
+        contracts = fetch_options_yfinance(ticker, expiry)
     if contracts:
         return {
             'contracts': contracts,
@@ -764,7 +921,7 @@ def fetch_options_for_scan(ticker, expiry):
     
     # All providers failed
     return {
-        'contracts': [],
+        'contracts': OptionChain.empty(expiry),
         'source': None,
         'data_mode': mode
     }
@@ -775,7 +932,37 @@ def get_options_chain(ticker, expiry):
     Returns: (contracts_list, source_name) or ([], None)
     """
     result = fetch_options_for_scan(ticker, expiry)
-    return result['contracts'], result['source']
+    return result['contracts'].to_records(), result['source']
+
+def fetch_ticker_for_scan(ticker, expiry, timing, with_context=False):
+    """
+    Per-ticker unit of work for ScanExecutor: live price, the options chain and
+    (optionally) the confirmation-engine ticker context.
+    Returns: { "price_data": {...}, "options_result": {...}, "context": {...} }
+    or None if no price.
+    """
+    with timing.stage('price'):
+        price_data = get_live_price(ticker)
+    if not price_data:
+        timing.status = 'no_price'
+        return None
+
+    with timing.stage('chain'):
+        options_result = fetch_options_for_scan(ticker, expiry, spot=price_data['price'])
+    if not options_result or not options_result['contracts']:
+        timing.status = 'no_chain'
+        return {'price_data': price_data, 'options_result': options_result, 'context': None}
+
+    context = None
+    if with_context:
+        with timing.stage('context'):
+            context = build_ticker_context(ticker)
+
+    return {
+        'price_data': price_data,
+        'options_result': options_result,
+        'context': context
+    }
 
 # ============================================================================
 # 3️⃣ PROFIT-FIRST METRICS & SCORING
@@ -786,9 +973,13 @@ def compute_metrics(contract, spot_price):
     Compute profit metrics from REAL contract data.
     Returns dict with: cost_to_enter, breakeven, profit_at_plus_5, profit_at_plus_10,
                       liquidity_score, spread, spread_penalty, profit_score
+    
+    Scalar reference implementation - endpoints score whole chains with
+    metrics_engine.compute_chain_metrics(), which must stay result-identical
+    (tests/test_metrics_engine.py checks it).
     """
     strike = contract.get('strike')
-    ctype = contract.get('type')
+    ctype = str(contract.get('type', '')).lower()
     mid = contract.get('mid')
     last = contract.get('last')
     bid = contract.get('bid')
@@ -878,6 +1069,91 @@ def compute_metrics(contract, spot_price):
         'profit_score': round(profit_score, 4)
     }
 
+# ============================================================================
+# 3️⃣ BACKGROUND PRE-WARMING
+# ============================================================================
+# Keeps prices, nearest-expiry chains and indicators for the default universe
+# (plus the sector ETFs the confirmation engine reads) fresh, so user requests
+# hit caches that are at most ~PREWARM_INTERVAL seconds old.
+
+PREWARM_TICKERS = list(DEFAULT_TICKERS)
+PREWARM_ETFS = sorted(set(SECTOR_ETF_MAP.values()) - set(DEFAULT_TICKERS))
+# Prewarmed entries outlive the longest gap between cycles (closed-market ones included)
+# so nothing the prewarmer keeps expires before its next refresh
+PREWARM_CHAIN_TTL = max(CHAIN_CACHE_TTL, 2 * max(PREWARM_INTERVAL, PREWARM_CLOSED_INTERVAL))
+# UNIVERSE_FILE indicators for universe=full scans, batch-downloaded (the names above are warmed per ticker)
+PREWARM_UNIVERSE = os.getenv("PREWARM_UNIVERSE", "true").lower() != "false"
+PREWARM_UNIVERSE_INTERVAL = float(os.getenv("PREWARM_UNIVERSE_INTERVAL", "300"))  # Seconds between universe refreshes
+UNIVERSE_DOWNLOAD_BATCH = int(os.getenv("UNIVERSE_DOWNLOAD_BATCH", "200"))         # Symbols per yf.download() call
+PREWARM_INDICATORS_TTL = max(INDICATORS_CACHE_TTL,
+                             2 * max(PREWARM_INTERVAL, PREWARM_CLOSED_INTERVAL, PREWARM_UNIVERSE_INTERVAL))
+PREWARM_UNIVERSE_TICKERS = []
+if PREWARM_UNIVERSE and os.path.exists(UNIVERSE_FILE):
+    PREWARM_UNIVERSE_TICKERS = [t for t in read_universe(UNIVERSE_FILE) if t not in PREWARM_TICKERS + PREWARM_ETFS]
+
+def refresh_prices(tickers):
+    """Batch re-quote tickers into price_cache, cached or not."""
+    return price_batch_flight.do(('refresh',) + tuple(tickers),
+                                 lambda: _fetch_live_prices_batch(tickers, refresh=True))
+
+def refresh_indicators(ticker):
+    return indicators_cache.refresh(ticker, lambda: _compute_technical_indicators(ticker), ttl=PREWARM_INDICATORS_TTL)
+
+def refresh_nearest_chain(ticker):
+    expiry = get_nearest_expiry(ticker)
+    if not expiry:
+        return None
+    price_data = price_cache.get(ticker)
+    spot = price_data['price'] if price_data else None
+    result = chain_cache.refresh(
+        (ticker, expiry),
+        lambda: _fetch_options_uncached(ticker, expiry, spot),
+        ttl=PREWARM_CHAIN_TTL,
+        cache_if=lambda result: bool(result['contracts'])
+    )
+    return bool(result['contracts'])
+
+def refresh_universe_indicators(tickers):
+    """
+    Indicators for a universe-sized ticker list: one yf.download() per
+    UNIVERSE_DOWNLOAD_BATCH symbols through the vectorized snapshot, so
+    universe=full scans score from indicators_cache instead of fetching
+    history per ticker. Returns how many tickers were refreshed.
+    """
+    start = time.perf_counter()
+    refreshed = 0
+    for i in range(0, len(tickers), UNIVERSE_DOWNLOAD_BATCH):
+        batch = tickers[i:i + UNIVERSE_DOWNLOAD_BATCH]
+        try:
+            frames = download_histories(batch)
+        except Exception as e:
+            print(f"[Indicators] Universe batch {batch[0]}..{batch[-1]} error: {e}")
+            continue
+        for ticker, indicators in as_indicator_dicts(snapshot_frames(frames)).items():
+            indicators_cache.set(ticker, indicators, ttl=PREWARM_INDICATORS_TTL)
+            refreshed += 1
+    print(f"[Indicators] Universe: {refreshed}/{len(tickers)} refreshed in {time.perf_counter() - start:.1f}s")
+    return refreshed
+
+prewarmer = PrewarmScheduler([
+    PrewarmTask('prices', refresh_prices, PREWARM_TICKERS + PREWARM_ETFS, batch=True),
+    PrewarmTask('universe_indicators', refresh_universe_indicators, PREWARM_UNIVERSE_TICKERS, batch=True,
+                min_interval=PREWARM_UNIVERSE_INTERVAL),
+    PrewarmTask('indicators', refresh_indicators, PREWARM_TICKERS + PREWARM_ETFS),
+    PrewarmTask('chains', refresh_nearest_chain, PREWARM_TICKERS),
+    # Daily-bar HV band only changes once a day - warm it through the normal cache
+    PrewarmTask('iv_band', calculate_hv_band, PREWARM_TICKERS),
+], backend=SHARED_CACHE, lock_key=f"{CACHE_KEY_PREFIX}:prewarm:leader")  # One worker warms the shared cache for all
+
+@app.before_request
+def start_prewarmer():
+    """
+    Start the background refresher with the first request (PREWARM_ENABLED=false disables it).
+    Every worker starts one; with a shared backend only the lock holder runs cycles.
+    """
+    if PREWARM_ENABLED and not prewarmer.running:
+        prewarmer.start()
+
 # ============================================================================
 # 4️⃣ API ENDPOINTS
 # ============================================================================
@@ -903,6 +1179,76 @@ def api_price():
     
     return jsonify(result)
 
+@app.route('/api/provider-metrics')
+def api_provider_metrics():
+    """Per-host request counts, error rates and latency, plus the price provider scoreboard."""
+    return jsonify({
+        'hosts': get_transport().metrics(),
+        'price_providers': get_price_router().stats(),
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    """Size, hit rate, eviction and coalescing counters for the in-process caches."""
+    return jsonify({
+        'caches': cache_stats(),
+        'shared_backend': SHARED_CACHE.stats() if SHARED_CACHE is not None else None,
+        'single_flight': flight_stats(),
+        'indicator_store': indicator_store.stats(),
+        'ohlcv_store': get_ohlcv_store().stats(),
+        'iv_history': get_iv_history().stats(),
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
+@app.route('/api/iv-history')
+def api_iv_history():
+    """Recorded daily ATM IV for a ticker with IV rank / percentile over each window."""
+    ticker = request.args.get('ticker', '').upper().strip()
+    if not ticker:
+        return jsonify({'error': 'Ticker required'}), 400
+    
+    iv = request.args.get('iv', '').strip()
+    try:
+        iv = float(iv) if iv else None
+    except ValueError:
+        return jsonify({'error': 'Invalid iv parameter'}), 400
+    
+    summary = get_iv_history().summary(ticker, IV_RANK_WINDOW)
+    return jsonify({
+        **summary.as_dict(iv, sorted(set(IV_WINDOWS) | {IV_RANK_WINDOW})),
+        'history': [{'day': day, 'atm_iv': round(float(value), 4)} for day, value in zip(summary.days, summary.values)],
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
+@app.route('/api/indicators')
+def api_indicators():
+    """EMA / RSI / volume snapshot for a comma-separated list of tickers, computed in bulk."""
+    tickers = [t.strip().upper() for t in request.args.get('tickers', '').split(',') if t.strip()]
+    if not tickers:
+        return jsonify({'error': 'No valid tickers provided'}), 400
+    tickers = list(dict.fromkeys(tickers))
+    if len(tickers) > INDICATORS_MAX_TICKERS:
+        return jsonify({'error': f'Too many tickers ({len(tickers)}) - at most {INDICATORS_MAX_TICKERS} per request'}), 400
+    
+    indicators = get_technical_indicators_bulk(tickers)
+    return jsonify({
+        'indicators': indicators,
+        'missing': [t for t, values in indicators.items() if values is None],
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
+@app.route('/api/prewarm-status')
+def api_prewarm_status():
+    """Background refresher state: market session, last cycle, per-task counts."""
+    return jsonify({
+        'enabled': PREWARM_ENABLED,
+        'tickers': PREWARM_TICKERS,
+        'etfs': PREWARM_ETFS,
+        **prewarmer.status(),
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
 @app.route('/api/options')
 def api_options():
     """Get REAL options chain."""
@@ -977,7 +1323,7 @@ def api_recommend():
     price_source = price_data['source']
     
     # Get options chain
-    options_result = fetch_options_for_scan(ticker, expiry)
+    options_result = fetch_options_for_scan(ticker, expiry, spot=spot)
     contracts = options_result['contracts']
     options_source = options_result['source']
     
@@ -988,51 +1334,37 @@ def api_recommend():
             'expiry': expiry
         }), 503
     
-    # Filter candidates based on bias (restrict to ±10% near-the-money)
+    # Score the whole chain in one vectorized pass
+    chain_metrics = compute_chain_metrics(spot, **contracts.metric_columns())
+    
+    # Filter candidates: near-the-money (±10% of spot), priced (mid or last) and under budget
+    with np.errstate(invalid='ignore'):
+        prices = np.where(contracts.mid > 0, contracts.mid,
+                          np.where(contracts.last > 0, contracts.last, np.nan))
+        keep = (np.abs(contracts.strike - spot) / spot <= 0.10) & (prices > 0) & (prices * 100.0 <= budget)
+    
+    # Apply bias filter (neutral: allow both)
+    if bias == 'bullish':
+        keep &= contracts.is_call
+    elif bias == 'bearish':
+        keep &= ~contracts.is_call
+    keep &= chain_metrics.valid
+    
+    # Days to expiry
+    try:
+        exp_date = datetime.strptime(expiry, '%Y-%m-%d')
+        days_to_expiry = (exp_date - datetime.now()).days
+    except:
+        days_to_expiry = 0
+    
     candidates = []
     
-    for contract in contracts:
-        strike = contract.get('strike')
-        ctype = contract.get('type', '').upper()
-        
-        # Check if near-the-money (within ±10% of spot)
-        if abs(strike - spot) / spot > 0.10:
-            continue
-        
-        # Get price (mid or last)
-        mid = contract.get('mid')
-        last = contract.get('last')
-        price = mid if mid and mid > 0 else (last if last and last > 0 else None)
-        
-        if not price or price <= 0:
-            continue
-        
-        cost = price * 100.0
-        if cost > budget:
-            continue
-        
-        # Apply bias filter
-        if bias == 'bullish':
-            # Only evaluate calls
-            if ctype != 'CALL':
-                continue
-        elif bias == 'bearish':
-            # Only evaluate puts
-            if ctype != 'PUT':
-                continue
-        # neutral: allow both
-        
-        # Compute metrics
-        metrics = compute_metrics(contract, spot)
-        if not metrics:
-            continue
-        
-        # Days to expiry
-        try:
-            exp_date = datetime.strptime(expiry, '%Y-%m-%d')
-            days_to_expiry = (exp_date - datetime.now()).days
-        except:
-            days_to_expiry = 0
+    for i in np.flatnonzero(keep):
+        contract = contracts.record(i)
+        strike = contract['strike']
+        ctype = contract['type']
+        cost = float(prices[i]) * 100.0
+        metrics = chain_metrics.record(i)
         
         # Traffic light grading
         # GREEN: cost <= 30% budget AND est_profit_10 >= 80% of cost AND 5-45 days
@@ -1137,6 +1469,112 @@ def api_recommend():
         'alternatives': alternatives
     })
 
+def score_scan_chain(ticker, price_data, options_result, budget):
+    """
+    Opportunities for one ticker's chain: every contract with a mid under budget,
+    best profit_score first (unranked - ranks are assigned across the whole scan).
+    """
+    spot = price_data['price']
+    contracts = options_result['contracts']
+    
+    # Score the whole chain at once, then keep contracts with a mid under budget
+    chain_metrics = compute_chain_metrics(spot, **contracts.metric_columns())
+    with np.errstate(invalid='ignore'):
+        under_budget = (contracts.mid > 0) & (contracts.mid * 100.0 <= budget) & chain_metrics.valid
+    
+    # Dicts are only built for contracts that make the cut
+    opportunities = []
+    scored_at = datetime.utcnow().isoformat() + 'Z'
+    for i in np.flatnonzero(under_budget):
+        opportunities.append({
+            'ticker': ticker,
+            'spot': spot,
+            'price_source': price_data['source'],
+            'price_timestamp': price_data['timestamp'],
+            'contract': contracts.record(i),
+            'metrics': chain_metrics.record(i),
+            'options_source': options_result['source'],
+            'options_timestamp': scored_at
+        })
+    return opportunities
+
+def scan_mode_message(data_mode, options_sources_used):
+    if data_mode == 'live':
+        return f'LIVE MODE: Real-time options data from {", ".join(options_sources_used)}.'
+    return f'DELAYED TEST MODE: Using delayed options data from {", ".join(options_sources_used)} for backtesting and practice. Not suitable for real-time entries.'
+
+def parse_top_k(default=None):
+    """
+    `limit` (alias `top_k`) query param: how many ranked results to return.
+    Returns (value, error) - value is default when the param is absent.
+    """
+    raw = request.args.get('limit', request.args.get('top_k', '')).strip()
+    if not raw:
+        return default, None
+    try:
+        value = int(raw)
+    except ValueError:
+        return None, 'Invalid limit parameter'
+    if value <= 0:
+        return None, 'Limit must be positive'
+    return value, None
+
+def parse_universe():
+    """
+    `universe=full` query param: scan the UNIVERSE_FILE symbols through the pre-screen
+    instead of a ticker list, keeping the best `top_n` (default PRESCREEN_TOP_N).
+    Returns (top_n, error) - top_n is None when the request isn't a full-universe scan.
+    """
+    if request.args.get('universe', '').strip().lower() != 'full':
+        return None, None
+    raw = request.args.get('top_n', '').strip()
+    if not raw:
+        return PRESCREEN_TOP_N, None
+    try:
+        value = int(raw)
+    except ValueError:
+        return None, 'Invalid top_n parameter'
+    if value <= 0:
+        return None, 'top_n must be positive'
+    return value, None
+
+def screen_universe(top_n, direction=None, min_score=0, deadline=SCAN_DEADLINE_SECONDS):
+    """
+    Pre-screen stage of a full-universe scan: every UNIVERSE_FILE symbol through one
+    bulk quote pass (bounded by its share of the scan deadline, cached quotes if it
+    overruns) and the cached indicators the universe prewarm keeps fresh, ranked by
+    the chain-free confirmation rules (prescreen.py). Tickers without cached
+    indicators are not fetched inline; the funnel's indicators stage counts them as
+    missing. Returns (PrescreenResult, ScanFunnel) - the caller fetches chains for
+    the survivors and adds those stages to the funnel.
+    """
+    def get_quotes(tickers):
+        quotes = prefetch_live_prices(tickers, deadline * SCAN_QUOTE_SHARE, fan_out=False)
+        return quotes or {ticker: price_cache.get(ticker) for ticker in tickers}
+
+    funnel = ScanFunnel()
+    started = time.perf_counter()
+    universe = read_universe(UNIVERSE_FILE)
+    funnel.add('universe', len(universe), time.perf_counter() - started)
+    screened = prescreen_universe(
+        universe,
+        get_quotes,
+        get_cached_indicators,
+        SECTOR_ETF_MAP,
+        top_n=top_n,
+        direction=direction,
+        min_score=min_score,
+        weights=SCORING_WEIGHTS,
+        funnel=funnel
+    )
+    print(f"[Funnel] Pre-screen: {funnel.summary()}")
+    return screened, funnel
+
+NO_SCAN_RESULTS_MESSAGE = {
+    'live': 'No real-time option contracts under this budget with current live data from Tradier.',
+    'delayed': 'No option contracts under this budget with delayed data. Tradier live access not yet configured.'
+}
+
 @app.route('/api/scan')
 def api_scan():
     """
@@ -1146,12 +1584,35 @@ def api_scan():
       - budget: float (required) - maximum cost per contract
       - expiry: YYYY-MM-DD (required) - expiration date
       - tickers: CSV string (optional) - default: SPY,QQQ,AAPL,MSFT,NVDA,TSLA,AMZN,META
+      - stream: "1"/"ndjson" or "sse" (optional) - stream per-ticker batches, see stream_scan()
+      - limit (alias top_k): int (optional) - only return the best N opportunities
+      - page_size / cursor (optional) - page through a cached result set, see paginate_scan()
+      - compact: "1" (optional) - list spot/price/options source fields once per ticker
+      - universe: "full" (optional) - scan UNIVERSE_FILE instead of `tickers`: bulk quotes and
+        prewarmed indicators pre-screen it, chains are fetched for the best `top_n` only
+      - top_n: int (optional, default PRESCREEN_TOP_N) - pre-screen survivors for universe=full
     
     Returns:
       - data_mode: \"live\" or \"delayed\"
-      - opportunities: ALL contracts under budget, sorted by profit_score
-      - highlights: { highest_profit, cheapest_profit, highest_probability }
+      - opportunities: ALL contracts under budget (or the top `limit`), sorted by profit_score
+      - highlights: { highest_profit, cheapest_profit, highest_probability } over ALL contracts
+      - total_found: number of contracts under budget, before any limit
+      - funnel / prescreen (universe=full): tickers left and ms per stage, and the survivors
+        with their pre-screen scores
     """
+    compact = request.args.get('compact', '').strip().lower() in ('1', 'true')
+    cursor = request.args.get('cursor', '').strip()
+    page_size, error = parse_page_size(request.args.get('page_size', '').strip())
+    if error:
+        return jsonify({'error': error}), 400
+    if cursor:
+        # Follow-up page - the scan parameters travel inside the cursor
+        state = decode_cursor(cursor)
+        if state is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        return paginate_scan(state['t'], state['e'], state['b'], state['l'], page_size, compact,
+                             scan_id=state['s'], offset=state['o'])
+    
     # Parse params
     try:
         budget = float(request.args.get('budget', '0'))
@@ -1164,92 +1625,102 @@ def api_scan():
     if not expiry:
         return jsonify({'error': 'Expiry required (YYYY-MM-DD)'}), 400
     
-    tickers_str = request.args.get('tickers', 'SPY,QQQ,AAPL,MSFT,NVDA,TSLA,AMZN,META')
-    tickers = [t.strip().upper() for t in tickers_str.split(',') if t.strip()]
+    top_n, error = parse_universe()
+    if error:
+        return jsonify({'error': error}), 400
     
-    if not tickers:
-        return jsonify({'error': 'No valid tickers provided'}), 400
+    limit, error = parse_top_k()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    funnel = None
+    if top_n:
+        # Profit-first scan - rank on signal strength alone, nothing is cut for a low score
+        screened, funnel = screen_universe(top_n)
+        tickers = screened.survivors
+    else:
+        tickers_str = request.args.get('tickers', 'SPY,QQQ,AAPL,MSFT,NVDA,TSLA,AMZN,META')
+        tickers = [t.strip().upper() for t in tickers_str.split(',') if t.strip()]
+        
+        if not tickers:
+            return jsonify({'error': 'No valid tickers provided'}), 400
+    
+    stream = request.args.get('stream', '').strip().lower()
+    if stream in ('1', 'true', 'ndjson', 'sse'):
+        return stream_scan(tickers, expiry, budget, sse=(stream == 'sse'), limit=limit)
+    
+    if 'page_size' in request.args:
+        return paginate_scan(tickers, expiry, budget, limit, page_size, compact)
     
+    result = run_scan(tickers, expiry, budget, limit, funnel=funnel)
+    if funnel is not None:
+        result['funnel'] = funnel.as_dict()
+        result['prescreen'] = screened.candidates
+    return jsonify(compact_result(result) if compact else result)
+
+def run_scan(tickers, expiry, budget, limit=None, funnel=None):
+    """
+    Scan tickers and return the /api/scan response body.
+    With a limit only the best `limit` are kept (bounded heap) instead of
+    collecting and sorting every contract under budget.
+    A ScanFunnel gets 'chains' (tickers with a chain) and 'scored' (tickers
+    with a contract under budget) stages and is logged.
+    """
     # Detect data mode
     data_mode = get_data_mode()
     
     # Scan all tickers
     opportunities = []
+    top = TopK(limit, lambda x: x['metrics']['profit_score']) if limit else None
+    highlights = ScanHighlights()
     options_sources_used = set()
+    live_prices = get_live_prices(tickers)
+    chain_seconds = score_seconds = 0.0
+    chained = scored = 0
     
     for ticker in tickers:
-        # Get live price (price pipeline stays the same)
-        price_data = get_live_price(ticker)
+        # Live price from the batch lookup above
+        price_data = live_prices.get(ticker)
         if not price_data:
             print(f"[Scan] Skipping {ticker} - no live price")
             continue
         
-        spot = price_data['price']
-        price_source = price_data['source']
-        price_timestamp = price_data['timestamp']
-        
         # Get options chain using hybrid fetcher
-        options_result = fetch_options_for_scan(ticker, expiry)
-        contracts = options_result['contracts']
-        options_source = options_result['source']
+        started = time.perf_counter()
+        options_result = fetch_options_for_scan(ticker, expiry, spot=price_data['price'])
+        chain_seconds += time.perf_counter() - started
         
-        if not contracts or not options_source:
+        if not options_result['contracts'] or not options_result['source']:
             print(f"[Scan] Skipping {ticker} - no options data")
             continue
         
-        options_sources_used.add(options_source)
-        
-        # Process each contract
-        for contract in contracts:
-            mid = contract.get('mid')
-            if not mid or mid <= 0:
-                continue
-            
-            cost = mid * 100.0
-            if cost > budget:
-                continue
-            
-            # Compute metrics
-            metrics = compute_metrics(contract, spot)
-            if not metrics:
-                continue
-            
-            # Build opportunity entry
-            opportunity = {
-                'ticker': ticker,
-                'spot': spot,
-                'price_source': price_source,
-                'price_timestamp': price_timestamp,
-                'contract': {
-                    'symbol': contract.get('symbol'),
-                    'type': contract.get('type').upper(),
-                    'strike': contract.get('strike'),
-                    'expiry': contract.get('expiry'),
-                    'bid': contract.get('bid'),
-                    'ask': contract.get('ask'),
-                    'mid': contract.get('mid'),
-                    'last': contract.get('last'),
-                    'iv': contract.get('iv'),
-                    'delta': contract.get('delta'),
-                    'theta': contract.get('theta'),
-                    'volume': contract.get('volume'),
-                    'open_interest': contract.get('open_interest')
-                },
-                'metrics': metrics,
-                'options_source': options_source,
-                'options_timestamp': datetime.utcnow().isoformat() + 'Z'
-            }
-            
-            opportunities.append(opportunity)
+        chained += 1
+        started = time.perf_counter()
+        options_sources_used.add(options_result['source'])
+        ticker_opportunities = score_scan_chain(ticker, price_data, options_result, budget)
+        scored += bool(ticker_opportunities)
+        for opp in ticker_opportunities:
+            highlights.add(opp)
+            if top is not None:
+                top.add(opp)
+            else:
+                opportunities.append(opp)
+        score_seconds += time.perf_counter() - started
+    
+    if funnel is not None:
+        funnel.add('chains', chained, chain_seconds)
+        funnel.add('scored', scored, score_seconds)
+        print(f"[Funnel] {funnel.summary()}")
+    
+    if top is not None:
+        opportunities = top.top()
+    else:
+        # Sort by profit_score DESC
+        opportunities.sort(key=lambda x: x['metrics']['profit_score'], reverse=True)
     
     # Check if we found anything
     if not opportunities:
-        mode_message = {
-            'live': 'No real-time option contracts under this budget with current live data from Tradier.',
-            'delayed': 'No option contracts under this budget with delayed data. Tradier live access not yet configured.'
-        }
-        
-        return jsonify({
+        return {
             'data_mode': data_mode,
             'opportunities': [],
             'highlights': {
@@ -1257,78 +1728,136 @@ def api_scan():
                 'cheapest_profit': None,
                 'highest_probability': None
             },
-            'message': mode_message.get(data_mode, 'No data available'),
+            'message': NO_SCAN_RESULTS_MESSAGE.get(data_mode, 'No data available'),
             'options_sources_used': list(options_sources_used),
             'timestamp': datetime.utcnow().isoformat() + 'Z'
-        })
-    
-    # Sort by profit_score DESC
-    opportunities.sort(key=lambda x: x['metrics']['profit_score'], reverse=True)
+        }
     
-    # Add rank
+    # Add rank and category tags
     for i, opp in enumerate(opportunities, 1):
         opp['rank'] = i
-        
-        # Add category tags
-        tags = ['budget_fit']
-        if opp['metrics']['profit_score'] > 0.5:
-            tags.append('high_profit')
-        if opp['metrics']['liquidity_score'] > 0.6:
-            tags.append('liquid')
-        if opp['contract'].get('delta'):
-            abs_delta = abs(opp['contract']['delta'])
-            if abs_delta > 0.6:
-                tags.append('high_probability')
-        opp['category_tags'] = tags
-    
-    # Build highlights
-    highest_profit = opportunities[0] if opportunities else None
-    
-    # Cheapest with positive profit score
-    positive_opps = [o for o in opportunities if o['metrics']['profit_score'] > 0]
-    cheapest_profit = min(positive_opps, key=lambda x: x['metrics']['cost_to_enter']) if positive_opps else None
-    
-    # Highest probability (highest abs delta)
-    with_delta = [o for o in opportunities if o['contract'].get('delta') is not None]
-    if with_delta:
-        highest_probability = max(with_delta, key=lambda x: abs(x['contract']['delta']))
-    else:
-        # Fallback: closest to ITM
-        def itm_distance(opp):
-            strike = opp['contract']['strike']
-            spot = opp['spot']
-            ctype = opp['contract']['type']
-            if ctype == 'CALL':
-                is_itm = 1 if strike <= spot else 0
-                dist = abs(spot - strike)
-            else:
-                is_itm = 1 if strike >= spot else 0
-                dist = abs(spot - strike)
-            return (-is_itm, dist)
-        
-        highest_probability = min(opportunities, key=itm_distance) if opportunities else None
-    
-    highlights = {
-        'highest_profit': highest_profit,
-        'cheapest_profit': cheapest_profit,
-        'highest_probability': highest_probability
-    }
-    
-    # Build mode-specific message
-    if data_mode == 'live':
-        mode_message = f'LIVE MODE: Real-time options data from {", ".join(options_sources_used)}.'
-    else:
-        mode_message = f'DELAYED TEST MODE: Using delayed options data from {", ".join(options_sources_used)} for backtesting and practice. Not suitable for real-time entries.'
+        opp['category_tags'] = category_tags(opp)
     
-    return jsonify({
+    return {
         'data_mode': data_mode,
         'opportunities': opportunities,
-        'highlights': highlights,
-        'total_found': len(opportunities),
+        'highlights': highlights.as_dict(with_rank=top is not None),
+        'total_found': highlights.count,
         'options_sources_used': list(options_sources_used),
-        'message': mode_message,
+        'message': scan_mode_message(data_mode, options_sources_used),
         'timestamp': datetime.utcnow().isoformat() + 'Z'
-    })
+    }
+
+def paginate_scan(tickers, expiry, budget, limit, page_size, compact, scan_id=None, offset=0):
+    """
+    One page of a cached scan. The first request (no cursor) runs the scan - or
+    reuses one with the same budget/expiry/tickers/limit from the last
+    SCAN_RESULTS_TTL seconds - and every page after that is a slice of the same
+    ranked result set, so pages never shift while the client walks them.
+    
+    Adds: offset, page_size, next_cursor (null on the last page), scan_id.
+    A cursor whose result set has expired gets 410 - restart from the first page.
+    """
+    key = (budget, expiry, tuple(tickers), limit)
+    if scan_id is None:
+        scan = scan_results_cache.get_or_load(
+            key, lambda: dict(run_scan(tickers, expiry, budget, limit), scan_id=uuid.uuid4().hex))
+    else:
+        scan = scan_results_cache.get(key)
+        if scan is None or scan['scan_id'] != scan_id:
+            return jsonify({'error': 'Cursor expired - request the first page again'}), 410
+    
+    opportunities = scan['opportunities']
+    end = offset + page_size
+    page = dict(scan, opportunities=opportunities[offset:end], offset=offset, page_size=page_size)
+    page['next_cursor'] = encode_cursor(budget, expiry, list(tickers), limit, scan['scan_id'], end) \
+        if end < len(opportunities) else None
+    return jsonify(compact_result(page) if compact else page)
+
+def stream_scan(tickers, expiry, budget, sse=False, limit=None):
+    """
+    Streaming /api/scan: chains are fetched in parallel and each ticker's
+    opportunities are sent as soon as they are scored, so the first results
+    arrive after the fastest chain instead of the slowest. Only the current
+    batch and the running highlights are held in memory.
+    
+    Events (NDJSON lines with an "event" field, or SSE "event:" frames):
+      - start: data_mode, tickers, budget, expiry
+      - batch: ticker, opportunities (best profit_score first, with category_tags), count
+      - skip: ticker, reason (no_price | no_chain | empty | error | timeout)
+      - highlights: highlights, total_found, options_sources_used, message, timed_out_tickers,
+        plus top_opportunities (ranked best `limit`) when a limit was given
+    Batch opportunities carry no global rank (it needs the full result set);
+    the highlights and top_opportunities do.
+    """
+    data_mode = get_data_mode()
+    
+    def encode(event, payload):
+        body = app.json.dumps(dict(payload, event=event), sort_keys=False)
+        return f"event: {event}\ndata: {body}\n\n" if sse else body + "\n"
+    
+    def fetch_chain(ticker, timing):
+        with timing.stage('price'):
+            price_data = live_prices.get(ticker) or get_live_price(ticker)
+        if not price_data:
+            timing.status = 'no_price'
+            return None
+        with timing.stage('chain'):
+            options_result = fetch_options_for_scan(ticker, expiry, spot=price_data['price'])
+        if not options_result['contracts'] or not options_result['source']:
+            timing.status = 'no_chain'
+            return None
+        return price_data, options_result
+    
+    def generate():
+        yield encode('start', {'data_mode': data_mode, 'tickers': tickers, 'budget': budget, 'expiry': expiry})
+        
+        # Batch-quote inside the deadline, after the first byte; the workers quote what it missed
+        started = time.perf_counter()
+        live_prices.update(prefetch_live_prices(tickers, SCAN_DEADLINE_SECONDS * SCAN_QUOTE_SHARE))
+        executor = ScanExecutor(deadline_seconds=SCAN_DEADLINE_SECONDS - (time.perf_counter() - started))
+        
+        highlights = ScanHighlights()
+        top = TopK(limit, lambda x: x['metrics']['profit_score']) if limit else None
+        options_sources_used = set()
+        timings = {}
+        for ticker, fetched, timing in executor.iter_results(tickers, fetch_chain, timings):
+            if not fetched:
+                yield encode('skip', {'ticker': ticker, 'reason': timing.status})
+                continue
+            price_data, options_result = fetched
+            options_sources_used.add(options_result['source'])
+            batch = score_scan_chain(ticker, price_data, options_result, budget)
+            batch.sort(key=lambda x: x['metrics']['profit_score'], reverse=True)
+            for opp in batch:
+                opp['category_tags'] = category_tags(opp)
+                highlights.add(opp)
+                if top is not None:
+                    top.add(opp)
+            yield encode('batch', {'ticker': ticker, 'opportunities': batch, 'count': len(batch)})
+        
+        timed_out = [t for t in tickers if timings[t].status == 'timeout']
+        for ticker in timed_out:
+            yield encode('skip', {'ticker': ticker, 'reason': 'timeout'})
+        final = {
+            'highlights': highlights.as_dict(with_rank=True),
+            'total_found': highlights.count,
+            'options_sources_used': list(options_sources_used),
+            'message': scan_mode_message(data_mode, options_sources_used) if highlights.count
+                       else NO_SCAN_RESULTS_MESSAGE.get(data_mode, 'No data available'),
+            'timed_out_tickers': timed_out,
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        }
+        if top is not None:
+            final['top_opportunities'] = [dict(opp, rank=i) for i, opp in enumerate(top.top(), 1)]
+        yield encode('highlights', final)
+    
+    live_prices = {}
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/api/auto-recommend')
 def api_auto_recommend():
@@ -1340,12 +1869,20 @@ def api_auto_recommend():
       - expiry: YYYY-MM-DD (required)
       - bias: 'bullish' or 'bearish' (optional, default: bullish)
       - tickers: CSV string (optional, default: DEFAULT_TICKERS)
+      - deadline: seconds (optional, capped at SCAN_DEADLINE_SECONDS)
+      - limit (alias top_k): int (optional, default: 10) - number of alternatives
+      - universe: "full" (optional) - pre-screen UNIVERSE_FILE and scan the best `top_n`
+        (default PRESCREEN_TOP_N) instead of `tickers`
     
     Returns:
       - primary_recommendation: single best contract across all tickers
-      - alternatives: next best 5-10 contracts
+      - alternatives: next best `limit` contracts
       - universe_size: number of tickers scanned
       - scanned_tickers: list of tickers attempted
+      - ticker_timings: per-ticker status and ms spent per stage
+      - timed_out_tickers / partial_results: tickers cut off by the deadline
+      - funnel / prescreen (universe=full): tickers left and ms per stage, and the survivors
+        with their pre-screen scores
     """
     # Parse params
     try:
@@ -1362,40 +1899,84 @@ def api_auto_recommend():
     # Note: bias parameter is now optional - we determine direction by analyzing both calls and puts
     bias = request.args.get('bias', 'auto').strip().lower()
     
+    top_n, error = parse_universe()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    alternatives_limit, error = parse_top_k(default=10)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # Overall scan deadline (seconds), pre-screen included - tickers still in flight are reported as timed out
+    try:
+        deadline = float(request.args.get('deadline', SCAN_DEADLINE_SECONDS))
+        deadline = max(1.0, min(deadline, SCAN_DEADLINE_SECONDS))
+    except ValueError:
+        deadline = SCAN_DEADLINE_SECONDS
+    scan_started = time.perf_counter()
+    
     # Get ticker universe
-    tickers_param = request.args.get('tickers', '').strip()
-    if tickers_param:
-        tickers = [t.strip().upper() for t in tickers_param.split(',') if t.strip()]
+    funnel = None
+    if top_n:
+        # Only tickers that can still reach the threshold once a contract's IV rule fires
+        screened, funnel = screen_universe(
+            top_n,
+            direction={'bullish': 'call', 'bearish': 'put'}.get(bias),
+            min_score=CONFIDENCE_MIN_THRESHOLD - max(SCORING_WEIGHTS.iv, 0),
+            deadline=deadline
+        )
+        tickers = screened.survivors
     else:
-        tickers = DEFAULT_TICKERS.copy()
-    
-    if not tickers:
-        return jsonify({'error': 'No valid tickers provided'}), 400
+        tickers_param = request.args.get('tickers', '').strip()
+        if tickers_param:
+            tickers = [t.strip().upper() for t in tickers_param.split(',') if t.strip()]
+        else:
+            tickers = DEFAULT_TICKERS.copy()
+        
+        if not tickers:
+            return jsonify({'error': 'No valid tickers provided'}), 400
     
     # Detect data mode
     data_mode = get_data_mode()
     
-    # Scan all tickers and collect candidates for BOTH calls and puts
-    all_call_candidates = []
-    all_put_candidates = []
+    # Batch-quote every ticker up front (within its share of the deadline) so the
+    # per-ticker fetches hit the price cache, then fetch price + chain for every
+    # ticker in parallel (bounded per provider) in the time left
+    started = time.perf_counter()
+    prefetch_live_prices(tickers, deadline * SCAN_QUOTE_SHARE)
+    scan_report = ScanExecutor(deadline_seconds=deadline - (time.perf_counter() - scan_started)).run(
+        tickers, lambda t, timing: fetch_ticker_for_scan(t, expiry, timing, with_context=True)
+    )
+    if funnel is not None:
+        funnel.add('chains', sum(1 for fetched in scan_report.results.values()
+                                 if fetched and fetched['options_result'] and fetched['options_result']['contracts']),
+                   time.perf_counter() - started)
+    days_to_expiry = days_until(expiry)
+    
+    # Scan all tickers and rank candidates for BOTH calls and puts as they are scored -
+    # only the primary + alternatives per direction are kept, never the full lists
+    call_pool = CandidatePool(alternatives_limit + 1, CONFIDENCE_MIN_THRESHOLD)
+    put_pool = CandidatePool(alternatives_limit + 1, CONFIDENCE_MIN_THRESHOLD)
     scanned_tickers = []
     options_sources_used = set()
+    passed_tickers = 0
+    started = time.perf_counter()
     
     for ticker in tickers:
         scanned_tickers.append(ticker)
         
-        # Get live price
-        price_data = get_live_price(ticker)
-        if not price_data:
+        fetched = scan_report.results.get(ticker)
+        if not fetched:
             continue
         
+        price_data = fetched['price_data']
         spot = price_data['price']
         price_source = price_data['source']
         
-        # Fetch options
-        options_result = fetch_options_for_scan(ticker, expiry)
+        options_result = fetched['options_result']
         if not options_result:
             continue
+        context = fetched['context']
         
         options_chain = options_result['contracts']
         options_source = options_result['source']
@@ -1405,105 +1986,85 @@ def api_auto_recommend():
         if not options_chain:
             continue
         
-        # Filter CALLs near ATM (within ±10% of spot price)
-        call_candidates = [c for c in options_chain 
-                          if c.get('type') == 'CALL' 
-                          and abs(c.get('strike', 0) - spot) / spot <= 0.10]
+        # Score the whole chain in one vectorized pass
+        chain_metrics = compute_chain_metrics(spot, **options_chain.metric_columns())
         
-        # Filter PUTs near ATM (within ±10% of spot price)
-        put_candidates = [c for c in options_chain 
-                         if c.get('type') == 'PUT' 
-                         and abs(c.get('strike', 0) - spot) / spot <= 0.10]
+        # Near ATM (within ±10% of spot price)
+        with np.errstate(invalid='ignore'):
+            near_atm = np.abs(options_chain.strike - spot) / spot <= 0.10
+        call_candidates = np.flatnonzero(near_atm & options_chain.is_call)
+        put_candidates = np.flatnonzero(near_atm & ~options_chain.is_call)
         
-        # Compute metrics for calls
-        for contract in call_candidates:
-            metrics = compute_metrics(contract, spot)
+        # Affordable candidates, calls then puts
+        candidates = []
+        for i in np.concatenate([call_candidates, put_candidates]):
+            metrics = chain_metrics.record(i)
             if metrics and metrics['cost_to_enter'] <= budget:
-                # Compute confirmation-based confidence score
-                confirmation_result = compute_confirmation_score(
-                    ticker=ticker,
-                    option_type='CALL',
-                    current_iv=contract.get('iv'),
-                    expiry_date=expiry
-                )
-                
-                all_call_candidates.append({
-                    'ticker': ticker,
-                    'spot': spot,
-                    'contract': contract,
-                    'metrics': metrics,
-                    'price_source': price_source,
-                    'options_source': options_source,
-                    'data_mode': data_mode,
-                    'confidence': confirmation_result['confidence'],
-                    'confirmations': confirmation_result['confirmations']
-                })
+                candidates.append((options_chain.record(i), metrics))
+        
+        # Confirmation-based confidence for all of them in one pass over the shared ticker context (no I/O)
+        confirmation_results = score_contracts(
+            context,
+            [contract['type'] for contract, _ in candidates],
+            [contract.get('iv') for contract, _ in candidates],
+            days_to_expiry=days_to_expiry
+        )
         
-        # Compute metrics for puts
-        for contract in put_candidates:
-            metrics = compute_metrics(contract, spot)
-            if metrics and metrics['cost_to_enter'] <= budget:
-                # Compute confirmation-based confidence score
-                confirmation_result = compute_confirmation_score(
-                    ticker=ticker,
-                    option_type='PUT',
-                    current_iv=contract.get('iv'),
-                    expiry_date=expiry
-                )
-                
-                all_put_candidates.append({
-                    'ticker': ticker,
-                    'spot': spot,
-                    'contract': contract,
-                    'metrics': metrics,
-                    'price_source': price_source,
-                    'options_source': options_source,
-                    'data_mode': data_mode,
-                    'confidence': confirmation_result['confidence'],
-                    'confirmations': confirmation_result['confirmations']
-                })
+        passed_tickers += any(r['confidence'] >= CONFIDENCE_MIN_THRESHOLD for r in confirmation_results)
+        for (contract, metrics), confirmation_result in zip(candidates, confirmation_results):
+            pool = call_pool if contract['type'] == 'CALL' else put_pool
+            pool.add({
+                'ticker': ticker,
+                'spot': spot,
+                'contract': contract,
+                'metrics': metrics,
+                'price_source': price_source,
+                'options_source': options_source,
+                'data_mode': data_mode,
+                'confidence': confirmation_result['confidence'],
+                'confirmations': confirmation_result['confirmations']
+            })
+    
+    if funnel is not None:
+        funnel.add('scored', passed_tickers, time.perf_counter() - started)
+        print(f"[Funnel] {funnel.summary()}")
     
     # Debug: Log confirmation scores before filtering
     import sys
     print(f"\n📊 Pre-filter Candidates:", file=sys.stderr, flush=True)
-    print(f"  CALLS: {len(all_call_candidates)} candidates", file=sys.stderr, flush=True)
-    if all_call_candidates:
-        sample_calls = sorted(all_call_candidates, key=lambda x: x['confidence'], reverse=True)[:5]
-        for c in sample_calls:
+    print(f"  CALLS: {call_pool.total} candidates", file=sys.stderr, flush=True)
+    if call_pool.total:
+        for c in call_pool.sample.top():
             print(f"    {c['ticker']} CALL: {c['confidence']:.1f}% - {c['confirmations']}", file=sys.stderr, flush=True)
     
-    print(f"  PUTS: {len(all_put_candidates)} candidates", file=sys.stderr, flush=True)
-    if all_put_candidates:
-        sample_puts = sorted(all_put_candidates, key=lambda x: x['confidence'], reverse=True)[:5]
-        for p in sample_puts:
+    print(f"  PUTS: {put_pool.total} candidates", file=sys.stderr, flush=True)
+    if put_pool.total:
+        for p in put_pool.sample.top():
             print(f"    {p['ticker']} PUT: {p['confidence']:.1f}% - {p['confirmations']}", file=sys.stderr, flush=True)
     
-    # Filter candidates by minimum confidence threshold
-    all_call_candidates = [c for c in all_call_candidates if c['confidence'] >= CONFIDENCE_MIN_THRESHOLD]
-    all_put_candidates = [p for p in all_put_candidates if p['confidence'] >= CONFIDENCE_MIN_THRESHOLD]
-    
+    # Pools only kept candidates at or above the confidence threshold.
     # Determine favored direction by summing profit scores of high-confidence candidates only
-    total_call_score = sum(c['metrics']['profit_score'] for c in all_call_candidates)
-    total_put_score = sum(p['metrics']['profit_score'] for p in all_put_candidates)
+    total_call_score = call_pool.profit_score_sum
+    total_put_score = put_pool.profit_score_sum
     
     # Override with user bias if specified
     if bias == 'bullish':
         favored = 'CALL'
-        all_candidates = all_call_candidates
+        pool = call_pool
     elif bias == 'bearish':
         favored = 'PUT'
-        all_candidates = all_put_candidates
+        pool = put_pool
     else:
         # Auto-detect: choose direction with higher aggregate score
         if total_call_score >= total_put_score:
             favored = 'CALL'
-            all_candidates = all_call_candidates
+            pool = call_pool
         else:
             favored = 'PUT'
-            all_candidates = all_put_candidates
+            pool = put_pool
     
-    # Sort candidates by confidence score descending (not profit_score)
-    all_candidates.sort(key=lambda x: x['confidence'], reverse=True)
+    # Best candidates by confidence score descending (not profit_score)
+    all_candidates = pool.top.top()
     
     # Pick primary recommendation (highest confidence) and alternatives
     primary = None
@@ -1573,8 +2134,8 @@ def api_auto_recommend():
             'explanation_risks': explanation_risks
         }
         
-        # Alternatives: next 10 best with confirmations
-        for candidate in all_candidates[1:11]:
+        # Alternatives: next best with confirmations
+        for candidate in all_candidates[1:]:
             c = candidate['contract']
             m = candidate['metrics']
             alternatives.append({
@@ -1594,11 +2155,11 @@ def api_auto_recommend():
     
     # Build response
     if primary:
-        message = f"Scanned {len(scanned_tickers)} tickers. Found {len(all_candidates)} high-confidence {favored} trades (confidence ≥ {CONFIDENCE_MIN_THRESHOLD}%)."
+        message = f"Scanned {len(scanned_tickers)} tickers. Found {pool.passed} high-confidence {favored} trades (confidence ≥ {CONFIDENCE_MIN_THRESHOLD}%)."
     else:
         message = f"No high-confidence trades found (confidence ≥ {CONFIDENCE_MIN_THRESHOLD}%). Market conditions do not support strong signals right now. Try adjusting your parameters or check back later."
     
-    return jsonify({
+    response = {
         'data_mode': data_mode,
         'options_source': ', '.join(str(s) for s in options_sources_used if s) if options_sources_used else 'none',
         'favored_direction': favored,
@@ -1607,11 +2168,19 @@ def api_auto_recommend():
         'budget': budget,
         'universe_size': len(tickers),
         'scanned_tickers': scanned_tickers,
+        'timed_out_tickers': scan_report.timed_out,
+        'partial_results': scan_report.partial,
+        'scan_elapsed_ms': scan_report.elapsed_ms,
+        'ticker_timings': scan_report.timings_as_dicts(),
         'primary_recommendation': primary,
         'alternatives': alternatives,
         'message': message,
         'timestamp': datetime.utcnow().isoformat() + 'Z'
-    })
+    }
+    if funnel is not None:
+        response['funnel'] = funnel.as_dict()
+        response['prescreen'] = screened.candidates
+    return jsonify(response)
 
 # ============================================================================
 # 5️⃣ SERVER STARTUP
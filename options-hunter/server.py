@@ -15,6 +15,9 @@ import psutil
 import logging
 from functools import wraps
 import signal
+from ohlcv_store import get_ohlcv_store
+from ttl_cache import TTLCache
+from cache_backend import get_shared_backend
 
 # Initialize Flask
 app = Flask(__name__, static_folder='.', static_url_path='')
@@ -45,6 +48,9 @@ ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
 DATABASE_URL = os.getenv('DATABASE_URL')
 REDIS_URL = os.getenv('REDIS_URL')
 
+# Quotes shared by every Gunicorn worker when REDIS_URL (or CACHE_BACKEND) is set
+price_cache = TTLCache('server-prices', 2000, 60, shared=get_shared_backend())
+
 # ============================================================================
 # HEALTH CHECK & MONITORING
 # ============================================================================
@@ -204,6 +210,13 @@ def serve_static(path):
 # API ENDPOINTS
 # ============================================================================
 
+def fetch_last_price(ticker):
+    stock = yf.Ticker(ticker)
+    hist = stock.history(period='1d', interval='1m')
+    if hist.empty:
+        hist = stock.history(period='1d')
+    return float(hist['Close'].iloc[-1]) if not hist.empty else None
+
 @app.route('/api/price')
 @track_request
 def api_price():
@@ -211,11 +224,7 @@ def api_price():
     if not ticker:
         return jsonify({'error':'missing ticker'}), 400
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period='1d', interval='1m')
-        if hist.empty:
-            hist = stock.history(period='1d')
-        price = hist['Close'].iloc[-1] if not hist.empty else None
+        price = price_cache.get_or_load(ticker, lambda: fetch_last_price(ticker))
         if not price:
             return jsonify({'error': 'No price data'}), 404
         return jsonify({'c': float(price), 'ticker': ticker}), 200
@@ -235,8 +244,7 @@ def api_scan():
     signals = []
     for ticker in tickers:
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period='1mo')
+            hist = get_ohlcv_store().history(ticker, '1mo')
             if hist.empty:
                 continue
             
@@ -1,26 +1,32 @@
 """
 signals.py - Core confidence scoring engine for options
-Implements rules-based confirmation system with technical indicators
+Implements rules-based confirmation system with technical indicators.
+Pure functions only: callers assemble SignalInputs from data they already
+hold, so scoring is deterministic and can be benchmarked or replayed offline
 """
 
-from typing import Literal, TypedDict, List
-from dataclasses import dataclass
+import os
+from typing import Dict, List, Literal, Optional, Sequence, TypedDict, Union
+from dataclasses import dataclass, fields
+
+import numpy as np
 
 Direction = Literal["call", "put"]
 
 class SignalInputs(TypedDict):
-    """Input data for confidence computation"""
+    """Input data for confidence computation (None = not available, the rule is skipped)"""
     direction: Direction
     price: float
-    ema9: float
-    ema20: float
-    rsi: float
+    ema9: Optional[float]
+    ema20: Optional[float]
+    rsi: Optional[float]
     rsi_slope: float  # positive = rising, negative = falling
-    volume: float
-    avg_volume_20: float
-    sector_price_change: float  # % change today, e.g. 0.45 for +0.45%
-    sector_above_ema20: bool
-    iv_rank: float  # 0-100
+    volume: Optional[float]
+    avg_volume_20: Optional[float]
+    price_change_pct: float  # Underlying % change today - volume expansion must agree with the direction
+    sector_price_change: Optional[float]  # % change today, e.g. 0.45 for +0.45%; None = no sector ETF
+    sector_above_ema20: Optional[bool]
+    iv_rank: Optional[float]  # 0-100
     has_near_earnings: bool
     has_major_macro_event: bool
 
@@ -30,70 +36,228 @@ class ConfidenceResult:
     confidence: float  # 0-100
     confirmations: List[str]  # machine-readable tags
 
-def compute_confidence(inputs: SignalInputs) -> ConfidenceResult:
+@dataclass(frozen=True)
+class ScoringWeights:
+    """Points per confirmation rule. Tuned for "3+ confirmations = tradeable"."""
+    trend: float = 25             # Bullish/bearish trend confirmation
+    rsi: float = 20               # RSI momentum
+    volume: float = 15            # BONUS for volume expansion (not required to pass)
+    sector: float = 15            # Sector ETF alignment
+    iv: float = 10                # Favorable IV rank
+    earnings_penalty: float = -15  # Earnings within 3 days
+    macro_penalty: float = -10     # Major macro events
+
+    # Environment variable overriding each weight
+    ENV = {
+        'trend': 'SCORE_TREND', 'rsi': 'SCORE_RSI', 'volume': 'SCORE_VOLUME', 'sector': 'SCORE_SECTOR',
+        'iv': 'SCORE_IV', 'earnings_penalty': 'PENALTY_EARNINGS', 'macro_penalty': 'PENALTY_MACRO_EVENT',
+    }
+
+    @classmethod
+    def from_env(cls) -> 'ScoringWeights':
+        """Defaults, overridden by SCORE_TREND / SCORE_RSI / ... / PENALTY_MACRO_EVENT when set."""
+        overrides = {}
+        for f in fields(cls):
+            raw = os.getenv(cls.ENV[f.name])
+            if raw:
+                value = float(raw)
+                overrides[f.name] = int(value) if value.is_integer() else value
+        return cls(**overrides)
+
+DEFAULT_WEIGHTS = ScoringWeights()
+
+# Rule tags, in the order they are reported
+RULES = ('trend', 'rsi', 'volume', 'sector', 'iv', 'earnings', 'macro')
+CALL_TAGS = {'trend': 'bullish_trend', 'rsi': 'rsi_bullish', 'volume': 'volume_expansion',
+             'sector': 'sector_bullish', 'iv': 'iv_ok_for_calls',
+             'earnings': 'penalty_earnings_nearby', 'macro': 'penalty_macro_event'}
+PUT_TAGS = dict(CALL_TAGS, trend='bearish_trend', rsi='rsi_bearish', sector='sector_bearish', iv='iv_ok_for_puts')
+
+def compute_confidence(inputs: SignalInputs, weights: ScoringWeights = DEFAULT_WEIGHTS) -> ConfidenceResult:
     """
     Core scoring logic for both calls and puts.
-    Weighting is tuned for "3+ confirmations = tradeable".
-    
+
     Returns confidence score 0-100 and list of confirmations.
     """
-    score = 0.0
+    score = 0
     confirmations: List[str] = []
-    
+    is_call = inputs['direction'] == 'call'
+    tags = CALL_TAGS if is_call else PUT_TAGS
+    price, ema9, ema20 = inputs['price'], inputs['ema9'], inputs['ema20']
+
     # 1) Trend / EMA structure
-    if inputs['direction'] == 'call':
-        if inputs['price'] > inputs['ema9'] and inputs['ema9'] > inputs['ema20']:
-            score += 20
-            confirmations.append('bullish_trend')
-    else:
-        if inputs['price'] < inputs['ema9'] and inputs['ema9'] < inputs['ema20']:
-            score += 20
-            confirmations.append('bearish_trend')
-    
+    if ema9 and ema20:
+        if (price > ema9 and ema9 > ema20) if is_call else (price < ema9 and ema9 < ema20):
+            score += weights.trend
+            confirmations.append(tags['trend'])
+
     # 2) RSI behaviour
-    if inputs['direction'] == 'call':
-        if 45 < inputs['rsi'] < 70 and inputs['rsi_slope'] > 0:
-            score += 15
-            confirmations.append('rsi_bullish')
-    else:
-        if 30 < inputs['rsi'] < 55 and inputs['rsi_slope'] < 0:
-            score += 15
-            confirmations.append('rsi_bearish')
-    
-    # 3) Volume expansion
-    if inputs['volume'] >= 1.2 * inputs['avg_volume_20']:
-        score += 15
-        confirmations.append('volume_expansion')
-    
+    rsi, rsi_slope = inputs['rsi'], inputs['rsi_slope']
+    if rsi:
+        if (45 < rsi < 70 and rsi_slope > 0) if is_call else (30 < rsi < 55 and rsi_slope < 0):
+            score += weights.rsi
+            confirmations.append(tags['rsi'])
+
+    # 3) Volume expansion on a move in the trade's direction
+    volume, avg_volume_20 = inputs['volume'], inputs['avg_volume_20']
+    if volume and avg_volume_20 and avg_volume_20 > 0 and volume >= 1.2 * avg_volume_20:
+        price_change = inputs['price_change_pct']
+        if price_change > 0 if is_call else price_change < 0:
+            score += weights.volume
+            confirmations.append(tags['volume'])
+
     # 4) Sector ETF alignment
-    if inputs['direction'] == 'call':
-        if inputs['sector_price_change'] > 0.3 and inputs['sector_above_ema20']:
-            score += 15
-            confirmations.append('sector_bullish')
-    else:
-        if inputs['sector_price_change'] < -0.3 and not inputs['sector_above_ema20']:
-            score += 15
-            confirmations.append('sector_bearish')
-    
+    sector_change = inputs['sector_price_change']
+    if sector_change is not None:
+        if (sector_change > 0.3 and inputs['sector_above_ema20']) if is_call \
+                else (sector_change < -0.3 and not inputs['sector_above_ema20']):
+            score += weights.sector
+            confirmations.append(tags['sector'])
+
     # 5) IV rank - bonus if we're not in clown-world extremes
-    if inputs['direction'] == 'call':
-        if 20 <= inputs['iv_rank'] <= 60:
-            score += 10
-            confirmations.append('iv_ok_for_calls')
-    else:
-        if 30 <= inputs['iv_rank'] <= 70:
-            score += 10
-            confirmations.append('iv_ok_for_puts')
-    
+    iv_rank = inputs['iv_rank']
+    if iv_rank is not None:
+        if (20 <= iv_rank <= 60) if is_call else (30 <= iv_rank <= 70):
+            score += weights.iv
+            confirmations.append(tags['iv'])
+
     # 6) Event risk penalties
     if inputs['has_near_earnings']:
-        score -= 20
-        confirmations.append('penalty_earnings_nearby')
+        score += weights.earnings_penalty
+        confirmations.append(tags['earnings'])
     if inputs['has_major_macro_event']:
-        score -= 10
-        confirmations.append('penalty_macro_event')
-    
+        score += weights.macro_penalty
+        confirmations.append(tags['macro'])
+
     # Clamp 0-100
-    score = max(0.0, min(100.0, score))
-    
+    score = max(0, min(100, score))
+
     return ConfidenceResult(confidence=score, confirmations=confirmations)
+
+class BatchConfidence:
+    """
+    compute_confidence_batch() output: a confidence array plus one boolean
+    array per rule saying whether it fired.
+    """
+
+    def __init__(self, confidence: np.ndarray, is_call: np.ndarray, fired: Dict[str, np.ndarray]):
+        self.confidence = confidence
+        self.is_call = is_call
+        self.fired = fired
+
+    def __len__(self) -> int:
+        return len(self.confidence)
+
+    def result(self, i: int) -> ConfidenceResult:
+        tags = CALL_TAGS if self.is_call[i] else PUT_TAGS
+        confidence = float(self.confidence[i])
+        return ConfidenceResult(confidence=int(confidence) if confidence.is_integer() else confidence,
+                                confirmations=[tags[rule] for rule in RULES if self.fired[rule][i]])
+
+    def results(self) -> List[ConfidenceResult]:
+        return [self.result(i) for i in range(len(self))]
+
+def _column(values, dtype=float) -> np.ndarray:
+    """Scalars broadcast later; None -> NaN so missing inputs skip their rule."""
+    if isinstance(values, np.ndarray):
+        return values.astype(dtype, copy=False)
+    if np.isscalar(values) or values is None:
+        return np.asarray(np.nan if values is None else values, dtype=dtype)
+    return np.array([np.nan if v is None else v for v in values], dtype=dtype)
+
+def compute_confidence_batch(inputs: Union[Dict[str, object], Sequence[SignalInputs]],
+                             weights: ScoringWeights = DEFAULT_WEIGHTS) -> BatchConfidence:
+    """
+    Vectorized compute_confidence() over many inputs at once, with identical results.
+
+    inputs is either a list of SignalInputs or a dict keyed like SignalInputs whose
+    values are arrays or scalars (scalars broadcast - e.g. one ticker's indicators
+    against per-contract direction and iv_rank). None/NaN mean "not available".
+    """
+    if not isinstance(inputs, dict):
+        inputs = {key: [row[key] for row in inputs] for key in SignalInputs.__annotations__}
+    direction = inputs['direction']
+    is_call = np.asarray(direction) == 'call'
+    cols = {key: _column(inputs[key]) for key in SignalInputs.__annotations__ if key != 'direction'}
+    shape = np.broadcast_shapes(is_call.shape, *(c.shape for c in cols.values()))
+    is_call = np.broadcast_to(is_call, shape)
+    c = {key: np.broadcast_to(col, shape) for key, col in cols.items()}
+
+    def truthy(x):
+        return ~np.isnan(x) & (x != 0)
+
+    with np.errstate(invalid='ignore'):
+        price, ema9, ema20 = c['price'], c['ema9'], c['ema20']
+        rsi, rsi_slope = c['rsi'], c['rsi_slope']
+        volume, avg_volume = c['volume'], c['avg_volume_20']
+        sector_change, sector_above = c['sector_price_change'], c['sector_above_ema20'] == 1
+        iv_rank = c['iv_rank']
+        fired = {
+            'trend': truthy(ema9) & truthy(ema20) & np.where(
+                is_call, (price > ema9) & (ema9 > ema20), (price < ema9) & (ema9 < ema20)),
+            'rsi': truthy(rsi) & np.where(
+                is_call, (45 < rsi) & (rsi < 70) & (rsi_slope > 0), (30 < rsi) & (rsi < 55) & (rsi_slope < 0)),
+            'volume': truthy(volume) & truthy(avg_volume) & (avg_volume > 0) & (volume >= 1.2 * avg_volume) &
+                      np.where(is_call, c['price_change_pct'] > 0, c['price_change_pct'] < 0),
+            'sector': ~np.isnan(sector_change) & np.where(
+                is_call, (sector_change > 0.3) & sector_above, (sector_change < -0.3) & ~sector_above),
+            'iv': ~np.isnan(iv_rank) & np.where(
+                is_call, (20 <= iv_rank) & (iv_rank <= 60), (30 <= iv_rank) & (iv_rank <= 70)),
+            'earnings': truthy(c['has_near_earnings']),
+            'macro': truthy(c['has_major_macro_event']),
+        }
+
+    return BatchConfidence(score_rules(fired, weights), is_call, fired)
+
+def score_rules(fired: Dict[str, np.ndarray], weights: ScoringWeights = DEFAULT_WEIGHTS) -> np.ndarray:
+    """
+    Clamped confidence from per-rule fired masks (BatchConfidence.fired). Which rules
+    fire doesn't depend on the weights, so re-weighting only needs this step.
+    """
+    points = {'trend': weights.trend, 'rsi': weights.rsi, 'volume': weights.volume, 'sector': weights.sector,
+              'iv': weights.iv, 'earnings': weights.earnings_penalty, 'macro': weights.macro_penalty}
+    score = np.zeros(np.broadcast_shapes(*(mask.shape for mask in fired.values())))
+    for rule in RULES:
+        if points[rule]:
+            score += np.where(fired[rule], points[rule], 0.0)
+    return np.clip(score, 0, 100)
+
+
+if __name__ == '__main__':
+    # Scalar vs batch timing (equivalence lives in tests/test_signals.py)
+    import random
+    import time
+
+    rnd = random.Random(21)
+    maybe = lambda v: None if rnd.random() < 0.1 else v
+    rows: List[SignalInputs] = []
+    for _ in range(20000):
+        price = rnd.uniform(90, 110)
+        rows.append({
+            'direction': rnd.choice(['call', 'put']),
+            'price': price,
+            'ema9': maybe(price * rnd.uniform(0.97, 1.03)),
+            'ema20': maybe(price * rnd.uniform(0.95, 1.05)),
+            'rsi': maybe(rnd.uniform(20, 80)),
+            'rsi_slope': rnd.uniform(-5, 5),
+            'volume': maybe(rnd.uniform(0, 3e6)),
+            'avg_volume_20': maybe(rnd.choice([0.0, rnd.uniform(5e5, 2e6)])),
+            'price_change_pct': rnd.uniform(-3, 3),
+            'sector_price_change': maybe(rnd.uniform(-1, 1)),
+            'sector_above_ema20': rnd.choice([True, False, None]),
+            'iv_rank': maybe(rnd.uniform(0, 100)),
+            'has_near_earnings': rnd.random() < 0.2,
+            'has_major_macro_event': rnd.random() < 0.1,
+        })
+
+    weights = ScoringWeights(trend=30, macro_penalty=-5)
+    t0 = time.perf_counter()
+    expected = [compute_confidence(r, weights) for r in rows]
+    scalar_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    batch = compute_confidence_batch(rows, weights)
+    batch_ms = (time.perf_counter() - t0) * 1000
+
+    print(f"{len(rows)} inputs: scalar {scalar_ms:.1f}ms, batch {batch_ms:.1f}ms (incl. list -> columns)")
+    print(f"mean confidence {batch.confidence.mean():.1f}, "
+          + ", ".join(f"{rule} {batch.fired[rule].mean():.0%}" for rule in RULES))
@@ -0,0 +1,105 @@
+"""
+single_flight.py - Coalesce concurrent identical lookups into one call
+The first caller for a key runs the fetch; callers arriving while it is in
+flight wait for that result instead of hitting the provider again
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List
+
+_registry: List['SingleFlight'] = []
+_registry_lock = threading.Lock()
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Per-key deduplication of in-flight calls (Go's singleflight pattern).
+
+    Only concurrent callers are merged - once the call returns, the next
+    caller for the key runs it again (pair with a TTLCache for reuse).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0   # Calls that actually ran
+        self.coalesced = 0  # Calls that waited on someone else's result
+        with _registry_lock:
+            _registry.append(self)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn() for key, or wait for the identical call already in flight. Errors propagate to all waiters."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                'name': self.name,
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'coalesced_pct': round(self.coalesced / total * 100, 1) if total else None,
+                'in_flight': len(self._calls),
+            }
+
+
+def flight_stats() -> List[Dict[str, Any]]:
+    """Stats for every SingleFlight group created in this process."""
+    with _registry_lock:
+        groups = list(_registry)
+    return [g.stats() for g in groups]
+
+
+if __name__ == '__main__':
+    # 20 threads ask for the same key at once (behaviour lives in tests/test_single_flight.py)
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    flight = SingleFlight('demo')
+
+    def slow_fetch():
+        time.sleep(0.2)
+        return 'SPY chain'
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        list(pool.map(lambda _: flight.do(('Tradier', 'SPY', '2026-11-20'), slow_fetch), range(20)))
+    print(f"20 callers in {(time.perf_counter() - t0) * 1000:.0f}ms: {flight.stats()}")
@@ -0,0 +1,189 @@
+"""
+sweep.py - Grid search over the confirmation weights, threshold and exit rules
+Every combination is replayed by backtest.run_backtests() against one cached
+universe: indicators, rule masks and trade paths are computed once and shared,
+so a combination costs a re-weighting plus exit bookkeeping. Writes a ranked table.
+Usage: python sweep.py [AXIS=v1,v2,... ...] [TICKER ...]   (no tickers: synthetic universe)
+  AXIS is CONFIDENCE_MIN_THRESHOLD, SCORE_TREND, SCORE_RSI, ... PENALTY_MACRO_EVENT,
+  or a BacktestConfig field (take_profit, stop_loss, hold_days, days_to_expiry, spread_pct)
+"""
+
+import dataclasses
+import itertools
+import os
+import sys
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import pandas as pd
+
+from backtest import (BACKTEST_PERIOD, BacktestConfig, Signals, Universe, load_universe, run_backtests,
+                      synthetic_frames)
+from ohlcv_store import OHLCV_DB_PATH
+from signals import ScoringWeights
+
+SWEEP_CACHE_PATH = os.getenv("SWEEP_CACHE_PATH", os.path.join(os.path.dirname(OHLCV_DB_PATH), "backtest_universe.npz"))
+SWEEP_CACHE_TTL = float(os.getenv("SWEEP_CACHE_TTL", "43200"))  # Seconds before the cached universe is reloaded
+SWEEP_OUTPUT = os.getenv("SWEEP_OUTPUT", os.path.join(os.path.dirname(OHLCV_DB_PATH), "sweep_results.csv"))
+SWEEP_RANK_BY = os.getenv("SWEEP_RANK_BY", "avg_return_pct")   # Any numeric results column
+SWEEP_MIN_TRADES = int(os.getenv("SWEEP_MIN_TRADES", "100"))   # Fewer trades than this rank last - too few to trust
+
+# 432 combinations around the shipped defaults
+DEFAULT_GRID = {
+    'threshold': (30, 40, 50, 60),
+    'trend': (15, 25, 35),
+    'rsi': (10, 20, 30),
+    'volume': (5, 15),
+    'sector': (5, 15, 25),
+    'iv': (0, 10),
+}
+
+WEIGHT_FIELDS = tuple(f.name for f in dataclasses.fields(ScoringWeights))
+CONFIG_FIELDS = tuple(f.name for f in dataclasses.fields(BacktestConfig) if f.name != 'weights')
+# The server's environment names work as axis names too
+AXIS_ALIASES = dict({env: name for name, env in ScoringWeights.ENV.items()}, CONFIDENCE_MIN_THRESHOLD='threshold')
+RESULT_COLUMNS = ('trades', 'calls', 'puts', 'hit_rate', 'avg_return_pct', 'median_return_pct', 'p5_return_pct',
+                  'p95_return_pct', 'profit_factor', 'avg_days_held')
+
+
+def _number(raw: str):
+    value = float(raw)
+    return int(value) if value.is_integer() else value
+
+
+def parse_args(argv: Sequence[str]) -> Tuple[Dict[str, tuple], List[str]]:
+    """'AXIS=v1,v2' arguments become grid axes, everything else is a ticker."""
+    axes, tickers = {}, []
+    for arg in argv:
+        if '=' in arg:
+            name, values = arg.split('=', 1)
+            axes[name] = tuple(_number(v) for v in values.split(',') if v)
+        else:
+            tickers.append(arg.upper())
+    return axes, tickers
+
+
+def build_grid(axes: Dict[str, Sequence], base: BacktestConfig = BacktestConfig()) -> List[BacktestConfig]:
+    """Every combination of the axis values, on top of base for anything not swept."""
+    names = [AXIS_ALIASES.get(name, name) for name in axes]
+    unknown = [name for name in names if name not in WEIGHT_FIELDS and name not in CONFIG_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown sweep axes: {', '.join(unknown)}")
+    configs = []
+    for values in itertools.product(*axes.values()):
+        combo = dict(zip(names, values))
+        weights = dataclasses.replace(base.weights, **{k: v for k, v in combo.items() if k in WEIGHT_FIELDS})
+        configs.append(dataclasses.replace(base, weights=weights,
+                                           **{k: v for k, v in combo.items() if k in CONFIG_FIELDS}))
+    return configs
+
+
+def load_dataset(tickers: Sequence[str], period: str = BACKTEST_PERIOD, path: str = SWEEP_CACHE_PATH,
+                 max_age: float = SWEEP_CACHE_TTL, store=None) -> Universe:
+    """
+    The universe for tickers over period, from the .npz cache when it was built for the
+    same tickers and period less than max_age seconds ago, else from the OHLCV store.
+    """
+    label = f"{period}:{','.join(sorted(tickers))}"
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age:
+        universe = Universe.load(path)
+        if universe.label == label:
+            print(f"[Sweep] Cached {universe} from {path}")
+            return universe
+    t0 = time.perf_counter()
+    universe = load_universe(tickers, period=period, store=store)
+    universe.save(path, label)
+    print(f"[Sweep] Loaded {universe} in {time.perf_counter() - t0:.1f}s, cached to {path}")
+    return universe
+
+
+def run_sweep(signals: Signals, configs: Sequence[BacktestConfig], workers: int = None,
+              rank_by: str = SWEEP_RANK_BY, min_trades: int = SWEEP_MIN_TRADES,
+              baseline: BacktestConfig = None) -> pd.DataFrame:
+    """
+    Replay every config and rank them by rank_by (descending, ties broken by trade
+    count). Configs with fewer than min_trades trades rank below all others.
+    The baseline config (the live settings) is added if missing and flagged.
+    """
+    configs = list(configs)
+    if baseline is not None and baseline not in configs:
+        configs.append(baseline)
+    results = run_backtests(signals, configs, workers)
+
+    rows = []
+    for result in results:
+        config, s = result.config, result.summary
+        row = {'threshold': config.threshold}
+        row.update(dataclasses.asdict(config.weights))
+        row.update({name: getattr(config, name) for name in CONFIG_FIELDS if name != 'threshold'})
+        row.update({
+            'trades': s['trades'],
+            'calls': s['by_direction']['call']['trades'],
+            'puts': s['by_direction']['put']['trades'],
+            'hit_rate': s['hit_rate'],
+            'avg_return_pct': s['avg_return_pct'],
+            'median_return_pct': s['median_return_pct'],
+            'p5_return_pct': s['return_percentiles']['p5'],
+            'p95_return_pct': s['return_percentiles']['p95'],
+            'profit_factor': s['profit_factor'],
+            'avg_days_held': s['avg_days_held'],
+            'baseline': config == baseline,
+        })
+        rows.append(row)
+
+    table = pd.DataFrame(rows)
+    table['enough_trades'] = table['trades'] >= min_trades
+    table = table.sort_values(['enough_trades', rank_by, 'trades'], ascending=False, kind='stable')
+    table.insert(0, 'rank', range(1, len(table) + 1))
+    return table.drop(columns='enough_trades').reset_index(drop=True)
+
+
+def write_results(table: pd.DataFrame, path: str = SWEEP_OUTPUT):
+    """Ranked table as CSV - one row per combination."""
+    table.to_csv(path, index=False, float_format='%.6g')
+
+
+def print_top(table: pd.DataFrame, n: int = 10):
+    # Only the swept columns are interesting next to the results
+    varying = [c for c in table.columns if c not in RESULT_COLUMNS and c not in ('rank', 'baseline')
+               and table[c].nunique() > 1]
+    shown = ['rank'] + varying + ['trades', 'hit_rate', 'avg_return_pct', 'median_return_pct', 'profit_factor']
+    print(table[shown].head(n).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    base = table[table['baseline']]
+    if len(base):
+        row = base.iloc[0]
+        print(f"live settings rank {row['rank']} of {len(table)}: {row['trades']} trades, "
+              f"hit rate {row['hit_rate']:.1%}, avg return {row['avg_return_pct']:+.1f}%")
+
+
+if __name__ == '__main__':
+    axes, tickers = parse_args(sys.argv[1:])
+    live = BacktestConfig(threshold=int(os.getenv("CONFIDENCE_MIN_THRESHOLD", "40")),
+                          weights=ScoringWeights.from_env())
+    configs = build_grid(axes or DEFAULT_GRID, base=live)
+
+    if tickers:
+        universe = load_dataset(tickers)
+    else:
+        frames, sectors = synthetic_frames()
+        universe = Universe.from_frames(frames, traded=[t for t in frames if t.startswith('S')], sectors=sectors)
+    t0 = time.perf_counter()
+    signals = Signals(universe)
+    signals_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    table = run_sweep(signals, configs, baseline=live)
+    sweep_s = time.perf_counter() - t0
+    write_results(table)
+    print(f"[Sweep] {len(table)} combinations over {universe}: indicators {signals_s:.1f}s, "
+          f"sweep {sweep_s:.1f}s ({sweep_s / len(table) * 1000:.0f}ms each), results in {SWEEP_OUTPUT}")
+    print_top(table)
+
+    if not tickers:
+        # The shared-state sweep must agree with independent single replays
+        from backtest import run_backtest
+        for _, row in table.sample(5, random_state=0).iterrows():
+            weights = ScoringWeights(**{name: row[name] for name in WEIGHT_FIELDS})
+            config = BacktestConfig(weights=weights, **{name: row[name] for name in CONFIG_FIELDS})
+            summary = run_backtest(Signals(universe), config, keep_trades=False).summary
+            assert summary['trades'] == row['trades'] and abs(summary['avg_return_pct'] - row['avg_return_pct']) < 1e-9
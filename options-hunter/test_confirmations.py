@@ -6,6 +6,8 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 
+from signals import ScoringWeights, compute_confidence
+
 def calculate_ema(series, period):
     return series.ewm(span=period, adjust=False).mean()
 
@@ -68,13 +70,20 @@ def get_technical_indicators(ticker):
         return None
 
 def compute_confirmation_score(indicators, option_type):
-    """Compute confirmation score for CALL or PUT"""
-    
-    SCORE_TREND = 25  # Increased from 20
-    SCORE_RSI = 20    # Increased from 15
-    SCORE_VOLUME = 15 # BONUS (not required)
+    """Compute confirmation score for CALL or PUT with the server's engine (signals.py), plus a readable breakdown"""
     
-    score = 0
+    result = compute_confidence({
+        'direction': 'call' if option_type == 'CALL' else 'put',
+        **{k: indicators[k] for k in ('price', 'ema9', 'ema20', 'rsi', 'rsi_slope', 'volume',
+                                      'avg_volume_20', 'price_change_pct')},
+        # Only the technical rules are exercised here
+        'sector_price_change': None,
+        'sector_above_ema20': None,
+        'iv_rank': None,
+        'has_near_earnings': False,
+        'has_major_macro_event': False
+    }, ScoringWeights.from_env())
+    fired = set(result.confirmations)
     confirmations = []
     
     price = indicators['price']
@@ -89,14 +98,12 @@ def compute_confirmation_score(indicators, option_type):
     # RULE 1: Trend
     if ema9 and ema20:
         if option_type == 'CALL':
-            if price > ema9 and ema9 > ema20:
-                score += SCORE_TREND
+            if 'bullish_trend' in fired:
                 confirmations.append('✅ Bullish trend: price > EMA9 > EMA20')
             else:
                 confirmations.append(f'❌ Trend: price={price:.2f}, ema9={ema9:.2f}, ema20={ema20:.2f}')
         else:  # PUT
-            if price < ema9 and ema9 < ema20:
-                score += SCORE_TREND
+            if 'bearish_trend' in fired:
                 confirmations.append('✅ Bearish trend: price < EMA9 < EMA20')
             else:
                 confirmations.append(f'❌ Trend: price={price:.2f}, ema9={ema9:.2f}, ema20={ema20:.2f}')
@@ -104,14 +111,12 @@ def compute_confirmation_score(indicators, option_type):
     # RULE 2: RSI
     if rsi:
         if option_type == 'CALL':
-            if 45 < rsi < 70 and rsi_slope > 0:
-                score += SCORE_RSI
+            if 'rsi_bullish' in fired:
                 confirmations.append(f'✅ RSI bullish: {rsi:.1f} (rising)')
             else:
                 confirmations.append(f'❌ RSI: {rsi:.1f}, slope={rsi_slope:.2f} (need 45-70 rising)')
         else:  # PUT
-            if 30 < rsi < 55 and rsi_slope < 0:
-                score += SCORE_RSI
+            if 'rsi_bearish' in fired:
                 confirmations.append(f'✅ RSI bearish: {rsi:.1f} (falling)')
             else:
                 confirmations.append(f'❌ RSI: {rsi:.1f}, slope={rsi_slope:.2f} (need 30-55 falling)')
@@ -119,19 +124,14 @@ def compute_confirmation_score(indicators, option_type):
     # RULE 3: Volume
     if volume and avg_volume_20 and avg_volume_20 > 0:
         vol_ratio = volume / avg_volume_20
-        if volume >= 1.2 * avg_volume_20:
-            if option_type == 'CALL' and price_change_pct > 0:
-                score += SCORE_VOLUME
-                confirmations.append(f'✅ Volume expansion: {vol_ratio:.2f}x on up day')
-            elif option_type == 'PUT' and price_change_pct < 0:
-                score += SCORE_VOLUME
-                confirmations.append(f'✅ Volume expansion: {vol_ratio:.2f}x on down day')
-            else:
-                confirmations.append(f'❌ Volume high ({vol_ratio:.2f}x) but wrong direction ({price_change_pct:+.2f}%)')
+        if 'volume_expansion' in fired:
+            confirmations.append(f'✅ Volume expansion: {vol_ratio:.2f}x on {"up" if option_type == "CALL" else "down"} day')
+        elif volume >= 1.2 * avg_volume_20:
+            confirmations.append(f'❌ Volume high ({vol_ratio:.2f}x) but wrong direction ({price_change_pct:+.2f}%)')
         else:
             confirmations.append(f'❌ Volume: {vol_ratio:.2f}x (need 1.2x)')
     
-    return score, confirmations
+    return result.confidence, confirmations
 
 if __name__ == '__main__':
     ticker = sys.argv[1] if len(sys.argv) > 1 else 'F'
@@ -0,0 +1,109 @@
+"""
+Shared fixtures. Modules are imported the way the server imports them (flat, from
+options-hunter/, plus the services/ package), and every on-disk store points at a
+throwaway directory.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), 'services'))
+sys.path.insert(0, ROOT)
+
+_data_dir = tempfile.mkdtemp(prefix='options-hunter-tests-')
+os.environ.setdefault('OHLCV_DB_PATH', os.path.join(_data_dir, 'ohlcv.db'))
+os.environ.setdefault('CACHE_DB_PATH', os.path.join(_data_dir, 'shared_cache.db'))
+os.environ.setdefault('PREWARM_ENABLED', 'false')
+
+
+@pytest.fixture(scope='session')
+def server():
+    """server-alphavantage.py as a module (hyphenated file name, so loaded by path)."""
+    spec = importlib.util.spec_from_file_location('server_alphavantage', os.path.join(ROOT, 'server-alphavantage.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class StubRequest:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+
+
+class StubHTTPServer:
+    """
+    Real HTTP server on 127.0.0.1 for provider clients. Every request is logged
+    and answered by `handler(request) -> (status, body, headers)`; a dict or list
+    body is sent as JSON.
+    """
+
+    def __init__(self):
+        self.requests: List[StubRequest] = []
+        self.handler = lambda request: (404, {}, {})
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, so pooled sessions reuse connections
+
+            def log_message(self, *args):
+                pass
+
+            def _answer(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                request = StubRequest(self.command, url.path, {k: v[0] for k, v in parse_qs(url.query).items()},
+                                      dict(self.headers))
+                with stub._lock:
+                    stub.requests.append(request)
+                status, body, headers = stub.handler(request)
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            do_GET = do_HEAD = do_POST = _answer
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return [r.path for r in self.requests]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def http_stub():
+    """A StubHTTPServer for the test; set `.handler` to route requests."""
+    stub = StubHTTPServer()
+    yield stub
+    stub.close()
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+import backtest
+from backtest import BacktestConfig, Signals, Universe, run_backtest, run_backtests, synthetic_frames
+from indicator_store import MIN_BARS, IndicatorState
+from signals import compute_confidence, compute_confidence_batch
+
+
+@pytest.fixture(scope='module')
+def universe_frames():
+    return synthetic_frames(n_tickers=12, n_days=400, seed=3)
+
+
+@pytest.fixture(scope='module')
+def signals(universe_frames):
+    frames, sectors = universe_frames
+    stocks = [t for t in frames if t.startswith('S')]
+    return Signals(Universe.from_frames(frames, traded=stocks, sectors=sectors))
+
+
+def test_replayed_indicators_and_scores_match_the_live_path(universe_frames, signals):
+    frames, sectors = universe_frames
+    tickers = signals.universe.tickers
+    rng = np.random.default_rng(0)
+    for ticker in ('S000', 'S005', 'S011'):
+        frame, etf_frame = frames[ticker], frames[sectors[ticker]]
+        state, etf_state = IndicatorState(), IndicatorState()
+        checks = set(rng.integers(MIN_BARS, len(frame), 10).tolist())
+        bars = zip(frame.index, frame['Close'], frame['Volume'], etf_frame['Close'], etf_frame['Volume'])
+        for i, (date, close, volume, etf_close, etf_volume) in enumerate(bars):
+            state.push(date, close, volume)
+            etf_state.push(date, etf_close, etf_volume)
+            if i not in checks:
+                continue
+            live = state.snapshot()
+            replay = signals.snapshot(i, ticker)
+            for key in ('price', 'ema9', 'ema20', 'rsi', 'rsi_slope', 'volume', 'avg_volume_20', 'price_change_pct'):
+                assert live[key] == pytest.approx(replay[key], rel=1e-9, abs=1e-9), (ticker, i, key)
+            etf = etf_state.snapshot()
+            live_inputs = dict(live, sector_price_change=etf['price_change_pct'],
+                               sector_above_ema20=etf['price'] > etf['ema20'], iv_rank=replay['iv_rank'],
+                               has_near_earnings=False, has_major_macro_event=False)
+            for direction in ('call', 'put'):
+                expected = compute_confidence(dict(live_inputs, direction=direction)).confidence
+                batch = compute_confidence_batch(dict(signals.inputs, direction=direction, has_near_earnings=False))
+                assert batch.confidence[i, tickers.index(ticker)] == expected
+
+
+def test_trades_agree_with_the_summary(signals):
+    config = BacktestConfig(threshold=40)
+    result = run_backtest(signals, config)
+    trades = result.trades
+    assert result.summary['trades'] == len(trades) > 0
+    assert (trades['days_held'] <= config.hold_days).all()
+    assert sum(result.summary['exit_reasons'].values()) == len(trades)
+    assert trades['exit_reason'].value_counts().to_dict() == \
+        {k: v for k, v in result.summary['exit_reasons'].items() if v}
+    assert 'missing_bar' not in set(trades['exit_reason'])  # Synthetic history has no gaps
+
+
+def test_a_missing_bar_ends_the_trade_with_its_own_reason(universe_frames):
+    frames, sectors = universe_frames
+    frames = dict(frames)
+    gap = 300
+    frames['S004'] = frames['S004'].drop(frames['S004'].index[gap])
+    stocks = [t for t in frames if t.startswith('S')]
+    signals = Signals(Universe.from_frames(frames, traded=stocks, sectors=sectors))
+    config = BacktestConfig(threshold=0, take_profit=100, stop_loss=-100)  # Every trade runs its full path
+    trades = run_backtest(signals, config).trades
+    dates = signals.universe.dates
+
+    cut = trades[trades['exit_reason'] == 'missing_bar']
+    assert len(cut) > 0 and set(cut['ticker']) == {'S004'}
+    signal_day = dates.get_indexer(cut['signal_date'])
+    assert ((signal_day < gap - 1) & (signal_day >= gap - 1 - config.hold_days)).all()
+    assert (signal_day + cut['days_held'].to_numpy() == gap - 1).all()  # Last mark is the bar before the gap
+    assert (trades['exit_reason'] == 'end_of_data').sum() > 0
+    assert (dates.get_indexer(trades.loc[trades['exit_reason'] == 'end_of_data', 'signal_date'])
+            >= len(dates) - 1 - config.hold_days).all()
+
+
+def test_parallel_sweep_matches_serial(signals, monkeypatch):
+    configs = [BacktestConfig(threshold=threshold, take_profit=tp, days_to_expiry=dte)
+               for threshold in (25, 55) for tp in (0.5, 2.0) for dte in (3, 30)]
+    serial = run_backtests(signals, configs, workers=1)
+    monkeypatch.setattr(backtest, 'BACKTEST_CONFIGS_PER_WORKER', 1)
+    parallel = run_backtests(signals, configs, workers=2)
+    strip = lambda s: {k: v for k, v in s.items() if k != 'runtime_ms'}
+    assert [strip(r.summary) for r in serial] == [strip(r.summary) for r in parallel]
+    assert backtest._worker_signals is None
+    assert [strip(r.summary) for r in serial] == \
+        [strip(run_backtest(signals, c, keep_trades=False).summary) for c in configs]
+
+
+def test_small_sweeps_stay_serial(signals, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError('a process pool was started')
+
+    monkeypatch.setattr(backtest, 'ProcessPoolExecutor', no_pool)
+    configs = [BacktestConfig(threshold=t) for t in range(20, 20 + backtest.BACKTEST_CONFIGS_PER_WORKER * 2 - 1)]
+    assert len(run_backtests(signals, configs, workers=4)) == len(configs)
@@ -0,0 +1,84 @@
+import pickle
+import time
+
+import numpy as np
+import pytest
+
+from cache_backend import MemoryBackend, RedisBackend, SQLiteBackend, dumps, loads
+from option_chain import OptionChain
+from ttl_cache import TTLCache
+
+
+def sample_chain():
+    return OptionChain('2026-11-20', ['SPY261120C00500000', 'SPY261120P00500000'], [True, False],
+                       strike=[500.0, 500.0], bid=[np.nan, 4.2], ask=[5.1, 4.4], delta=[0.52, np.nan])
+
+
+def assert_same_chain(a, b):
+    assert a.expiry == b.expiry and list(a.symbol) == list(b.symbol) and list(a.is_call) == list(b.is_call)
+    for name in ('strike', 'bid', 'ask', 'delta', 'volume'):
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+
+
+def test_codec_round_trips_cached_payloads():
+    value = {'contracts': sample_chain(), 'source': 'Tradier', 'expirations': ('2026-11-20', '2026-12-18'),
+             'nested': [{'price': np.float64(512.5), 'volume': np.int64(10)}, None, True]}
+    expires_at, back = loads(dumps(value, 1234.5))
+    assert expires_at == 1234.5
+    assert_same_chain(back['contracts'], value['contracts'])
+    assert back['expirations'] == ('2026-11-20', '2026-12-18')
+    assert back['nested'] == [{'price': 512.5, 'volume': 10}, None, True]
+    assert type(back['nested'][0]['volume']) is int
+
+
+def test_payloads_are_data_not_pickles():
+    class Exploit:
+        def __reduce__(self):
+            return (print, ('code ran',))
+
+    backend = MemoryBackend()
+    backend.set('oh:prices:SPY', pickle.dumps((time.time() + 60, Exploit())), 60)
+    assert backend.get_value('oh:prices:SPY') is None and backend.errors == 1
+    with pytest.raises(TypeError):
+        dumps(Exploit(), 0.0)
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBackend()
+    if request.param == 'sqlite':
+        return SQLiteBackend(str(tmp_path / 'shared.db'))
+    fakeredis = pytest.importorskip('fakeredis')
+    return RedisBackend(client=fakeredis.FakeRedis())
+
+
+def test_backend_values_expire(backend):
+    backend.set_value('oh:chains:SPY', {'contracts': sample_chain()}, 0.2)
+    expires_at, value = backend.get_value('oh:chains:SPY')
+    assert expires_at > time.time()
+    assert_same_chain(value['contracts'], sample_chain())
+    time.sleep(0.25)
+    assert backend.get_value('oh:chains:SPY') is None
+    backend.set_value('oh:prices:SPY', 1.0, 60)
+    backend.delete_value('oh:prices:SPY')
+    assert backend.get_value('oh:prices:SPY') is None and backend.errors == 0
+
+
+def test_backend_lock_is_exclusive_and_owned(backend):
+    token = backend.try_acquire('oh:chains:SPY:lock', 5)
+    assert token and backend.try_acquire('oh:chains:SPY:lock', 5) is None
+    backend.try_release('oh:chains:SPY:lock', 'someone-else')
+    assert backend.try_acquire('oh:chains:SPY:lock', 5) is None
+    backend.try_release('oh:chains:SPY:lock', token)
+    assert backend.try_acquire('oh:chains:SPY:lock', 5)
+
+
+def test_caches_share_entries_through_the_backend(backend):
+    worker_a = TTLCache('chains', 10, 60, shared=backend)
+    worker_b = TTLCache('chains', 10, 60, shared=backend)
+    calls = []
+    worker_a.get_or_load(('SPY', '2026-11-20'), lambda: {'contracts': sample_chain(), 'source': 'Tradier'})
+    result = worker_b.get_or_load(('SPY', '2026-11-20'), lambda: calls.append(1))
+    assert not calls and result['source'] == 'Tradier'
+    assert_same_chain(result['contracts'], sample_chain())
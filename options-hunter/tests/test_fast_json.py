@@ -0,0 +1,84 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+from flask import Flask, jsonify
+
+from optionshunter import fast_json
+from optionshunter.fast_json import dumps, init_fast_json
+
+PAYLOAD = {'b': np.float64(1.5), 'a': np.int64(3), 'flag': np.bool_(True),
+           'scores': np.array([0.25, 0.5]), 'grid': np.arange(4).reshape(2, 2)}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    """Run a test against orjson and against the stdlib fallback."""
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(fast_json, 'orjson', None)
+    return request.param
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(fast_json, 'JSON_COMPRESS_MIN_BYTES', 256)
+    app = Flask(__name__)
+    init_fast_json(app)
+
+    @app.route('/rows/<int:n>')
+    def rows(n):
+        return jsonify({'rows': [{'ticker': 'SPY', 'price': np.float64(512.34), 'rank': i} for i in range(n)]})
+
+    @app.route('/missing')
+    def missing():
+        return jsonify({'error': 'x' * 2000}), 404
+
+    return app.test_client()
+
+
+def test_numpy_scalars_and_arrays_serialize(backend):
+    assert json.loads(dumps(PAYLOAD)) == {'b': 1.5, 'a': 3, 'flag': True, 'scores': [0.25, 0.5],
+                                          'grid': [[0, 1], [2, 3]]}
+    assert list(json.loads(dumps(PAYLOAD, sort_keys=True))) == ['a', 'b', 'flag', 'grid', 'scores']
+
+
+def test_nan_becomes_null_under_orjson():
+    pytest.importorskip('orjson')
+    assert json.loads(dumps({'iv': float('nan'), 'delta': np.float64('inf')})) == {'iv': None, 'delta': None}
+
+
+def test_jsonify_goes_through_the_provider(client, backend):
+    response = client.get('/rows/2')
+    assert response.mimetype == 'application/json' and response.data.endswith(b'\n')
+    assert response.get_json()['rows'][1] == {'price': 512.34, 'rank': 1, 'ticker': 'SPY'}
+    assert 'Content-Encoding' not in response.headers  # Below the size threshold
+
+
+def test_large_bodies_are_gzipped_for_clients_that_accept_it(client):
+    plain = client.get('/rows/50')
+    packed = client.get('/rows/50', headers={'Accept-Encoding': 'br;q=1.0, gzip;q=0.8'})
+    assert len(plain.data) > 256 and 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+    if fast_json.brotli is None:
+        assert packed.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(packed.data) == plain.data
+    else:
+        assert packed.headers['Content-Encoding'] == 'br'
+        assert fast_json.brotli.decompress(packed.data) == plain.data
+    assert len(packed.data) < len(plain.data)
+
+
+def test_only_compresses_what_the_client_and_status_allow(client):
+    if fast_json.brotli is None:
+        assert 'Content-Encoding' not in client.get('/rows/50', headers={'Accept-Encoding': 'br'}).headers
+    assert 'Content-Encoding' not in client.get('/rows/50', headers={'Accept-Encoding': 'identity'}).headers
+    assert 'Content-Encoding' not in client.get('/missing', headers={'Accept-Encoding': 'gzip'}).headers
+
+
+def test_compress_skips_bodies_that_do_not_shrink():
+    assert fast_json.compress(b'{}', 'gzip') is None
+    encoding, packed = fast_json.compress(b'[' + b'1,' * 500 + b'1]', 'deflate, gzip')
+    assert encoding == 'gzip' and json.loads(gzip.decompress(packed)) == [1] * 501
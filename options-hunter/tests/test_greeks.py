@@ -0,0 +1,87 @@
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from greeks import (MARKET_TZ, black76, black_scholes, fill_chain_greeks, implied_vol, norm_cdf,
+                    time_to_expiry)
+from option_chain import OptionChain
+
+R, Q = 0.045, 0.012
+SPOT = 187.35
+
+
+@pytest.fixture(scope='module')
+def chain_inputs():
+    rng = np.random.default_rng(19)
+    n = 5000
+    strike = np.round(SPOT * rng.uniform(0.6, 1.4, n), 1)
+    t = rng.uniform(7 / 365, 1.5, n)
+    sigma = rng.uniform(0.08, 1.2, n)
+    calls = rng.random(n) < 0.5
+    return strike, t, sigma, calls
+
+
+def test_norm_cdf_matches_erfc():
+    xs = np.linspace(-38, 38, 20001)
+    exact = np.array([0.5 * math.erfc(-v / math.sqrt(2.0)) for v in xs])
+    assert np.abs(norm_cdf(xs) - exact).max() < 1e-15
+    assert np.all(norm_cdf(np.array([-np.inf, np.inf])) == [0, 1])
+
+
+def test_put_call_parity(chain_inputs):
+    strike, t, sigma, _ = chain_inputs
+    n = len(strike)
+    c = black_scholes(SPOT, strike, t, sigma, np.ones(n, bool), R, Q)
+    p = black_scholes(SPOT, strike, t, sigma, np.zeros(n, bool), R, Q)
+    parity = c['price'] - p['price'] - (SPOT * np.exp(-Q * t) - strike * np.exp(-R * t))
+    assert np.abs(parity).max() < 1e-6
+
+
+def test_greeks_match_finite_differences(chain_inputs):
+    strike, t, sigma, calls = chain_inputs
+    g = black_scholes(SPOT, strike, t, sigma, calls, R, Q)
+    h = 1e-3
+    up = black_scholes(SPOT + h, strike, t, sigma, calls, R, Q)['price']
+    down = black_scholes(SPOT - h, strike, t, sigma, calls, R, Q)['price']
+    fd = {
+        'delta': ((up - down) / (2 * h), 1e-6),
+        'gamma': ((up - 2 * g['price'] + down) / (h * h), 1e-5),
+        'vega': ((black_scholes(SPOT, strike, t, sigma + 1e-4, calls, R, Q)['price'] -
+                  black_scholes(SPOT, strike, t, sigma - 1e-4, calls, R, Q)['price']) / 2e-4 / 100, 1e-6),
+        'theta': (-(g['price'] - black_scholes(SPOT, strike, t - 1e-5, sigma, calls, R, Q)['price']) / 1e-5 / 365,
+                  1e-3),
+    }
+    for name, (estimate, tol) in fd.items():
+        assert np.abs(estimate - g[name]).max() < tol, name
+
+
+def test_black76_on_the_forward_matches_black_scholes(chain_inputs):
+    strike, t, sigma, calls = chain_inputs
+    forward = SPOT * np.exp((R - Q) * t)
+    assert np.abs(black76(forward, strike, t, sigma, calls, R)['price'] -
+                  black_scholes(SPOT, strike, t, sigma, calls, R, Q)['price']).max() < 1e-6
+
+
+def test_implied_vol_round_trip(chain_inputs):
+    strike, t, sigma, calls = chain_inputs
+    priced = black_scholes(SPOT, strike, t, sigma, calls, R, Q)['price']
+    solved = implied_vol(priced, SPOT, strike, t, calls, R, Q)
+    # Only time value pins down vol: contracts with less than a cent of it are left out
+    intrinsic = np.maximum(np.where(calls, SPOT * np.exp(-Q * t) - strike * np.exp(-R * t),
+                                    strike * np.exp(-R * t) - SPOT * np.exp(-Q * t)), 0.0)
+    meaningful = priced - intrinsic > 0.01
+    assert not np.isnan(solved[meaningful]).any()
+    assert np.abs(solved[meaningful] - sigma[meaningful]).max() < 1e-4
+
+
+def test_fill_chain_greeks_only_fills_missing_values():
+    chain = OptionChain('2026-11-20', ['A', 'B', 'C'], [True, False, True], strike=[180.0, 190.0, 200.0],
+                        mid=[12.0, 9.5, 4.1], iv=[0.3, np.nan, 0.25], delta=[np.nan, np.nan, 0.33],
+                        theta=[np.nan, np.nan, -0.02])
+    now = datetime(2026, 10, 16, 12, 0, tzinfo=MARKET_TZ)
+    assert fill_chain_greeks(chain, SPOT, now=now) == 2
+    assert chain.delta[2] == 0.33 and np.isnan(chain.iv[1])
+    expected = black_scholes(SPOT, 180.0, time_to_expiry('2026-11-20', now), 0.3, True)
+    assert chain.delta[0] == round(float(expected['delta']), 4) and -1 < chain.delta[1] < 0
@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from indicator_matrix import SNAPSHOT_COLUMNS, as_indicator_dicts, snapshot_frames
+from indicator_store import MIN_BARS, IndicatorState
+
+
+def ragged_universe(n_tickers, n_bars=60, seed=24):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_bars)
+    frames = {}
+    for i in range(n_tickers):
+        end = n_bars if i % 7 else n_bars - 1                     # Some without today's bar
+        n = end if i % 10 else int(rng.integers(5, end))          # Some recent listings / short histories
+        close = rng.uniform(5, 500) * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        if i % 13 == 0 and n > 16:
+            close[-16:] = close[-16]                              # Flat: RSI undefined
+        frames[f"T{i:04d}"] = pd.DataFrame({'Close': close, 'Volume': rng.lognormal(14, 0.5, n)},
+                                           index=dates[end - n:end])
+    return frames
+
+
+def test_matrix_matches_indicator_state_on_ragged_histories():
+    frames = ragged_universe(300)
+    table = snapshot_frames(frames)
+    indicators = as_indicator_dicts(table)
+    checked = 0
+    for ticker, hist in frames.items():
+        if len(hist) < MIN_BARS:
+            assert ticker not in indicators
+            continue
+        state = IndicatorState()
+        for date, close, volume in zip(hist.index, hist['Close'], hist['Volume']):
+            state.push(date, float(close), float(volume))
+        expected, got = state.snapshot(), indicators[ticker]
+        for name in SNAPSHOT_COLUMNS:
+            a, b = expected[name], got[name]
+            if a is None or (isinstance(a, float) and math.isnan(a)):
+                assert b is None or math.isnan(b), (ticker, name)
+            else:
+                assert abs(a - b) <= 1e-9 * max(1.0, abs(a)), (ticker, name, a, b)
+        assert table.loc[ticker, 'as_of'] == hist.index[-1]
+        checked += 1
+    assert checked > 200
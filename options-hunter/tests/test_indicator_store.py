@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from indicator_store import BACKFILL_PERIOD, UPDATE_PERIOD, IndicatorStore
+
+
+def test_incremental_updates_match_the_pandas_reference(server):
+    rng = np.random.default_rng(7)
+    days = pd.bdate_range('2026-01-02', periods=160)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+    full = pd.DataFrame({'Close': closes, 'Volume': rng.integers(1e5, 5e6, len(days)).astype(float)}, index=days)
+
+    def reference(frame):
+        close, volume = frame['Close'], frame['Volume']
+        rsi = server.calculate_rsi(close, 14)
+        return {
+            'price': float(close.iloc[-1]),
+            'ema9': float(server.calculate_ema(close, 9).iloc[-1]),
+            'ema20': float(server.calculate_ema(close, 20).iloc[-1]),
+            'rsi': float(rsi.iloc[-1]),
+            'rsi_slope': float(rsi.iloc[-1] - rsi.iloc[-3]),
+            'volume': float(volume.iloc[-1]),
+            'avg_volume_20': float(volume.tail(20).mean()),
+            'price_change_pct': float((close.iloc[-1] - close.iloc[-2]) / close.iloc[-2] * 100),
+        }
+
+    clock = {'today': 60, 'seed': 0, 'partial': False}
+    fetches = []
+
+    def fake_history(ticker, period):
+        n = int(period.rstrip('d'))
+        fetches.append(period)
+        today = clock['today']
+        frame = full.iloc[max(0, today - n):today].copy()
+        if period == BACKFILL_PERIOD:
+            clock['seed'] = max(0, today - n)  # The EMA seed point the reference has to share
+        if clock['partial']:
+            frame.iloc[-1, 0] *= 0.99          # The newest bar is still forming
+        return frame
+
+    store = IndicatorStore(fake_history)
+    for today in range(60, len(days) + 1):
+        clock['today'] = today
+        for partial in (True, False):
+            clock['partial'] = partial
+            got = store.get('TEST')
+            expected = reference(fake_history('REF', f"{today - clock['seed']}d"))
+            fetches.pop()
+            for k in expected:
+                assert abs(got[k] - expected[k]) <= 1e-9 * max(1.0, abs(expected[k])), (today, k)
+        if today == 120:
+            clock['today'] = today + 8  # A week of downtime -> gap -> backfill
+            store.get('TEST')
+            clock['today'] = today
+            store.forget('TEST')
+    assert fetches.count(UPDATE_PERIOD) > fetches.count(BACKFILL_PERIOD)
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from iv_history import MARKET_TZ, WINDOWS, IVHistory
+from option_chain import OptionChain
+
+
+@pytest.fixture(scope='module')
+def history(tmp_path_factory):
+    """300 days of synthetic 30-day ATM IV, plus a farther expiry recorded later each day."""
+    history = IVHistory(str(tmp_path_factory.mktemp('iv') / 'iv.db'))
+    rng = np.random.default_rng(20)
+    spot = 100.0
+    strikes = np.arange(80.0, 121.0, 2.5)
+    start = datetime(2025, 10, 1, 12, 0, tzinfo=MARKET_TZ)
+    truth = []
+    for day in range(300):
+        now = start + timedelta(days=day)
+        level = 0.25 + 0.1 * np.sin(day / 40) + rng.normal(0, 0.01)
+        smile = level + 0.002 * (strikes - spot) ** 2 / 10
+        chain = OptionChain((now + timedelta(days=30)).strftime('%Y-%m-%d'), [''] * (2 * len(strikes)),
+                            [True] * len(strikes) + [False] * len(strikes),
+                            strike=np.concatenate([strikes, strikes]), iv=np.concatenate([smile, smile]))
+        truth.append(history.record('SPY', chain, spot, now=now))
+        far = OptionChain((now + timedelta(days=90)).strftime('%Y-%m-%d'), [''] * 4, [True, True, False, False],
+                          strike=[95.0, 105.0, 95.0, 105.0], iv=[0.9] * 4)
+        history.record('SPY', far, spot, now=now)
+    return history, truth
+
+
+def test_atm_sample_tracks_the_level(history):
+    history, truth = history
+    assert abs(truth[-1] - (0.25 + 0.1 * np.sin(299 / 40))) < 0.05
+
+
+def test_farther_expiry_does_not_replace_the_days_sample(history):
+    history, truth = history
+    summary = history.summary('SPY')
+    assert summary.latest == truth[-1] and len(summary) == max(WINDOWS)
+
+
+@pytest.mark.parametrize('window', WINDOWS)
+@pytest.mark.parametrize('current', [0.1, 0.3, 0.5])
+def test_rank_and_percentile_match_brute_force(history, window, current):
+    history, truth = history
+    summary = history.summary('SPY')
+    recent = np.array(truth[-window:])
+    expected_rank = (current - recent.min()) / (recent.max() - recent.min()) * 100
+    assert summary.rank(current, window) == pytest.approx(max(0.0, min(100.0, expected_rank)), abs=1e-9)
+    assert summary.percentile(current, window) == pytest.approx((recent < current).mean() * 100, abs=1e-9)
+
+
+def test_as_dict_reports_every_window(history):
+    history, _ = history
+    windows = history.summary('SPY').as_dict(0.3)['windows']
+    assert sorted(int(w) for w in windows) == sorted(WINDOWS)
+
+
+@pytest.mark.parametrize('window', [1, 60, 200])
+def test_other_windows_rank_lazily(history, window):
+    history, truth = history
+    summary = history.summary('SPY')
+    recent = np.array(truth[-window:])
+    low, high = recent.min(), recent.max()
+    expected = 50.0 if high <= low else max(0.0, min(100.0, (0.3 - low) / (high - low) * 100))
+    if window < 20:
+        assert summary.rank(0.3, window) is None  # Under IV_MIN_HISTORY_DAYS
+    else:
+        assert summary.rank(0.3, window) == pytest.approx(expected, abs=1e-9)
+        assert summary.percentile(0.3, window) == pytest.approx((recent < 0.3).mean() * 100, abs=1e-9)
+    assert str(window) in summary.as_dict(0.3, [window])['windows']
+
+
+def test_longer_window_loads_more_history(history):
+    history, truth = history
+    summary = history.summary('SPY', 280)
+    assert len(summary) == 280 and history.summary('SPY') is summary
+    recent = np.array(truth[-280:])
+    assert summary.rank(0.3, 280) == pytest.approx((0.3 - recent.min()) / (recent.max() - recent.min()) * 100)
+    assert len(history.summary('SPY', 400)) == 300  # Everything recorded
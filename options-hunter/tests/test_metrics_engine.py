@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from metrics_engine import compute_metrics_for_contracts
+
+
+def random_contracts(n, spot, seed=42):
+    rnd = random.Random(seed)
+    maybe = lambda v: None if rnd.random() < 0.15 else v
+    contracts = []
+    for _ in range(n):
+        bid = maybe(round(rnd.uniform(0, 12), 2))
+        ask = maybe(round((bid or 0) + rnd.uniform(0, 1.5), 2))
+        contracts.append({
+            'type': rnd.choice(['call', 'put', 'CALL']),
+            'strike': round(spot * rnd.uniform(0.7, 1.3), 1),
+            'bid': bid,
+            'ask': ask,
+            'mid': (bid + ask) / 2.0 if bid and ask and bid > 0 and ask > 0 else maybe(0.0),
+            'last': maybe(round(rnd.uniform(0, 12), 2)),
+            'iv': maybe(rnd.choice([0.0, rnd.uniform(0.05, 1.5)])),
+            'volume': maybe(rnd.randint(0, 5000)),
+            'open_interest': maybe(rnd.randint(0, 20000)),
+        })
+    return contracts
+
+
+@pytest.mark.parametrize('spot', [187.35, 4.2])
+def test_vectorized_metrics_match_scalar_reference(server, spot):
+    contracts = random_contracts(3000, spot)
+    expected = [server.compute_metrics(c, spot) for c in contracts]
+    assert compute_metrics_for_contracts(contracts, spot).records() == expected
+
+
+def test_empty_chain():
+    assert compute_metrics_for_contracts([], 100.0).records() == []
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from ohlcv_store import OHLCVStore, period_start
+
+
+def test_second_worker_starts_warm_and_syncs_incrementally(tmp_path):
+    days = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=130)
+    rng = np.random.default_rng(3)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+    market = pd.DataFrame({'Open': closes, 'High': closes * 1.01, 'Low': closes * 0.99, 'Close': closes,
+                           'Volume': rng.integers(1e5, 5e6, len(days)).astype(float)},
+                          index=days.tz_localize('America/New_York'))
+    calls = []
+
+    def fake_provider(ticker, period, interval):
+        calls.append(period)
+        return market[market.index.tz_localize(None) >= period_start(period)].copy()
+
+    path = str(tmp_path / 'ohlcv.db')
+    cold = OHLCVStore(path, fake_provider).history('SPY', '60d')
+    worker_b = OHLCVStore(path, fake_provider)  # Another process / a restart
+    warm = worker_b.history('SPY', '30d')
+    assert len(calls) == 1
+    assert warm.equals(cold[cold.index >= period_start('30d')])
+
+    worker_b.history('SPY', '60d', max_age=0)  # Stale -> only the last few days are re-fetched
+    assert len(calls) == 2 and calls[-1] != '60d'
+    longer = worker_b.history('SPY', '6mo')    # Needs older bars -> one full fetch
+    expected = market[market.index.tz_localize(None) >= period_start('6mo')]['Close'].to_numpy()
+    assert np.allclose(longer['Close'].to_numpy(), expected)
+
+
+def test_ingested_bulk_bars_serve_history_without_the_provider(tmp_path):
+    days = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=60)
+    frame = pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': np.arange(60, dtype=float) + 1,
+                          'Volume': 1e6}, index=days)
+    calls = []
+    store = OHLCVStore(str(tmp_path / 'ohlcv.db'), lambda *args: calls.append(args) or frame)
+    assert store.stale(['SPY', 'QQQ'], '1mo') == ['SPY', 'QQQ']
+
+    store.ingest('SPY', frame, '1mo')
+    assert store.stale(['SPY', 'QQQ'], '1mo') == ['QQQ']
+    assert store.stale(['SPY'], '6mo') == ['SPY']  # Stored coverage starts too late for a longer period
+    history = store.history('SPY', '1mo')
+    assert calls == [] and store.counters['ingested'] == 1
+    assert np.allclose(history['Close'].to_numpy(), frame[frame.index >= period_start('1mo')]['Close'])
@@ -0,0 +1,112 @@
+import threading
+
+import numpy as np
+import pytest
+
+from optionshunter.transport import ProviderTransport
+from polygon_adapter import PolygonChainAdapter
+
+SPOT = 100.0
+
+
+def snapshot(strike, ctype, quoted=True):
+    return {
+        'details': {'ticker': f"O:STUB261120{ctype[0].upper()}{strike * 1000:08d}", 'contract_type': ctype,
+                    'strike_price': float(strike), 'expiration_date': '2026-11-20'},
+        'last_quote': {'bid': 1.0, 'ask': 1.2} if quoted else None,
+        'last_trade': {'price': 1.1},
+        'greeks': {'delta': 0.5 if ctype == 'call' else -0.5, 'theta': -0.05},
+        'implied_volatility': 0.3,
+        'day': {'volume': 100 + strike, 'close': 1.1},
+        'open_interest': 1000 + strike,
+    }
+
+
+CONTRACTS = [snapshot(k, ctype, quoted=bool(k % 2)) for k in range(40, 161) for ctype in ('call', 'put')]
+
+
+class PolygonStub:
+    """http_stub handler for the snapshot, contract-list and quote endpoints."""
+
+    def __init__(self, base_url, chain_snapshot=True, page_size=50):
+        self.base_url = base_url
+        self.chain_snapshot = chain_snapshot
+        self.page_size = page_size
+
+    def __call__(self, request):
+        parts = request.path.strip('/').split('/')
+        if parts[:3] == ['v3', 'snapshot', 'options'] and len(parts) == 5:
+            found = [c for c in CONTRACTS if c['details']['ticker'] == parts[4]]
+            return (200, {'results': found[0]}, {}) if found else (404, {}, {})
+        if parts[:3] == ['v3', 'snapshot', 'options']:
+            if not self.chain_snapshot:
+                return 403, {'status': 'NOT_AUTHORIZED'}, {}
+            return self._page(request, lambda c: c)
+        if parts[:4] == ['v3', 'reference', 'options', 'contracts']:
+            return self._page(request, lambda c: c['details'])
+        if parts[:2] == ['v3', 'quotes']:
+            return 200, {'results': [{'bid_price': 0.9, 'ask_price': 1.0}]}, {}
+        return 404, {}, {}
+
+    def _page(self, request, shape):
+        query = request.query
+        if 'cursor' in query:
+            offset, lo, hi = int(query['cursor']), float(query['lo']), float(query['hi'])
+        else:
+            offset = 0
+            lo, hi = float(query.get('strike_price.gte', 0)), float(query.get('strike_price.lte', 1e9))
+        matching = [shape(c) for c in CONTRACTS if lo <= c['details']['strike_price'] <= hi]
+        payload = {'results': matching[offset:offset + self.page_size]}
+        if offset + self.page_size < len(matching):
+            payload['next_url'] = f"{self.base_url}{request.path}?cursor={offset + self.page_size}&lo={lo}&hi={hi}"
+        return 200, payload, {}
+
+
+@pytest.fixture
+def polygon(http_stub):
+    """Adapter talking HTTP to a local Polygon stub through a pooled transport, as the server wires it."""
+    def make(**stub_options):
+        http_stub.handler = PolygonStub(http_stub.base_url, **stub_options)
+        client = ProviderTransport(max_retries=0)
+        adapter = PolygonChainAdapter('key', base_url=http_stub.base_url, http_get=client.get, rate_limit=0)
+        return adapter, client
+    return make
+
+
+def test_snapshot_pages_and_hydrates_only_near_the_money_gaps(polygon, http_stub):
+    adapter, client = polygon()
+    chain = adapter.fetch_chain('STUB', '2026-11-20', spot=SPOT)
+    assert len(chain) == 2 * (125 - 75 + 1)                 # Strike window pre-filter
+    assert adapter.stats['pages'] == 3                       # 102 contracts, 50 per page
+    assert adapter.stats['hydrated'] == 2 * 11               # Unquoted strikes within ±10%
+    paths = http_stub.paths()
+    assert sum(p.startswith('/v3/quotes/') for p in paths) == 22
+    assert all(r.query['apiKey'] == 'key' for r in http_stub.requests)
+    assert http_stub.requests[0].query['strike_price.gte'] == '75.0'
+    assert not np.isnan(chain.delta).any() and not np.isnan(chain.open_interest).any()
+    stats = client.metrics()[http_stub.base_url]
+    assert stats['requests'] == len(paths) == 3 + 22 and stats['errors'] == 0
+
+
+def test_contract_list_fallback_hydrates_full_snapshots(polygon, http_stub):
+    adapter, client = polygon(chain_snapshot=False)
+    chain = adapter.fetch_chain('STUB', '2026-11-20', spot=SPOT)
+    assert len(chain) == 102 and adapter.stats['hydrated'] == 2 * 21
+    near = np.abs(chain.strike - SPOT) / SPOT <= 0.10
+    for name in ('bid', 'ask', 'iv', 'delta', 'theta', 'volume', 'open_interest'):
+        assert not np.isnan(getattr(chain, name)[near]).any(), name
+    call_100 = next(i for i in range(len(chain)) if chain.strike[i] == 100.0 and chain.is_call[i])
+    assert chain.record(call_100)['open_interest'] == 1100 and chain.delta[call_100] == 0.5
+    # Contracts whose own snapshot had no quote fall through to the quotes endpoint
+    assert sum(p.startswith('/v3/quotes/') for p in http_stub.paths()) == 22
+    assert client.metrics()[http_stub.base_url]['status_counts']['403'] == 1  # The refused chain snapshot
+
+
+def test_page_counter_is_thread_safe(polygon):
+    adapter, _ = polygon()
+    threads = [threading.Thread(target=adapter.fetch_chain, args=('STUB', '2026-11-20', SPOT)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert adapter.stats['pages'] == 8 * 3 and adapter.stats['hydrated'] == 8 * 22
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from prescreen import (PRESCREEN_MIN_AVG_VOLUME, PRESCREEN_MIN_PRICE, ScanFunnel, prescreen_universe,
+                       read_universe)
+from signals import compute_confidence
+
+ETFS = ['XLK', 'XLF', 'XLE', 'XLV']
+
+
+@pytest.fixture(scope='module')
+def market():
+    """Synthetic quotes and indicator snapshots for the shipped universe."""
+    symbols = read_universe()
+    rng = np.random.default_rng(25)
+    sectors = {t: rng.choice(ETFS) for t in symbols[::3]}
+    indicators = {}
+    for ticker in symbols + ETFS:
+        price = float(rng.uniform(1, 600))
+        indicators[ticker] = None if rng.random() < 0.03 else {
+            'price': price,
+            'ema9': price * rng.uniform(0.96, 1.04),
+            'ema20': None if rng.random() < 0.02 else price * rng.uniform(0.93, 1.07),
+            'rsi': None if rng.random() < 0.02 else rng.uniform(20, 80),
+            'rsi_slope': rng.normal(0, 3),
+            'volume': float(rng.lognormal(14, 1)),
+            'avg_volume_20': float(rng.lognormal(14, 1)),
+            'price_change_pct': rng.normal(0, 1.5),
+        }
+    quotes = {t: None if rng.random() < 0.05 else {'price': i['price'] * rng.uniform(0.99, 1.01)}
+              for t, i in indicators.items() if i}
+    return symbols, sectors, quotes, indicators
+
+
+def test_universe_file_loads_unique_symbols():
+    symbols = read_universe()
+    assert len(symbols) >= 1000 and len(symbols) == len(set(symbols))
+    assert read_universe() == symbols
+
+
+def scalar_expected(symbols, sectors, quotes, indicators, direction, min_score):
+    """Every ticker past the liquidity cut scored one at a time with compute_confidence()."""
+    expected = []
+    for ticker in symbols:
+        quote, ind = quotes.get(ticker), indicators.get(ticker)
+        if not quote or not ind or quote['price'] < PRESCREEN_MIN_PRICE or ind['avg_volume_20'] < PRESCREEN_MIN_AVG_VOLUME:
+            continue
+        etf = indicators.get(sectors.get(ticker))
+        best = None
+        for side in ([direction] if direction else ['call', 'put']):
+            result = compute_confidence(dict(ind, direction=side, iv_rank=None, has_near_earnings=False,
+                                             has_major_macro_event=False,
+                                             sector_price_change=etf['price_change_pct'] if etf else None,
+                                             sector_above_ema20=(etf['price'] > etf['ema20']) if etf and etf['ema20'] else None))
+            if best is None or result.confidence > best[1].confidence:
+                best = (side, result)
+        if best[1].confidence >= min_score:
+            expected.append((-best[1].confidence, -quote['price'] * ind['avg_volume_20'], ticker, best))
+    expected.sort(key=lambda e: e[:2])
+    return expected
+
+
+@pytest.mark.parametrize('direction, min_score', [(None, 0), ('call', 30), ('put', 15)])
+def test_prescreen_matches_scalar_scoring(market, direction, min_score):
+    symbols, sectors, quotes, indicators = market
+    requested = []
+
+    def get_quotes(tickers):
+        requested.append(len(tickers))
+        return {t: quotes.get(t) for t in tickers}
+
+    def get_indicators(tickers):
+        requested.append(len(tickers))
+        return {t: indicators.get(t) for t in tickers}
+
+    funnel = ScanFunnel()
+    screened = prescreen_universe(symbols, get_quotes, get_indicators, sectors, top_n=60,
+                                  direction=direction, min_score=min_score, funnel=funnel)
+    counts = [s['count'] for s in funnel.stages]
+    assert counts == sorted(counts, reverse=True) and counts[-1] == len(screened) <= 60
+    assert len(requested) == 2 and all(n <= len(symbols) + len(ETFS) for n in requested)
+    stage = {s['stage']: s for s in funnel.stages}
+    assert stage['indicators']['missing'] == stage['quotes']['count'] - stage['indicators']['count']
+    assert f"indicators {stage['indicators']['count']} (" in funnel.summary() and 'missing' in funnel.summary()
+
+    expected = scalar_expected(symbols, sectors, quotes, indicators, direction, min_score)
+    assert len(expected) == funnel.stages[-2]['count']
+    for got, (_, _, ticker, (side, result)) in zip(screened.candidates, expected):
+        assert (got['ticker'], got['direction'], got['score'], got['confirmations']) == \
+               (ticker, side, result.confidence, result.confirmations)
@@ -0,0 +1,70 @@
+import time
+
+from cache_backend import MemoryBackend
+from prewarm import PrewarmScheduler, PrewarmTask
+
+
+def test_batch_task_waits_out_its_min_interval():
+    runs = []
+    every_cycle = PrewarmTask('prices', lambda tickers: runs.append('prices') or True, ['A'], batch=True)
+    slow = PrewarmTask('universe', lambda tickers: runs.append('universe') or True, ['A', 'B'], batch=True,
+                       min_interval=3600)
+    scheduler = PrewarmScheduler([every_cycle, slow], stagger=0)
+    for _ in range(3):
+        scheduler.run_cycle()
+    assert runs == ['prices', 'universe', 'prices', 'prices']
+    assert slow.ok == 1 and scheduler.last_cycle.refreshed == 1
+
+    slow.last_run_at -= 3600
+    scheduler.run_cycle()
+    assert runs[-2:] == ['prices', 'universe']
+
+
+def test_per_ticker_tasks_run_every_cycle():
+    seen = []
+    scheduler = PrewarmScheduler([PrewarmTask('chains', lambda t: seen.append(t) or True, ['A', 'B'])], stagger=0)
+    scheduler.run_cycle()
+    scheduler.run_cycle()
+    assert seen == ['A', 'B', 'A', 'B'] and scheduler.cycles == 2
+
+
+def test_closed_market_waits_end_at_the_pre_open():
+    from datetime import datetime
+
+    from prewarm import MARKET_TZ, seconds_until_pre_open
+
+    at = lambda *args: datetime(*args, tzinfo=MARKET_TZ)
+    assert seconds_until_pre_open(at(2026, 10, 13, 8, 0)) == 75 * 60           # Tuesday before the bell
+    assert seconds_until_pre_open(at(2026, 10, 13, 17, 0)) == (16 * 60 + 15) * 60
+    assert seconds_until_pre_open(at(2026, 10, 16, 17, 0)) == (64 * 60 + 15) * 60  # Friday -> Monday
+    assert seconds_until_pre_open(at(2026, 10, 13, 9, 20)) == float('inf')
+    assert seconds_until_pre_open(at(2026, 10, 13, 11, 0)) == float('inf')
+
+
+def test_one_worker_leads_the_cycles_on_a_shared_backend():
+    backend, runs = MemoryBackend(), []
+    workers = [PrewarmScheduler([PrewarmTask('prices', lambda ts, w=w: runs.append(w) or True, ['A'], batch=True)],
+                                interval=0.05, closed_interval=0.05, stagger=0, backend=backend, lock_key='k')
+               for w in ('a', 'b')]
+    a, b = workers
+    assert a.lead_cycle() is not None and b.lead_cycle() is None
+    assert a.lead_cycle() is not None and b.lead_cycle() is None  # The leader renews its own lock
+    assert runs == ['a', 'a'] and b.skipped == 2
+    assert a.status()['leader'] and not b.status()['leader']
+
+    time.sleep(0.15)  # 'a' stops renewing - its lock lapses and 'b' takes over
+    assert b.lead_cycle() is not None and a.lead_cycle() is None
+    assert runs == ['a', 'a', 'b'] and a.skipped == 1
+
+
+def test_without_a_reachable_backend_every_worker_warms_itself():
+    class DownBackend(MemoryBackend):
+        def acquire(self, key, ttl):
+            raise ConnectionError('down')
+
+    runs = []
+    local = PrewarmScheduler([PrewarmTask('prices', lambda ts: runs.append(1) or True, ['A'], batch=True)], stagger=0)
+    down = PrewarmScheduler([PrewarmTask('prices', lambda ts: runs.append(2) or True, ['A'], batch=True)],
+                            stagger=0, backend=DownBackend(), lock_key='k')
+    assert local.lead_cycle() is not None and down.lead_cycle() is not None
+    assert runs == [1, 2] and local.leader
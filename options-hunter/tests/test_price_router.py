@@ -0,0 +1,74 @@
+import threading
+import time
+
+from price_router import HedgedPriceRouter
+
+
+class Provider:
+    """fetch_fn that records when it was called and answers after `delay` seconds."""
+
+    def __init__(self, price, delay=0.0):
+        self.price = price
+        self.delay = delay
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, ticker):
+        self.calls.append(time.monotonic())
+        self.release.wait(self.delay)
+        return self.price
+
+
+def test_hedge_fires_after_the_delay_and_the_first_valid_price_wins():
+    slow, fast = Provider(101.0, delay=5), Provider(100.0)
+    router = HedgedPriceRouter([('A', slow), ('B', fast)], hedge_delay=0.1, hedged=True)
+    start = time.monotonic()
+    try:
+        assert router.fetch('SPY') == ('B', 100.0)
+    finally:
+        slow.release.set()
+    assert 0.1 <= fast.calls[0] - start < 1.0
+    assert time.monotonic() - start < 1.0
+
+
+def test_a_fast_primary_is_not_hedged():
+    primary, backup = Provider(100.0), Provider(99.0)
+    router = HedgedPriceRouter([('A', primary), ('B', backup)], hedge_delay=0.5, hedged=True)
+    assert router.fetch('SPY') == ('A', 100.0)
+    time.sleep(0.6)
+    assert backup.calls == []
+
+
+def test_an_invalid_answer_launches_the_next_provider_at_once():
+    broken, good = Provider(0.0), Provider(100.0)
+    router = HedgedPriceRouter([('A', broken), ('B', good)], hedge_delay=5, hedged=True)
+    start = time.monotonic()
+    assert router.fetch('SPY') == ('B', 100.0)
+    assert time.monotonic() - start < 1.0  # Did not wait out the hedge delay
+    assert router.stats()[0]['failures'] == 1
+
+
+def test_breaker_opens_then_half_opens_after_the_cooldown():
+    provider = Provider(None)
+    router = HedgedPriceRouter([('A', provider)], hedged=False, failure_threshold=2, cooldown=0.2)
+    assert router.fetch('SPY') is None and router.stats()[0]['state'] == 'closed'
+    assert router.fetch('SPY') is None and router.stats()[0]['state'] == 'open'
+    assert router.ordered_providers() == []  # Skipped while the circuit is open
+
+    time.sleep(0.25)
+    assert [name for name, _ in router.ordered_providers()] == ['A']  # One half-open trial ...
+    assert router.ordered_providers() == []                            # ... and only one
+
+    time.sleep(0.25)
+    provider.price = 100.0
+    assert router.fetch('SPY') == ('A', 100.0)
+    assert router.stats()[0]['state'] == 'closed' and router.stats()[0]['consecutive_failures'] == 0
+
+
+def test_all_breakers_open_still_tries_the_providers():
+    provider = Provider(None)
+    router = HedgedPriceRouter([('A', provider)], hedged=False, failure_threshold=1, cooldown=3600)
+    router.fetch('SPY')
+    provider.price = 100.0
+    assert router.ordered_providers() == []
+    assert router.fetch('SPY') == ('A', 100.0) and len(provider.calls) == 2
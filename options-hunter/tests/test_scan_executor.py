@@ -0,0 +1,61 @@
+import threading
+import time
+
+import scan_executor
+from scan_executor import ScanExecutor, provider_slot
+
+
+def test_the_deadline_returns_what_finished():
+    release = threading.Event()
+
+    def fetch(ticker, timing):
+        if ticker == 'SLOW':
+            release.wait(5)
+        if ticker == 'BAD':
+            raise ValueError('boom')
+        return ticker.lower()
+
+    try:
+        start = time.monotonic()
+        report = ScanExecutor(max_workers=4, deadline_seconds=0.2).run(['A', 'SLOW', 'BAD', 'B'], fetch)
+        assert time.monotonic() - start < 2
+    finally:
+        release.set()
+    assert report.results == {'A': 'a', 'BAD': None, 'B': 'b'}
+    assert list(report.results) == ['A', 'BAD', 'B']  # Input order, not completion order
+    assert report.partial and report.timed_out == ['SLOW']
+    statuses = {t.ticker: t.status for t in report.timings}
+    assert statuses == {'A': 'ok', 'SLOW': 'timeout', 'BAD': 'error', 'B': 'ok'}
+    assert report.timings[2].as_dict()['error'] == 'boom'
+
+
+def test_fetch_can_explain_an_empty_result():
+    def fetch(ticker, timing):
+        with timing.stage('price'):
+            pass
+        timing.status = 'no_price'
+
+    report = ScanExecutor(max_workers=2, deadline_seconds=5).run(['A'], fetch)
+    assert not report.partial
+    assert report.timings_as_dicts()[0]['status'] == 'no_price'
+    assert 'price' in report.timings_as_dicts()[0]['stages_ms']
+
+
+def test_provider_slot_caps_concurrent_calls(monkeypatch):
+    monkeypatch.setitem(scan_executor.PROVIDER_LIMITS, 'TestProvider', 2)
+    monkeypatch.setattr(scan_executor, '_provider_semaphores', {})
+    lock, active, peak = threading.Lock(), [0], [0]
+
+    def fetch(ticker, timing):
+        with provider_slot('TestProvider'):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+        return ticker
+
+    report = ScanExecutor(max_workers=8, deadline_seconds=10).run([f"T{i}" for i in range(12)], fetch)
+    assert len(report.results) == 12 and not report.partial
+    assert peak[0] == 2
@@ -0,0 +1,53 @@
+import base64
+import json
+
+import pytest
+
+from scan_pages import compact_result, decode_cursor, encode_cursor
+
+
+def raw_cursor(**overrides):
+    payload = dict({'b': 500.0, 'e': '2026-11-20', 't': ['SPY'], 'l': None, 's': 'abc', 'o': 0}, **overrides)
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(500.0, '2026-11-20', ['SPY', 'QQQ'], 25, 'abc123', 50)
+    assert decode_cursor(cursor) == {'b': 500.0, 'e': '2026-11-20', 't': ['SPY', 'QQQ'], 'l': 25,
+                                     's': 'abc123', 'o': 50}
+
+
+def test_foreign_cursors_are_rejected():
+    assert decode_cursor('not-a-cursor') is None
+    assert decode_cursor(encode_cursor(500.0, '2026-11-20', ['SPY'], None, 'abc', 0)[:-3]) is None
+    assert decode_cursor(base64.urlsafe_b64encode(b'[1, 2]').decode()) is None
+
+
+@pytest.mark.parametrize('field, value', [
+    ('t', [['A']]), ('t', 'SPY'), ('t', [1]), ('b', '500'), ('b', True), ('b', None), ('e', 20261120),
+    ('s', ['abc']), ('l', 2.5), ('l', '25'), ('o', -1), ('o', 1.0), ('o', True),
+])
+def test_mistyped_fields_are_rejected(field, value):
+    assert decode_cursor(raw_cursor(**{field: value})) is None
+
+
+def test_integer_budget_and_missing_limit_are_accepted():
+    assert decode_cursor(raw_cursor(b=500, l=None))['b'] == 500
+
+
+def test_crafted_cursor_gets_a_400(server):
+    response = server.app.test_client().get('/api/scan', query_string={'cursor': raw_cursor(t=[['A']])})
+    assert response.status_code == 400 and response.get_json() == {'error': 'Invalid cursor'}
+
+
+def test_compact_shape_lists_ticker_fields_once():
+    opportunities = [
+        {'ticker': t, 'spot': 100.0 + i, 'price_source': 'Tradier', 'price_timestamp': 'p', 'options_source': 'Tradier',
+         'options_timestamp': 'o', 'rank': rank, 'contract': {'strike': 100.0}, 'metrics': {'profit_score': 1.0}}
+        for rank, (i, t) in enumerate([(0, 'SPY'), (1, 'QQQ'), (0, 'SPY')], 1)
+    ]
+    compact = compact_result({'opportunities': opportunities, 'total_found': 3})
+    assert compact['shape'] == 'compact' and compact['total_found'] == 3
+    assert set(compact['tickers']) == {'SPY', 'QQQ'} and compact['tickers']['QQQ']['spot'] == 101.0
+    assert all('spot' not in o for o in compact['opportunities'])
+    assert [o['rank'] for o in compact['opportunities']] == [1, 2, 3]
@@ -0,0 +1,84 @@
+import copy
+import random
+
+import pytest
+
+from scan_ranking import CandidatePool, ScanHighlights, TopK
+
+by_score = lambda o: o['metrics']['profit_score']
+
+
+@pytest.fixture(scope='module')
+def opps():
+    rnd = random.Random(11)
+    return [{'ticker': 'T', 'spot': 100.0,
+             'metrics': {'profit_score': round(rnd.uniform(-1, 2), 1), 'cost_to_enter': rnd.choice([50, 75, 120]),
+                         'liquidity_score': rnd.random()},
+             'contract': {'delta': rnd.choice([None, round(rnd.uniform(-1, 1), 2)]),
+                          'strike': float(rnd.randint(80, 120)), 'type': rnd.choice(['CALL', 'PUT'])}}
+            for _ in range(20000)]
+
+
+@pytest.mark.parametrize('k', [0, 1, 10, 250])
+def test_topk_matches_sorted_slice(opps, k):
+    top = TopK(k, by_score)
+    for opp in opps:
+        top.add(opp)
+    assert top.top() == sorted(opps, key=by_score, reverse=True)[:k]
+
+
+def test_highlights_match_the_sort_based_picks(opps):
+    ranked = sorted(opps, key=by_score, reverse=True)
+    positive = [o for o in ranked if o['metrics']['profit_score'] > 0]
+    with_delta = [o for o in ranked if o['contract'].get('delta') is not None]
+    highlights = ScanHighlights()
+    for opp in opps:
+        highlights.add(opp)
+    assert highlights.count == len(opps)
+    assert highlights.as_dict() == {
+        'highest_profit': ranked[0],
+        'cheapest_profit': min(positive, key=lambda x: x['metrics']['cost_to_enter']),
+        'highest_probability': max(with_delta, key=lambda x: abs(x['contract']['delta'])),
+    }
+
+
+def test_ranked_highlights_are_copies_with_global_rank(opps):
+    original = copy.deepcopy(opps)
+    ranked = sorted(opps, key=by_score, reverse=True)
+    highlights = ScanHighlights()
+    for opp in opps:
+        highlights.add(opp)
+    plain = highlights.as_dict()
+    for name, opp in highlights.as_dict(with_rank=True).items():
+        assert opp is not plain[name]
+        assert next(i for i, o in enumerate(ranked, 1) if o is plain[name]) == opp['rank']
+        assert opp['category_tags'][0] == 'budget_fit'
+    assert opps == original  # Callers' dicts untouched
+
+
+def test_highlight_rank_counts_earlier_ties():
+    highlights = ScanHighlights()
+    for cost, delta in ((100, 0.2), (90, 0.3), (80, 0.9)):
+        highlights.add({'metrics': {'profit_score': 1.0, 'cost_to_enter': cost, 'liquidity_score': 0.5},
+                        'contract': {'delta': delta}})
+    ranked = highlights.as_dict(with_rank=True)
+    assert ranked['highest_profit']['rank'] == 1
+    assert ranked['cheapest_profit']['rank'] == ranked['highest_probability']['rank'] == 3
+
+
+def test_highlights_fall_back_to_closest_itm_without_deltas():
+    highlights = ScanHighlights()
+    for strike in (110.0, 95.0, 99.0):
+        highlights.add({'spot': 100.0, 'metrics': {'profit_score': 0.5, 'cost_to_enter': 10},
+                        'contract': {'delta': None, 'strike': strike, 'type': 'CALL'}})
+    assert highlights.as_dict()['highest_probability']['contract']['strike'] == 99.0
+
+
+def test_candidate_pool_keeps_threshold_passers():
+    pool = CandidatePool(k=2, threshold=50)
+    for confidence in (40, 70, 55, 90, 20):
+        pool.add({'confidence': confidence, 'metrics': {'profit_score': confidence / 100}})
+    assert pool.total == 5 and pool.passed == 3
+    assert pool.profit_score_sum == pytest.approx(2.15)
+    assert [c['confidence'] for c in pool.top.top()] == [90, 70]
+    assert [c['confidence'] for c in pool.sample.top()] == [90, 70, 55, 40, 20]
@@ -0,0 +1,210 @@
+import json
+import time
+
+import numpy as np
+
+
+def test_indicators_rejects_oversized_ticker_lists(server):
+    tickers = ','.join(f"T{i}" for i in range(server.INDICATORS_MAX_TICKERS + 1))
+    response = server.app.test_client().get('/api/indicators', query_string={'tickers': tickers})
+    assert response.status_code == 400 and 'Too many tickers' in response.get_json()['error']
+
+
+def test_indicators_requires_tickers(server):
+    response = server.app.test_client().get('/api/indicators', query_string={'tickers': ' , '})
+    assert response.status_code == 400
+
+
+def test_prewarm_price_refresh_bypasses_the_cache_for_batch_misses(server, monkeypatch):
+    stale = {'ticker': 'ZZZT', 'price': 1.0, 'source': 'Old', 'timestamp': 'then'}
+    server.price_cache.set('ZZZT', stale)
+    for name in ('fetch_prices_tradier', 'fetch_prices_finnhub', 'fetch_prices_yfinance'):
+        monkeypatch.setattr(server, name, lambda tickers: {})
+    monkeypatch.setattr(server, '_fetch_live_price',
+                        lambda t: {'ticker': t, 'price': 2.0, 'source': 'Hedged', 'timestamp': 'now'})
+    assert server.refresh_prices(['ZZZT'])['ZZZT']['price'] == 2.0
+    assert server.price_cache.get('ZZZT')['price'] == 2.0
+    server.price_cache.invalidate('ZZZT')
+
+
+def slow_batch_quotes(server, monkeypatch, seconds):
+    calls = []
+
+    def get_live_prices(tickers, fan_out=True):
+        calls.append(list(tickers))
+        time.sleep(seconds)
+        return {t: None for t in tickers}
+
+    monkeypatch.setattr(server, 'get_live_prices', get_live_prices)
+    monkeypatch.setattr(server, 'get_live_price', lambda t: None)
+    return calls
+
+
+def test_auto_recommend_batch_quote_is_bounded_by_the_deadline(server, monkeypatch):
+    slow_batch_quotes(server, monkeypatch, 2.0)
+    started = time.perf_counter()
+    response = server.app.test_client().get('/api/auto-recommend', query_string={
+        'budget': '500', 'expiry': '2030-01-18', 'tickers': 'AAA,BBB', 'deadline': '1'})
+    assert time.perf_counter() - started < 1.5
+    assert response.status_code == 200
+    assert {t['ticker']: t['status'] for t in response.get_json()['ticker_timings']} == \
+        {'AAA': 'no_price', 'BBB': 'no_price'}
+
+
+def test_stream_scan_sends_start_before_quoting(server, monkeypatch):
+    calls = slow_batch_quotes(server, monkeypatch, 0.5)
+    monkeypatch.setattr(server, 'SCAN_DEADLINE_SECONDS', 1.0)
+    with server.app.test_request_context():
+        body = iter(server.stream_scan(['AAA', 'BBB'], '2030-01-18', 500).response)
+        assert json.loads(next(body))['event'] == 'start' and calls == []
+        started = time.perf_counter()
+        events = [json.loads(line) for line in body]
+    assert time.perf_counter() - started < 1.0
+    assert calls == [['AAA', 'BBB']]
+    assert [(e['event'], e.get('reason')) for e in events[:-1]] == [('skip', 'no_price')] * 2
+
+
+def test_chain_cached_without_spot_gets_greeks_on_a_read_with_spot(server, monkeypatch):
+    from option_chain import OptionChain
+
+    fetches, recorded = [], []
+
+    def providers(ticker, expiry, spot=None):
+        fetches.append(spot)
+        chain = OptionChain(expiry, ['C95', 'P105'], [True, False], strike=[95.0, 105.0], bid=[6.9, 6.4],
+                            ask=[7.1, 6.6], mid=[7.0, 6.5], iv=[0.35, 0.4])
+        return {'contracts': chain, 'source': 'yfinance', 'data_mode': 'delayed'}
+
+    class History:
+        def record(self, ticker, chain, spot):
+            recorded.append((ticker, spot))
+
+    monkeypatch.setattr(server, '_fetch_options_from_providers', providers)
+    monkeypatch.setattr(server, 'get_iv_history', lambda: History())
+    key = ('GRKS', '2030-01-18')
+    server.chain_cache.invalidate(key)
+    try:
+        contracts, _ = server.get_options_chain(*key)
+        assert contracts[0]['delta'] is None and recorded == []
+
+        chain = server.fetch_options_for_scan(*key, spot=100.0)['contracts']
+        assert not np.isnan(chain.delta).any() and not np.isnan(chain.theta).any()
+        assert fetches == [None] and recorded == [('GRKS', 100.0)]
+
+        server.fetch_options_for_scan(*key, spot=100.0)
+        assert fetches == [None] and recorded == [('GRKS', 100.0)]  # Filled once, not per read
+    finally:
+        server.chain_cache.invalidate(key)
+
+
+def universe_frames(tickers, days=70):
+    import pandas as pd
+
+    dates = pd.bdate_range(end='2026-10-16', periods=days)
+    frames = {}
+    for i, ticker in enumerate(tickers):
+        rng = np.random.default_rng(i)
+        frames[ticker] = pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0,
+                                       'Close': 50 * np.exp(np.cumsum(rng.normal(0, 0.02, days))),
+                                       'Volume': rng.lognormal(14, 0.5, days)}, index=dates)
+    return frames
+
+
+def test_universe_prewarm_batches_downloads_into_the_indicator_cache(server, monkeypatch):
+    import pandas as pd
+    from indicator_matrix import as_indicator_dicts, snapshot_frames
+
+    tickers = [f"U{i:03d}" for i in range(5)]
+    frames = universe_frames(tickers[:4])   # U004 has no bars
+    downloads = []
+
+    def download(symbols, **kwargs):
+        downloads.append(list(symbols))
+        got = {t: frames[t] for t in symbols if t in frames}
+        return pd.concat(got, axis=1) if got else pd.DataFrame()
+
+    monkeypatch.setattr(server.yf, 'download', download)
+    monkeypatch.setattr(server, 'UNIVERSE_DOWNLOAD_BATCH', 2)
+    try:
+        assert server.refresh_universe_indicators(tickers) == 4
+        assert downloads == [['U000', 'U001'], ['U002', 'U003'], ['U004']]
+        expected = as_indicator_dicts(snapshot_frames(frames))
+        assert server.get_cached_indicators(tickers) == dict(expected, U004=None)
+    finally:
+        for ticker in tickers:
+            server.indicators_cache.invalidate(ticker)
+
+
+def test_universe_screen_scores_cached_indicators_only(server, monkeypatch, tmp_path):
+    from indicator_matrix import as_indicator_dicts, snapshot_frames
+
+    tickers = [f"V{i:03d}" for i in range(6)]
+    universe = tmp_path / 'universe.txt'
+    universe.write_text('\n'.join(tickers))
+    warm = as_indicator_dicts(snapshot_frames(universe_frames(tickers[:4])))
+
+    def no_history(*args, **kwargs):
+        raise AssertionError('history fetched inside the request')
+
+    monkeypatch.setattr(server, 'UNIVERSE_FILE', str(universe))
+    monkeypatch.setattr(server, 'get_history', no_history)
+    monkeypatch.setattr(server, 'get_live_prices',
+                        lambda ts, fan_out=True: {t: {'price': warm[t]['price'] if t in warm else 50.0} for t in ts})
+    for ticker, indicators in warm.items():
+        server.indicators_cache.set(ticker, indicators)
+    try:
+        screened, funnel = server.screen_universe(10)
+    finally:
+        for ticker in tickers:
+            server.indicators_cache.invalidate(ticker)
+    stage = {s['stage']: s for s in funnel.stages}
+    assert stage['quotes']['count'] == 6
+    assert (stage['indicators']['count'], stage['indicators']['missing']) == (4, 2)
+    assert set(screened.survivors) <= set(warm)
+
+
+def test_universe_screen_quotes_are_bounded_by_the_deadline(server, monkeypatch, tmp_path):
+    universe = tmp_path / 'universe.txt'
+    universe.write_text('W000 W001')
+    monkeypatch.setattr(server, 'UNIVERSE_FILE', str(universe))
+    slow_batch_quotes(server, monkeypatch, 1.0)
+    server.price_cache.set('W001', {'ticker': 'W001', 'price': 20.0, 'source': 'Test', 'timestamp': 'now'})
+    try:
+        started = time.perf_counter()
+        _, funnel = server.screen_universe(10, deadline=1.0)
+        assert time.perf_counter() - started < 0.8
+    finally:
+        server.price_cache.invalidate('W001')
+    assert funnel.stages[1] == dict(funnel.stages[1], stage='quotes', count=1)  # Cached quote only
+
+
+def test_server_runs_without_the_services_tree(monkeypatch):
+    import importlib.util
+    import os
+    import sys
+
+    # What a deploy of options-hunter/ alone looks like: no optionshunter package to import
+    monkeypatch.setitem(sys.modules, 'optionshunter.transport', None)
+    monkeypatch.setitem(sys.modules, 'optionshunter.fast_json', None)
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server-alphavantage.py')
+    spec = importlib.util.spec_from_file_location('server_standalone', path)
+    standalone = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(standalone)
+
+    assert standalone.get_transport().metrics() == {}
+    assert json.loads(standalone.app.json.dumps({'a': np.float64(1.5), 'b': np.arange(2), 'c': np.bool_(True)})) == \
+        {'a': 1.5, 'b': [0, 1], 'c': True}
+    response = standalone.app.test_client().get('/api/indicators', query_string={'tickers': ' , '})
+    assert response.status_code == 400
+
+
+def test_prewarmed_entries_outlive_the_closed_market_cycle(server, monkeypatch):
+    assert server.PREWARM_INDICATORS_TTL >= 2 * server.PREWARM_CLOSED_INTERVAL
+    assert server.PREWARM_CHAIN_TTL >= 2 * server.PREWARM_CLOSED_INTERVAL
+    monkeypatch.setattr(server, '_compute_technical_indicators', lambda t: {'price': 1.0})
+    try:
+        server.refresh_indicators('ZZZI')
+        _, expires_at = server.indicators_cache._data['ZZZI']
+        assert expires_at - time.monotonic() > server.PREWARM_CLOSED_INTERVAL
+    finally:
+        server.indicators_cache.invalidate('ZZZI')
@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+import pytest
+
+from signals import ScoringWeights, compute_confidence, compute_confidence_batch, score_rules
+
+
+@pytest.fixture(scope='module')
+def rows():
+    rnd = random.Random(21)
+    maybe = lambda v: None if rnd.random() < 0.1 else v
+    rows = []
+    for _ in range(5000):
+        price = rnd.uniform(90, 110)
+        rows.append({
+            'direction': rnd.choice(['call', 'put']),
+            'price': price,
+            'ema9': maybe(price * rnd.uniform(0.97, 1.03)),
+            'ema20': maybe(price * rnd.uniform(0.95, 1.05)),
+            'rsi': maybe(rnd.uniform(20, 80)),
+            'rsi_slope': rnd.uniform(-5, 5),
+            'volume': maybe(rnd.uniform(0, 3e6)),
+            'avg_volume_20': maybe(rnd.choice([0.0, rnd.uniform(5e5, 2e6)])),
+            'price_change_pct': rnd.uniform(-3, 3),
+            'sector_price_change': maybe(rnd.uniform(-1, 1)),
+            'sector_above_ema20': rnd.choice([True, False, None]),
+            'iv_rank': maybe(rnd.uniform(0, 100)),
+            'has_near_earnings': rnd.random() < 0.2,
+            'has_major_macro_event': rnd.random() < 0.1,
+        })
+    return rows
+
+
+@pytest.mark.parametrize('weights', [ScoringWeights(), ScoringWeights(trend=30, macro_penalty=-5)])
+def test_batch_matches_scalar(rows, weights):
+    assert compute_confidence_batch(rows, weights).results() == [compute_confidence(r, weights) for r in rows]
+
+
+def test_scalar_ticker_fields_broadcast_against_contract_arrays(rows):
+    shared = {k: v for k, v in rows[0].items() if k not in ('direction', 'iv_rank')}
+    columns = dict(shared, direction=np.array([r['direction'] for r in rows]),
+                   iv_rank=np.array([np.nan if r['iv_rank'] is None else r['iv_rank'] for r in rows]))
+    expected = [compute_confidence(dict(shared, direction=r['direction'], iv_rank=r['iv_rank'])) for r in rows]
+    assert compute_confidence_batch(columns).results() == expected
+
+
+def test_reweighting_fired_masks_equals_rescoring(rows):
+    batch = compute_confidence_batch(rows)
+    weights = ScoringWeights(rsi=5, sector=30, earnings_penalty=-40)
+    assert np.array_equal(score_rules(batch.fired, weights), compute_confidence_batch(rows, weights).confidence)
+
+
+def test_weights_from_env(monkeypatch):
+    monkeypatch.setenv('SCORE_TREND', '30')
+    monkeypatch.setenv('PENALTY_EARNINGS', '-7.5')
+    assert ScoringWeights.from_env() == ScoringWeights(trend=30, earnings_penalty=-7.5)
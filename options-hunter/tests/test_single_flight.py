@@ -0,0 +1,38 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from single_flight import SingleFlight
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight('test')
+    fetches = []
+
+    def slow_fetch():
+        fetches.append(1)
+        time.sleep(0.2)
+        return 'SPY chain'
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(lambda _: flight.do(('Tradier', 'SPY'), slow_fetch), range(20)))
+    assert results == ['SPY chain'] * 20 and len(fetches) == 1
+    assert flight.stats()['executed'] == 1 and flight.stats()['coalesced'] == 19
+    assert flight.do(('Tradier', 'SPY'), lambda: 'again') == 'again'  # Not a cache
+
+
+def test_single_flight_errors_reach_every_waiter():
+    flight = SingleFlight('errors')
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError('503')
+
+    def call(_):
+        try:
+            flight.do('key', failing)
+        except RuntimeError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        assert list(pool.map(call, range(5))) == ['503'] * 5
+    assert flight.stats()['in_flight'] == 0
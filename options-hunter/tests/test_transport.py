@@ -0,0 +1,89 @@
+import socket
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from optionshunter import transport
+from optionshunter.transport import ProviderTransport
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """Backoff sleeps, recorded instead of slept."""
+    slept = []
+    monkeypatch.setattr(transport, 'time', SimpleNamespace(perf_counter=time.perf_counter, time=time.time,
+                                                           sleep=slept.append))
+    return slept
+
+
+def statuses(*codes):
+    """Handler answering with each status in turn, then 200 for good."""
+    codes = list(codes)
+    return lambda request: (codes.pop(0) if codes else 200, {'ok': True}, {})
+
+
+def test_retries_5xx_until_success(http_stub, delays):
+    http_stub.handler = statuses(503, 502)
+    client = ProviderTransport(max_retries=2, backoff_base=0.5, backoff_max=4.0)
+    response = client.get(http_stub.base_url + '/v1/quote', params={'symbol': 'SPY'})
+    assert response.status_code == 200 and response.json() == {'ok': True}
+    assert len(http_stub.requests) == 3 and http_stub.requests[-1].query == {'symbol': 'SPY'}
+    assert len(delays) == 2 and 0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 1.0  # Jittered, doubling
+
+    stats = client.metrics()[http_stub.base_url]
+    assert stats['requests'] == 3 and stats['retries'] == 2 and stats['errors'] == 2
+    assert stats['status_counts'] == {'200': 1, '502': 1, '503': 1}
+    assert stats['last_error'] == 'HTTP 502' and stats['latency_ms']['p50'] is not None
+
+
+def test_gives_up_after_max_retries_and_returns_the_last_response(http_stub, delays):
+    http_stub.handler = statuses(500, 500, 500, 500)
+    response = ProviderTransport(max_retries=2, backoff_base=0).get(http_stub.base_url + '/x')
+    assert response.status_code == 500 and len(http_stub.requests) == 3
+
+
+def test_client_errors_and_posts_are_not_retried(http_stub, delays):
+    client = ProviderTransport(max_retries=3, backoff_base=0)
+    http_stub.handler = statuses(404)
+    assert client.get(http_stub.base_url + '/missing').status_code == 404
+    http_stub.handler = statuses(503)
+    assert client.post(http_stub.base_url + '/orders', json={'qty': 1}).status_code == 503
+    assert [r.method for r in http_stub.requests] == ['GET', 'POST'] and delays == []
+
+
+def test_retry_after_is_honoured_up_to_the_cap(http_stub, delays):
+    answers = [(429, {}, {'Retry-After': '3'}), (503, {}, {'Retry-After': '60'})]
+    http_stub.handler = lambda request: answers.pop(0) if answers else (200, {}, {})
+    client = ProviderTransport(max_retries=2, backoff_base=0.1, backoff_max=5.0)
+    assert client.get(http_stub.base_url + '/x').status_code == 200
+    assert delays == [3.0, 5.0]
+
+
+def test_connection_errors_are_retried_then_raised(delays):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]  # Closed again before the client connects
+    url = f"http://127.0.0.1:{port}"
+    client = ProviderTransport(max_retries=2, backoff_base=0)
+    with pytest.raises(requests.ConnectionError):
+        client.get(url + '/x', timeout=1)
+    stats = client.metrics()[url]
+    assert stats['requests'] == 3 and stats['retries'] == 2 and stats['errors'] == 3
+    assert stats['last_error'] == 'ConnectionError' and stats['status_counts'] == {}
+
+
+def test_metrics_are_kept_per_host(http_stub, delays):
+    other = type(http_stub)()
+    try:
+        http_stub.handler = other.handler = statuses()
+        client = ProviderTransport()
+        for _ in range(2):
+            client.get(http_stub.base_url + '/a')
+        client.get(other.base_url + '/b')
+        stats = client.metrics()
+        assert stats[http_stub.base_url]['requests'] == 2 and stats[other.base_url]['requests'] == 1
+        assert stats[http_stub.base_url]['error_rate'] == 0.0
+    finally:
+        other.close()
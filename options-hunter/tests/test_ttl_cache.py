@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cache_backend import MemoryBackend
+from ttl_cache import TTLCache
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache('lru', max_size=3, ttl=60)
+    for k in 'abc':
+        cache.set(k, k.upper())
+    cache.get('a')          # a becomes most recently used
+    cache.set('d', 'D')     # evicts b
+    assert 'b' not in cache and cache.get('a') == 'A' and len(cache) == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_with_per_key_ttl():
+    cache = TTLCache('ttl', max_size=10, ttl=0.05)
+    cache.set('short', 1)
+    cache.set('long', 2, ttl=10)
+    time.sleep(0.08)
+    assert cache.get('short') is None and cache.get('long') == 2
+    assert cache.stats()['expirations'] == 1
+
+
+def test_get_or_load_caches_and_skips_none():
+    cache = TTLCache('load', max_size=10, ttl=60)
+    calls = []
+    assert cache.get_or_load('k', lambda: calls.append(1) or 'V') == 'V'
+    assert cache.get_or_load('k', lambda: calls.append(1) or 'V') == 'V'
+    assert len(calls) == 1
+    assert cache.get_or_load('none', lambda: calls.append(1)) is None
+    assert cache.get_or_load('none', lambda: calls.append(1)) is None
+    assert len(calls) == 3  # Failed lookups are retried
+    assert cache.get_or_load('empty', lambda: [], cache_if=bool) == [] and 'empty' not in cache
+
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache('stampede', max_size=10, ttl=60)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        assert list(pool.map(lambda _: cache.get_or_load('SPY', slow), range(10))) == [42] * 10
+    assert len(calls) == 1
+
+
+def test_refresh_reloads_fresh_entry():
+    cache = TTLCache('refresh', max_size=10, ttl=60)
+    cache.set('k', 1)
+    assert cache.refresh('k', lambda: 2) == 2 and cache.get('k') == 2
+
+
+def test_workers_share_one_backend():
+    backend = MemoryBackend()
+    worker_a = TTLCache('quotes', 10, 60, shared=backend)
+    worker_b = TTLCache('quotes', 10, 60, shared=backend)
+    calls = []
+    assert worker_a.get_or_load('SPY', lambda: 512.0) == 512.0
+    assert worker_b.get_or_load('SPY', lambda: calls.append(1) or 0.0) == 512.0
+    assert not calls and worker_b.stats()['shared_hits'] == 1
+    worker_a.invalidate('SPY')
+    assert worker_b.get_or_load('SPY', lambda: 513.0) in (512.0, 513.0)  # Local copy lives up to local_ttl
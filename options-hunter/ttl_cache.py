@@ -0,0 +1,246 @@
+"""
+ttl_cache.py - Bounded, thread-safe LRU cache with per-key TTL
+Replaces the unbounded module-level cache dicts; every cache reports
+hit/miss/eviction counters for /api/cache-stats. Misses loaded through
+get_or_load() are coalesced so concurrent requests fetch once, and with
+a shared backend (cache_backend.py) once across all worker processes
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from cache_backend import CacheBackend, CACHE_KEY_PREFIX, CACHE_LOCK_TIMEOUT
+from single_flight import SingleFlight
+
+_MISSING = object()
+
+# Every TTLCache registers itself here so one endpoint can report them all
+_registry: List['TTLCache'] = []
+_registry_lock = threading.Lock()
+
+
+class TTLCache:
+    """
+    LRU cache holding at most max_size entries, each expiring after its TTL.
+
+    get() refreshes an entry's LRU position; set() evicts the least recently
+    used entry once the cache is full. Expired entries are dropped lazily.
+
+    With a shared backend, local misses fall through to it and writes go to
+    both. Local copies of shared entries live at most local_ttl seconds so
+    refreshes made by other workers show up quickly.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float, shared: CacheBackend = None,
+                 local_ttl: float = 5.0):
+        self.name = name
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self.shared = shared
+        self.local_ttl = local_ttl
+        self.shared_hits = 0
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.flight = SingleFlight(name)  # Coalesces concurrent get_or_load() misses
+        with _registry_lock:
+            _registry.append(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._get_local(key)
+        if value is _MISSING and self.shared is not None:
+            value = self._get_shared(key)
+        if value is _MISSING:
+            with self._lock:
+                self.misses += 1
+            return default
+        return value
+
+    def _get_local(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{CACHE_KEY_PREFIX}:{self.name}:{key!r}"
+
+    def _get_shared(self, key: Hashable) -> Any:
+        """Value another worker stored, copied into the local LRU for its remaining TTL."""
+        entry = self.shared.get_value(self._shared_key(key))
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        self._set_local(key, value, min(self.local_ttl, expires_at - time.time()))
+        with self._lock:
+            self.shared_hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        if self.shared is not None:
+            self.shared.set_value(self._shared_key(key), value, ttl)
+            self._set_local(key, value, min(self.local_ttl, ttl))
+        else:
+            self._set_local(key, value, ttl)
+
+    def _set_local(self, key: Hashable, value: Any, ttl: float):
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _peek(self, key: Hashable) -> Any:
+        """Live value or _MISSING, without touching counters."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() >= entry[1]:
+                return _MISSING
+            return entry[0]
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: float = None,
+                    cache_if: Callable[[Any], bool] = None) -> Any:
+        """
+        Return the cached value, or call loader() and cache its result.
+        Concurrent misses for the same key share a single loader() call.
+        By default None results aren't cached, so failed lookups are retried.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        def load():
+            # A previous leader may have filled the entry after our miss
+            value = self._peek(key)
+            if value is not _MISSING:
+                return value
+            if self.shared is not None:
+                return self._load_shared(key, loader, ttl, cache_if)
+            value = loader()
+            if cache_if(value) if cache_if is not None else value is not None:
+                self.set(key, value, ttl)
+            return value
+
+        return self.flight.do(key, load)
+
+    def _load_shared(self, key: Hashable, loader: Callable[[], Any], ttl: float,
+                     cache_if: Callable[[Any], bool]) -> Any:
+        """
+        Cross-process stampede protection: one worker takes the backend lock and
+        loads; the others wait for its result (or load anyway if it never lands).
+        """
+        shared_key = self._shared_key(key)
+        lock_key = shared_key + ':lock'
+        token = self.shared.try_acquire(lock_key, CACHE_LOCK_TIMEOUT)
+        if token is not None:
+            # The previous holder may have stored its result between our miss and the lock
+            value = self._get_shared(key)
+            if value is not _MISSING:
+                self.shared.try_release(lock_key, token)
+                return value
+        else:
+            entry = self.shared.wait_for(shared_key, lock_key, CACHE_LOCK_TIMEOUT)
+            if entry is not None:
+                expires_at, value = entry
+                self._set_local(key, value, min(self.local_ttl, expires_at - time.time()))
+                return value
+        try:
+            value = loader()
+            if cache_if(value) if cache_if is not None else value is not None:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            if token is not None:
+                self.shared.try_release(lock_key, token)
+
+    def refresh(self, key: Hashable, loader: Callable[[], Any], ttl: float = None,
+                cache_if: Callable[[Any], bool] = None) -> Any:
+        """
+        Reload key even if it is still fresh (background pre-warming).
+        Shares the in-flight call with any concurrent get_or_load() miss.
+        """
+        def load():
+            value = loader()
+            if cache_if(value) if cache_if is not None else value is not None:
+                self.set(key, value, ttl)
+            return value
+
+        return self.flight.do(key, load)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete_value(self._shared_key(key))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Live-entry check that doesn't touch LRU order or counters."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and time.monotonic() < entry[1]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.hits + self.shared_hits
+            lookups = hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'coalesced': self.flight.coalesced,
+                'shared_hits': self.shared_hits,
+                'backend': self.shared.name if self.shared is not None else 'local',
+            }
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    """Stats for every TTLCache created in this process."""
+    with _registry_lock:
+        caches = list(_registry)
+    return [c.stats() for c in caches]
+
+
+if __name__ == '__main__':
+    # Hit-path cost and counters (behaviour lives in tests/test_ttl_cache.py)
+    cache = TTLCache('demo', max_size=1000, ttl=60)
+    for i in range(1000):
+        cache.set(i, i)
+    t0 = time.perf_counter()
+    for i in range(200000):
+        cache.get(i % 1200)
+    print(f"get: {(time.perf_counter() - t0) * 5:.2f}us per lookup")
+    t0 = time.perf_counter()
+    for i in range(200000):
+        cache.get_or_load(i % 1000, lambda: None)
+    print(f"get_or_load (hit): {(time.perf_counter() - t0) * 5:.2f}us per lookup")
+    print(cache.stats())
@@ -9,12 +9,27 @@ __version__ = '2.0.0-fused'
 __author__ = 'GG LOOP LLC'
 __description__ = 'Options Hunter by GG LOOP - Unified market data service'
 
-from .tradier_client import TradierClient, get_tradier_client
-from .api import optionshunter_bp, init_optionshunter_routes
+import importlib
 
-__all__ = [
-    'TradierClient',
-    'get_tradier_client',
-    'optionshunter_bp',
-    'init_optionshunter_routes'
-]
+# Name -> submodule. Loaded on first attribute access, so importing a single
+# submodule (e.g. `from optionshunter.transport import get_transport` in the
+# options-hunter server) does not pull in the Flask blueprint or Tradier client.
+_EXPORTS = {
+    'TradierClient': 'tradier_client',
+    'get_tradier_client': 'tradier_client',
+    'ProviderTransport': 'transport',
+    'get_transport': 'transport',
+    'FastJSONProvider': 'fast_json',
+    'init_fast_json': 'fast_json',
+    'optionshunter_bp': 'api',
+    'init_optionshunter_routes': 'api',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f'.{module}', __name__), name)
@@ -19,6 +19,8 @@ import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from optionshunter.tradier_client import get_tradier_client
+from optionshunter.transport import get_transport
+from optionshunter.fast_json import init_fast_json
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +80,7 @@ def status():
             'empire_hub': 'active',
             'main_app': 'available'
         },
+        'transport': get_transport().metrics(),
         'timestamp': datetime.now().isoformat()
     })
 
@@ -162,10 +165,12 @@ def scan():
     
     client = get_tradier_client()
     results = []
+    scan_symbols = symbols[:10]  # Limit to 10 symbols max
+    quotes = client.get_quotes(scan_symbols)  # One quote request for the whole list
     
-    for symbol in symbols[:10]:  # Limit to 10 symbols max
+    for symbol in scan_symbols:
         try:
-            options = client.scan_affordable_options(symbol, max_cost)
+            options = client.scan_affordable_options(symbol, max_cost, quote=quotes.get(symbol))
             
             if 'error' not in options:
                 results.append({
@@ -274,8 +279,12 @@ def init_optionshunter_routes(app: Flask):
     Usage:
         from services.optionshunter.api import init_optionshunter_routes
         init_optionshunter_routes(app)
+    
+    Also switches the app's jsonify() to the fast JSON provider
+    (see fast_json.py).
     """
     app.register_blueprint(optionshunter_bp)
+    init_fast_json(app)
     logger.info("✅ Options Hunter routes registered")
 
 
@@ -0,0 +1,254 @@
+"""
+OPTIONS HUNTER SERVICE - Fast JSON Responses
+
+A Flask JSON provider that serializes with orjson when it is installed
+(stdlib json otherwise), understands NumPy scalars and arrays, and an
+after_request hook that gzip/brotli-compresses large JSON bodies for
+clients that accept it.
+
+Installed with init_fast_json(app): every jsonify() call in the app goes
+through it, so route code doesn't change. One visible difference under
+orjson: NaN and Infinity are written as null (valid JSON) instead of the
+bare NaN tokens the stdlib emits.
+
+Environment Variables (all optional):
+- JSON_COMPRESS_MIN_BYTES: Smallest body worth compressing (default: 1024)
+- JSON_GZIP_LEVEL: gzip compression level (default: 1)
+- JSON_BROTLI_QUALITY: brotli quality (default: 4)
+"""
+
+import os
+import gzip
+import json
+import dataclasses
+import decimal
+import logging
+import uuid
+from datetime import date
+from typing import Any, Optional
+
+from flask import Flask, request
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # Stdlib encoder fallback
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+JSON_COMPRESS_MIN_BYTES = int(os.getenv('JSON_COMPRESS_MIN_BYTES', '1024'))
+JSON_GZIP_LEVEL = int(os.getenv('JSON_GZIP_LEVEL', '1'))  # Level 1 gets ~90% of level 6's ratio at a third of the cost
+JSON_BROTLI_QUALITY = int(os.getenv('JSON_BROTLI_QUALITY', '4'))
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+if orjson is not None:
+    # Datetimes go through _default so they render as HTTP dates, as Flask's encoder does
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(o: Any) -> Any:
+    """Types beyond plain JSON: Flask's extras (dates, Decimal, UUID, dataclasses) plus NumPy."""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    if np is not None:
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _dumps_stdlib(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    separators = None if indent else (',', ':')
+    return json.dumps(obj, default=_default, sort_keys=sort_keys, indent=2 if indent else None,
+                      separators=separators, ensure_ascii=False).encode('utf-8')
+
+
+def dumps(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes.
+
+    Args:
+        obj: Value to serialize
+        sort_keys: Sort object keys
+        indent: Pretty-print with 2-space indentation
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is None:
+        return _dumps_stdlib(obj, sort_keys, indent)
+    options = _ORJSON_OPTIONS
+    if sort_keys:
+        options |= orjson.OPT_SORT_KEYS
+    if indent:
+        options |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(obj, default=_default, option=options)
+    except TypeError:
+        # e.g. ints beyond 64 bits or non-str keys orjson can't sort - the stdlib copes
+        return _dumps_stdlib(obj, sort_keys, indent)
+
+
+def loads(s: Any) -> Any:
+    """Parse JSON from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+def compress(body: bytes, accept_encoding: str) -> Optional[tuple]:
+    """
+    Compress body for a client's Accept-Encoding header.
+
+    Returns:
+        (encoding, compressed body), or None if the client accepts neither
+        brotli nor gzip or compressing doesn't make it smaller
+    """
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    if brotli is not None and 'br' in accepted:
+        encoding, packed = 'br', brotli.compress(body, quality=JSON_BROTLI_QUALITY)
+    elif 'gzip' in accepted:
+        encoding, packed = 'gzip', gzip.compress(body, compresslevel=JSON_GZIP_LEVEL)
+    else:
+        return None
+    return (encoding, packed) if len(packed) < len(body) else None
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Drop-in for Flask's DefaultJSONProvider: same key sorting, compact
+    output outside debug mode and trailing newline, faster encoder.
+    """
+
+    sort_keys = True
+    mimetype = 'application/json'
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys),
+                     indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = dumps(obj, sort_keys=self.sort_keys, indent=self._app.debug)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def compress_response(response):
+    """after_request hook: compress large JSON bodies if the client accepts it."""
+    if (response.direct_passthrough or response.is_streamed
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or not 200 <= response.status_code < 300):
+        return response
+
+    body = response.get_data()
+    if len(body) < JSON_COMPRESS_MIN_BYTES:
+        return response
+
+    packed = compress(body, request.headers.get('Accept-Encoding', ''))
+    response.vary.add('Accept-Encoding')
+    if packed is not None:
+        encoding, data = packed
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_fast_json(app: Flask, compress_responses: bool = True):
+    """
+    Route the app's jsonify() through FastJSONProvider
+
+    Args:
+        app: Flask app
+        compress_responses: Also gzip/brotli large JSON responses
+    """
+    app.json = FastJSONProvider(app)
+    if compress_responses:
+        app.after_request(compress_response)
+    logger.info(f"JSON responses via {BACKEND}, compression: "
+                f"{'br+gzip' if brotli is not None else 'gzip'} over {JSON_COMPRESS_MIN_BYTES} bytes")
+
+
+if __name__ == '__main__':
+    # Serialization time for a 5,000-opportunity /api/scan payload
+    import random
+    import time
+
+    random.seed(18)
+    opportunities = []
+    for rank in range(1, 5001):
+        ticker = random.choice(['SPY', 'QQQ', 'AAPL', 'MSFT', 'NVDA', 'TSLA', 'AMZN', 'META'])
+        strike = float(random.randint(50, 600))
+        opportunities.append({
+            'ticker': ticker, 'spot': 512.34, 'price_source': 'Tradier',
+            'price_timestamp': '2026-10-16T15:30:00.123456Z', 'options_source': 'Tradier',
+            'options_timestamp': '2026-10-16T15:30:01.654321Z', 'rank': rank,
+            'contract': {'symbol': f"{ticker}261120C{int(strike * 1000):08d}", 'type': 'call',
+                         'strike': strike, 'bid': random.random() * 4, 'ask': random.random() * 4 + 0.05,
+                         'mid': random.random() * 4, 'volume': random.randint(0, 50000),
+                         'open_interest': random.randint(0, 90000), 'iv': random.random(),
+                         'delta': random.uniform(-1, 1), 'gamma': random.random() / 10,
+                         'theta': -random.random(), 'vega': random.random()},
+            'metrics': {'cost_to_enter': random.random() * 400, 'breakeven': strike + random.random() * 4,
+                        'required_move_pct': random.random() * 10, 'liquidity_score': random.random(),
+                        'profit_score': random.uniform(-1, 3), 'spread_pct': random.random()},
+            'category_tags': ['budget_fit', 'liquid'],
+        })
+    payload = {'data_mode': 'live', 'opportunities': opportunities, 'total_found': len(opportunities),
+               'highlights': {'highest_profit': opportunities[0], 'cheapest_profit': opportunities[1],
+                              'highest_probability': opportunities[2]},
+               'message': 'LIVE MODE', 'options_sources_used': ['Tradier'], 'timestamp': '2026-10-16T15:30:02Z'}
+
+    def best_ms(fn, runs=15):
+        best = float('inf')
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, (time.perf_counter() - t0) * 1000)
+        return best
+
+    # What jsonify did before: stdlib json, sorted keys, compact separators
+    flask_default = lambda: json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=True)
+    body = dumps(payload, sort_keys=True)
+    assert json.loads(body) == json.loads(flask_default())
+    print(f"5,000 opportunities, {len(body) / 1024:.0f} KB:")
+    print(f"  stdlib json (old jsonify)  {best_ms(flask_default):7.1f}ms")
+    print(f"  stdlib fallback            {best_ms(lambda: _dumps_stdlib(payload, sort_keys=True)):7.1f}ms")
+    if orjson is not None:
+        print(f"  orjson                     {best_ms(lambda: dumps(payload, sort_keys=True)):7.1f}ms")
+
+    t0 = time.perf_counter()
+    gz = gzip.compress(body, compresslevel=JSON_GZIP_LEVEL)
+    print(f"  gzip level {JSON_GZIP_LEVEL}               {(time.perf_counter() - t0) * 1000:7.1f}ms -> {len(gz) / 1024:.0f} KB")
+    if brotli is not None:
+        t0 = time.perf_counter()
+        br = brotli.compress(body, quality=JSON_BROTLI_QUALITY)
+        print(f"  brotli quality {JSON_BROTLI_QUALITY}           {(time.perf_counter() - t0) * 1000:7.1f}ms -> {len(br) / 1024:.0f} KB")
+
+    # NumPy values serialize directly, with or without orjson
+    arrays = {'scores': np.linspace(0, 1, 5), 'count': np.int64(3), 'best': np.float32(0.5)} if np is not None else {}
+    assert loads(dumps(arrays)) == loads(_dumps_stdlib(arrays))
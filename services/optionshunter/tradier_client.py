@@ -16,6 +16,8 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
+from .transport import get_transport
+
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -28,6 +30,8 @@ TRADIER_SANDBOX_URL = 'https://sandbox.tradier.com/v1'
 USE_SANDBOX = not TRADIER_API_KEY or os.getenv('TRADIER_SANDBOX', 'false').lower() == 'true'
 BASE_URL = TRADIER_SANDBOX_URL if USE_SANDBOX else TRADIER_BASE_URL
 
+QUOTE_BATCH_SIZE = 100  # Symbols per /markets/quotes request
+
 class TradierClient:
     """
     Unified Tradier API client for Options Hunter functionality
@@ -65,10 +69,12 @@ class TradierClient:
         url = f'{self.base_url}{endpoint}'
         
         try:
+            # Pooled keep-alive session shared with every other provider call
+            transport = get_transport()
             if method == 'GET':
-                response = requests.get(url, headers=headers, params=params or {}, timeout=10)
+                response = transport.get(url, headers=headers, params=params or {}, timeout=10)
             elif method == 'POST':
-                response = requests.post(url, headers=headers, json=params or {}, timeout=10)
+                response = transport.post(url, headers=headers, json=params or {}, timeout=10)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
@@ -79,6 +85,20 @@ class TradierClient:
             logger.error(f"Tradier API request failed: {e}")
             return None
     
+    def _format_quote(self, symbol: str, quote: Dict) -> Dict:
+        return {
+            'symbol': symbol,
+            'last': quote.get('last', 0),
+            'change': quote.get('change', 0),
+            'change_percentage': quote.get('change_percentage', 0),
+            'volume': quote.get('volume', 0),
+            'high': quote.get('high', 0),
+            'low': quote.get('low', 0),
+            'bid': quote.get('bid', 0),
+            'ask': quote.get('ask', 0),
+            'timestamp': datetime.now().isoformat()
+        }
+    
     def get_quote(self, symbol: str) -> Optional[Dict]:
         """
         Get real-time quote for symbol
@@ -96,21 +116,38 @@ class TradierClient:
             if isinstance(quote, list):
                 quote = quote[0]
             
-            return {
-                'symbol': symbol,
-                'last': quote.get('last', 0),
-                'change': quote.get('change', 0),
-                'change_percentage': quote.get('change_percentage', 0),
-                'volume': quote.get('volume', 0),
-                'high': quote.get('high', 0),
-                'low': quote.get('low', 0),
-                'bid': quote.get('bid', 0),
-                'ask': quote.get('ask', 0),
-                'timestamp': datetime.now().isoformat()
-            }
+            return self._format_quote(symbol, quote)
         
         return None
     
+    def get_quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Get real-time quotes for many symbols in as few requests as possible
+        
+        Args:
+            symbols: Stock symbols (sent QUOTE_BATCH_SIZE per request)
+            
+        Returns:
+            Dict of symbol -> quote data (same shape as get_quote); symbols
+            Tradier didn't return are missing
+        """
+        quotes = {}
+        for i in range(0, len(symbols), QUOTE_BATCH_SIZE):
+            chunk = symbols[i:i + QUOTE_BATCH_SIZE]
+            data = self._make_request('/markets/quotes', {'symbols': ','.join(chunk)})
+            
+            if data and 'quotes' in data:
+                batch = (data['quotes'] or {}).get('quote', [])
+                if not isinstance(batch, list):
+                    batch = [batch] if batch else []
+                
+                for quote in batch:
+                    symbol = quote.get('symbol')
+                    if symbol:
+                        quotes[symbol] = self._format_quote(symbol, quote)
+        
+        return quotes
+    
     def get_options_expirations(self, symbol: str) -> List[str]:
         """
         Get available option expiration dates for symbol
@@ -152,19 +189,21 @@ class TradierClient:
         
         return []
     
-    def scan_affordable_options(self, symbol: str, max_cost: float = 500.0) -> Dict:
+    def scan_affordable_options(self, symbol: str, max_cost: float = 500.0,
+                                quote: Dict = None) -> Dict:
         """
         Scan for affordable option opportunities
         
         Args:
             symbol: Stock symbol to scan
             max_cost: Maximum cost per contract (default: $500)
+            quote: Already-fetched quote (e.g. from get_quotes) to skip the quote call
             
         Returns:
             Dict with 'calls' and 'puts' lists of affordable options
         """
         # Get stock price
-        quote = self.get_quote(symbol)
+        quote = quote or self.get_quote(symbol)
         if not quote:
             return {'calls': [], 'puts': [], 'error': 'Could not get quote'}
         
@@ -0,0 +1,224 @@
+"""
+OPTIONS HUNTER SERVICE - Shared HTTP Transport
+
+One pooled, keep-alive requests.Session per provider host, so repeated calls
+to Tradier / Polygon / Finnhub / etc. reuse their TCP+TLS connections instead
+of paying a fresh handshake on every request. Idempotent requests are retried
+on connection errors and 429/5xx with jittered exponential backoff, and every
+host keeps latency / error counters for monitoring.
+
+Used by TradierClient and by the options-hunter server's provider fetchers.
+
+Environment Variables (all optional):
+- HTTP_POOL_MAXSIZE: Max pooled connections per host (default: 16)
+- HTTP_MAX_RETRIES: Retries after the first attempt (default: 2)
+- HTTP_BACKOFF_BASE: First backoff step in seconds (default: 0.25)
+- HTTP_BACKOFF_MAX: Backoff cap in seconds (default: 4.0)
+"""
+
+import os
+import random
+import threading
+import time
+import logging
+from collections import deque
+from typing import Dict, Optional, Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '16'))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '2'))
+HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', '0.25'))
+HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', '4.0'))
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})  # Never replay a POST
+LATENCY_WINDOW = 200  # Samples kept per host for percentiles
+
+
+class HostMetrics:
+    """
+    Rolling request statistics for one host
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.status_counts: Dict[int, int] = {}
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float, status: Optional[int] = None, error: Optional[str] = None):
+        with self._lock:
+            self.requests += 1
+            self.latencies_ms.append(elapsed_ms)
+            if status is not None:
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            if error is not None or (status is not None and status >= 400):
+                self.errors += 1
+                self.last_error = error or f'HTTP {status}'
+                self.last_error_at = time.time()
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self.latencies_ms)
+            requests_made = self.requests
+            data = {
+                'requests': requests_made,
+                'errors': self.errors,
+                'retries': self.retries,
+                'error_rate': round(self.errors / requests_made, 4) if requests_made else 0.0,
+                'status_counts': {str(k): v for k, v in sorted(self.status_counts.items())},
+                'last_error': self.last_error,
+                'last_error_at': self.last_error_at,
+            }
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 1) if samples else None
+
+        data['latency_ms'] = {
+            'avg': round(sum(samples) / len(samples), 1) if samples else None,
+            'p50': pct(0.50),
+            'p95': pct(0.95),
+            'max': round(samples[-1], 1) if samples else None,
+        }
+        return data
+
+
+class ProviderTransport:
+    """
+    Pooled HTTP transport shared by all market data providers
+    """
+
+    def __init__(self, pool_maxsize: int = None, max_retries: int = None,
+                 backoff_base: float = None, backoff_max: float = None):
+        self.pool_maxsize = pool_maxsize or HTTP_POOL_MAXSIZE
+        self.max_retries = HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = HTTP_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = HTTP_BACKOFF_MAX if backoff_max is None else backoff_max
+        self._sessions: Dict[str, requests.Session] = {}
+        self._metrics: Dict[str, HostMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _host_key(self, url: str) -> str:
+        parts = urlsplit(url)
+        return f'{parts.scheme}://{parts.netloc}'
+
+    def _session_for(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # Retries are handled here (with jitter + metrics), not by urllib3
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize,
+                                      max_retries=0, pool_block=False)
+                session.mount(host + '/', adapter)
+                self._sessions[host] = session
+                self._metrics[host] = HostMetrics()
+            return session
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Full-jitter exponential backoff; honours a numeric Retry-After on 429/503."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, url: str, retries: int = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the host's pooled session
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            retries: Override the retry count for this call
+            **kwargs: Passed through to requests (params, headers, json, timeout, ...)
+
+        Returns:
+            The final requests.Response (status is not checked, like requests.get)
+
+        Raises:
+            requests.RequestException if the last attempt failed to connect
+        """
+        method = method.upper()
+        host = self._host_key(url)
+        session = self._session_for(host)
+        metrics = self._metrics[host]
+        kwargs.setdefault('timeout', 10)
+        max_retries = self.max_retries if retries is None else retries
+        if method not in RETRY_METHODS:
+            max_retries = 0
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.record((time.perf_counter() - start) * 1000.0, error=type(e).__name__)
+                if attempt >= max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                metrics.record((time.perf_counter() - start) * 1000.0, status=response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                    return response
+                delay = self._backoff(attempt, response)
+                response.close()
+
+            metrics.record_retry()
+            logger.debug(f"Retrying {method} {host} in {delay:.2f}s (attempt {attempt + 1})")
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-host latency and error statistics
+
+        Returns:
+            Dict of host -> stats
+        """
+        with self._lock:
+            hosts = dict(self._metrics)
+        return {host: m.snapshot() for host, m in sorted(hosts.items())}
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._metrics.clear()
+        for session in sessions:
+            session.close()
+
+
+# Global singleton instance
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> ProviderTransport:
+    """Get singleton transport instance (shared connection pools)"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = ProviderTransport()
+    return _transport